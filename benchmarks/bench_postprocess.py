@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from postprocess import plan_postprocess, postprocess_options, run_postprocessors
+
+# ffmpeg ile üretilen sentetik örneklerde eski (her zaman dönüştür) ve yeni (kodeğe göre plan)
+# dönüştürme yolunun CPU süresini karşılaştırır; sonuç "indirilen saat başına CPU saniyesi".
+SAMPLES = {
+    # ad: (ffmpeg çıktı argümanları, uzantı, vcodec, acodec)
+    'mp4 (h264/aac)': (['-c:v', 'libx264', '-preset', 'veryfast', '-c:a', 'aac'], 'mp4', 'avc1', 'mp4a.40.2'),
+    'webm (vp9/opus)': (['-c:v', 'libvpx-vp9', '-deadline', 'realtime', '-cpu-used', '8', '-c:a', 'libopus'],
+                        'webm', 'vp9', 'opus'),
+    'm4a (aac)': (['-vn', '-c:a', 'aac'], 'm4a', 'none', 'mp4a.40.2'),
+    'webm (opus)': (['-vn', '-c:a', 'libopus'], 'webm', 'none', 'opus'),
+}
+
+LEGACY = {
+    'video': [{'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'}],
+    'mp3': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}],
+}
+
+
+def make_sample(directory, name, args, ext, duration):
+    path = os.path.join(directory, f"{name.split()[0]}_{len(os.listdir(directory))}.{ext}")
+    subprocess.run(['ffmpeg', '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', f'testsrc2=duration={duration}:size=1280x720:rate=30',
+                    '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+                    '-shortest', *args, path], check=True)
+    return path
+
+
+def measure(source, info, postprocessors, workdir):
+    if not postprocessors:
+        return 0.0
+    path = os.path.join(workdir, os.path.basename(source))
+    shutil.copyfile(source, path)
+    result = run_postprocessors(path, dict(info, filepath=path), postprocess_options(postprocessors), 0)
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    return result['cpu']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dönüştürme planlayıcısı CPU ölçümü")
+    parser.add_argument('--duration', type=int, default=20, help="Örnek süresi (s)")
+    args = parser.parse_args()
+    if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+        print("Bu ölçüm için ffmpeg ve ffprobe gerekli")
+        return 1
+
+    per_hour = 3600 / args.duration
+    with tempfile.TemporaryDirectory() as samples, tempfile.TemporaryDirectory() as workdir:
+        print(f"{'Örnek':<18} {'Çıktı':<7} {'Plan':<10} {'Eski CPU s/saat':>16} {'Yeni CPU s/saat':>16}")
+        for name, (ffmpeg_args, ext, vcodec, acodec) in SAMPLES.items():
+            source = make_sample(samples, name, ffmpeg_args, ext, args.duration)
+            info = {'id': name, 'title': name, 'ext': ext, 'vcodec': vcodec, 'acodec': acodec,
+                    'duration': args.duration}
+            outputs = ('video', 'mp3', 'native') if vcodec != 'none' else ('mp3', 'native')
+            for output in outputs:
+                operation, planned = plan_postprocess(info, output)
+                legacy = measure(source, info, LEGACY.get(output, LEGACY['mp3']), workdir)
+                new = measure(source, info, planned, workdir)
+                print(f"{name:<18} {output:<7} {operation:<10} {legacy * per_hour:>16.1f} {new * per_hour:>16.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
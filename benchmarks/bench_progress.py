@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QLabel, QProgressBar
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from progress import ProgressAggregator
+
+# Paralel indirmelerin ilerleme olaylarının arayüz olay döngüsünde harcattığı süreyi ölçer:
+# parça başına sinyal (eski yol) ile tick başına birleştirilmiş tek sinyal (yeni yol).
+
+
+class Emitter(QObject):
+    chunk = pyqtSignal(str, float, float)
+    batch = pyqtSignal(object)
+
+
+class Labels:
+    def __init__(self):
+        self.bar = QProgressBar()
+        self.status = QLabel()
+        self.speed = QLabel()
+        self.calls = 0
+        self.busy = 0.0
+
+    def on_chunk(self, filename, downloaded, total):
+        start = time.perf_counter()
+        progress = (downloaded / total) * 100 if total > 0 else 0
+        self.bar.setValue(int(progress))
+        self.status.setText(f"İndiriliyor: {filename} - %{progress:.1f}")
+        self.speed.setText(f"İndirme Hızı: {downloaded / 1024:.1f} KB/s")
+        self.calls += 1
+        self.busy += time.perf_counter() - start
+
+    def on_batch(self, batch):
+        start = time.perf_counter()
+        total = batch['total']
+        self.bar.setValue(int(total['percent']))
+        self.status.setText(f"İndiriliyor: {total['active']} dosya - %{total['percent']:.1f}")
+        self.speed.setText(f"İndirme Hızı: {total['speed'] / 1024:.1f} KB/s")
+        for job in batch['jobs'].values():
+            self.status.setToolTip(f"%{job['percent']:.0f}")
+        self.calls += 1
+        self.busy += time.perf_counter() - start
+
+
+def produce(jobs, events, duration, sink):
+    # jobs kadar iş parçacığı, her biri duration saniyeye yayılmış events olay üretir
+    def worker(index):
+        total = events * 1024
+        for i in range(1, events + 1):
+            sink(f"video_{index}.mp4", i * 1024, total, index)
+            if i % 50 == 0:
+                time.sleep(duration * 50 / events)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(jobs)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def run(app, jobs, events, duration, batched, rate):
+    labels = Labels()
+    emitter = Emitter()
+    aggregator = ProgressAggregator(rate)
+    timer = QTimer()
+    if batched:
+        emitter.batch.connect(labels.on_batch)
+        timer.setInterval(int(aggregator.interval * 1000))
+        timer.timeout.connect(lambda: (lambda b: b and emitter.batch.emit(b))(aggregator.tick()))
+        timer.start()
+        sink = lambda name, done, total, index: aggregator.update(index, name, done, total)
+    else:
+        emitter.chunk.connect(labels.on_chunk)
+        sink = lambda name, done, total, index: emitter.chunk.emit(name, done, total)
+
+    start = time.perf_counter()
+    threads = produce(jobs, events, duration, sink)
+    while any(t.is_alive() for t in threads):
+        app.processEvents()
+    app.processEvents()
+    wall = time.perf_counter() - start
+    timer.stop()
+    return labels.calls, labels.busy, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İlerleme olaylarının olay döngüsü maliyeti")
+    parser.add_argument('--jobs', type=int, default=8)
+    parser.add_argument('--events', type=int, default=5000, help="İş başına ilerleme olayı")
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--rate', type=float, default=10)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    for name, batched in (("Parça başına sinyal", False), ("Birleştirilmiş (tick)", True)):
+        calls, busy, wall = run(app, args.jobs, args.events, args.duration, batched, args.rate)
+        print(f"{name:24s}: {calls:7d} çağrı, arayüz işleyici süresi {busy * 1000:9.1f} ms, "
+              f"toplam {wall:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
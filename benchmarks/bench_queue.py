@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fake_site
+import jobqueue
+from jobqueue import JobQueue, QueueServer, QueueClient
+
+# Paylaşılan kuyruk ölçümü: yerel medya sunucusu ve kuyruk bu süreçte, işçiler ayrı süreçlerde çalışır.
+# Önce 1 ve N işçiyle aynı iş listesinin bitme süresi ölçülür; sonra kısa kira süresiyle bir işçi
+# indirme ortasında öldürülür (SIGKILL) ve işlerinin başka işçiye yeniden verilip tamamlandığı doğrulanır.
+
+
+class Worker:
+    # İşçi süreci; stderr'i okunur (dolup süreci durdurmasın), "started" satırı hazır olduğunu gösterir
+    def __init__(self, queue_url, base_url, args, name):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker', queue_url, '--base-url', base_url,
+             '--media-size', str(args.media_size), '--lease', str(args.lease), '--worker-id', name],
+            stderr=subprocess.PIPE, text=True)
+        self.name = name
+        self.ready = threading.Event()
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def read(self):
+        for line in self.process.stderr:
+            if 'started' in line:
+                self.ready.set()
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+        self.process.wait(30)
+
+
+def run_worker(args):
+    fake_site.register(args.base_url, args.media_size * 1024 * 1024)
+    return jobqueue.main(['work', args.worker, '-j', '1', '-s', '1', '--no-history', '--lease', str(args.lease),
+                          '--worker-id', args.worker_id])
+
+
+def wait_done(client, count, timeout, on_poll=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.status()
+        if status['completed'] + status['failed'] >= count:
+            return status
+        if on_poll is not None:
+            on_poll(status)
+        time.sleep(0.2)
+    raise TimeoutError(f"Kuyruk {timeout} sn içinde boşalmadı: {status}")
+
+
+def run(args, base_url, count, name, kill=False):
+    # count işçiyle args.jobs iş; (süre, durum, yeniden verilen iş, doğru boyutta dosya sayısı) döner
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'queue.sqlite3'))
+        server = QueueServer(queue, 0)
+        client = QueueClient(f'http://127.0.0.1:{server.port}')
+        workers = [Worker(client.url, base_url, args, f'{name}-{i}') for i in range(count)]
+        for worker in workers:
+            worker.ready.wait(60)
+        killed = []
+
+        def kill_one(status):
+            # İlk iş yarılandığında onu indiren işçi öldürülür
+            if killed:
+                return
+            for job in client.jobs():
+                if job['state'] == 'leased' and job['downloaded'] * 2 >= args.media_size * 1024 * 1024:
+                    victim = next(w for w in workers if w.name == job['worker'])
+                    victim.process.kill()
+                    killed.append(victim)
+                    print(f"  {victim.name} öldürüldü ({job['url']}, {job['downloaded']} bayt)")
+                    return
+
+        start = time.perf_counter()
+        client.submit_many(jobs=[{'url': f'fakebench://video/{name}{i}', 'format_id': '18', 'output_path': tmp,
+                                  'segments': 1} for i in range(args.jobs)])
+        status = wait_done(client, args.jobs, args.timeout, kill_one if kill else None)
+        elapsed = time.perf_counter() - start
+        for worker in workers:
+            worker.stop()
+        size = args.media_size * 1024 * 1024
+        jobs = client.jobs()
+        redelivered = sum(1 for job in jobs if job['attempts'] > 1)
+        complete = sum(1 for job in jobs if job['filepath'] and os.path.getsize(job['filepath']) == size)
+        server.close()
+        queue.close()
+    return elapsed, status, redelivered, complete
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paylaşılan kuyruk: işçi sayısına göre hız ve işçi kaybı")
+    parser.add_argument('--workers', type=int, default=3, help="Çok işçili ölçümde işçi süreci sayısı")
+    parser.add_argument('--jobs', type=int, default=9, help="Kuyruğa eklenen iş sayısı")
+    parser.add_argument('--media-size', type=int, default=8, help="Sentetik medya boyutu (MB)")
+    parser.add_argument('--rate', type=float, default=4, help="Bağlantı başına hız sınırı (MB/s)")
+    parser.add_argument('--lease', type=float, default=3, help="İşçi kira süresi (s)")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-id', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return run_worker(args)
+
+    server = fake_site.install(args.media_size * 1024 * 1024, rate=args.rate * 1024 * 1024)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    total = args.jobs * args.media_size
+    print(f"{args.jobs} iş x {args.media_size} MB | Bağlantı başına sınır: {args.rate} MB/s | Kira: {args.lease} s")
+    print(f"{'İşçi':>5} {'Süre (s)':>9} {'MB/s':>8} {'Biten':>6} {'Yeniden verilen':>16}")
+    failed = False
+    for count, kill in ((1, False), (args.workers, False), (args.workers, True)):
+        elapsed, status, redelivered, complete = run(args, base_url, count, f'w{count}{"k" if kill else ""}', kill)
+        print(f"{count:>5} {elapsed:>9.2f} {total / elapsed:>8.1f} {complete:>6} {redelivered:>16}"
+              f"{'  (bir işçi öldürüldü)' if kill else ''}")
+        failed |= complete != args.jobs or (kill and not redelivered)
+    server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
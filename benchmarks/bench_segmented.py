@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import yt_dlp
+from yt_dlp.downloader.dash import DashSegmentsFD
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from segmented import SegmentedHttpFD
+
+# Ağa çıkmadan, yerel bir HTTP sunucusundaki sentetik medya ile bağlantı sayısına göre
+# indirme hızını ölçer. Sunucu her bağlantıyı ayrı ayrı sınırlar (CDN'lerin bağlantı başına
+# hız sınırını taklit eder); fragman ve sayfa isteklerine sabit gecikme eklenir. Yeni bağlantılara
+# ayrıca kurulum gecikmesi (TCP + TLS el sıkışması) eklenebilir.
+CHUNK = 64 * 1024
+
+
+class FaultInjector:
+    # Sunucu hatalarını taklit eder: isteklerin rate oranı 429 ya da 503 ile reddedilir (retry_after
+    # verilirse Retry-After başlığıyla), outage() süresince bütün istekler 503 alır
+    def __init__(self, rate=0.0, retry_after=None, seed=0):
+        self.rate = rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.down_until = 0.0
+        self.requests = self.faults = self.outage_requests = 0
+
+    def outage(self, seconds):
+        self.down_until = time.monotonic() + seconds
+
+    def fault(self):
+        # Reddedilecekse (durum kodu, Retry-After) döner, yoksa None
+        with self.lock:
+            self.requests += 1
+            if time.monotonic() < self.down_until:
+                self.outage_requests += 1
+                self.faults += 1
+                return 503, None
+            if self.random.random() >= self.rate:
+                return None
+            self.faults += 1
+            return self.random.choice((429, 503)), self.retry_after
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Başlık ve gövde ayrı yazılıyor; kalıcı bağlantılarda Nagle + gecikmeli ACK 40 ms bekletmesin
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        time.sleep(self.server.connect_latency)
+        super().setup()
+
+    def do_GET(self):
+        server = self.server
+        fault = server.faults and server.faults.fault()
+        if fault:
+            return self.send_fault(*fault)
+        if self.path.startswith('/page/'):
+            # Küçük bir video sayfası (bilgi alma isteklerini taklit eder)
+            page_id = self.path.rsplit('/', 1)[1]
+            time.sleep(server.latency)
+            return self.send_body(200, (f'<html><head><title>Sentetik video {page_id}</title></head>'
+                                        f'<body>{"x" * 2048}</body></html>').encode())
+        if self.path.startswith('/thumb/'):
+            time.sleep(server.latency)
+            return self.send_body(200, server.thumbnail)
+        if self.path.startswith('/frag/'):
+            index = int(self.path.rsplit('/', 1)[1])
+            start = index * server.fragment_size
+            body = server.media[start:start + server.fragment_size]
+            time.sleep(server.latency)
+            return self.send_body(200, body)
+
+        body, status = server.media, 200
+        header = self.headers.get('Range')
+        if header and header.startswith('bytes='):
+            first, _, last = header[6:].partition('-')
+            first = int(first)
+            last = int(last) if last else len(body) - 1
+            body = body[first:last + 1]
+            status = 206
+            self.content_range = f"bytes {first}-{first + len(body) - 1}/{len(server.media)}"
+        self.send_body(status, body)
+
+    def send_fault(self, status, retry_after):
+        body = b'Service unavailable'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', self.content_range)
+        self.end_headers()
+        view = memoryview(body)
+        started = time.perf_counter()
+        try:
+            for offset in range(0, len(view), CHUNK):
+                self.wfile.write(view[offset:offset + CHUNK])
+                # Bağlantı başına hız sınırı
+                delay = (offset + CHUNK) / self.server.rate - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci bağlantıyı kapattı (ör. boyut yoklaması ya da duraklatma)
+            self.close_connection = True
+
+
+def start_server(media, rate, fragment_size, latency, connect_latency=0):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    server.daemon_threads = True
+    server.media, server.rate = media, rate
+    server.fragment_size, server.latency = fragment_size, latency
+    server.connect_latency = connect_latency
+    # Hata enjeksiyonu: FaultInjector atanırsa istekler ona göre reddedilir
+    server.faults = None
+    # Önizleme görüntüsü (/thumb/<kimlik>)
+    server.thumbnail = b''
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(fd_class, info, params, expected):
+    with tempfile.TemporaryDirectory() as tmp, yt_dlp.YoutubeDL({'quiet': True, 'noprogress': True}) as ydl:
+        path = os.path.join(tmp, 'media.mp4')
+        fd = fd_class(ydl, dict(ydl.params, **params))
+        start = time.perf_counter()
+        fd.download(path, dict(info))
+        elapsed = time.perf_counter() - start
+        with open(path, 'rb') as f:
+            ok = hashlib.sha256(f.read()).hexdigest() == expected
+    return elapsed, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parçalı (çok bağlantılı) indirme hız ölçümü")
+    parser.add_argument('--size', type=int, default=32, help="Sentetik medya boyutu (MB)")
+    parser.add_argument('--rate', type=float, default=8, help="Bağlantı başına hız sınırı (MB/s)")
+    parser.add_argument('--fragment-size', type=int, default=512, help="DASH fragman boyutu (KB)")
+    parser.add_argument('--latency', type=float, default=0.02, help="Fragman isteği gecikmesi (s)")
+    parser.add_argument('--connections', default='1,2,4,8', help="Denenecek bağlantı sayıları")
+    args = parser.parse_args()
+
+    media = random.Random(0).randbytes(args.size * 1024 * 1024)
+    expected = hashlib.sha256(media).hexdigest()
+    fragment_size = args.fragment_size * 1024
+    server = start_server(media, args.rate * 1024 * 1024, fragment_size, args.latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    http_info = {'url': f"{base}/media.mp4", 'protocol': 'http', 'ext': 'mp4', 'http_headers': {}}
+    dash_info = {
+        'url': base, 'protocol': 'http_dash_segments', 'ext': 'mp4', 'http_headers': {},
+        'fragment_base_url': f"{base}/",
+        'fragments': [{'path': f"frag/{i}"} for i in range(-(-len(media) // fragment_size))],
+    }
+
+    print(f"Medya: {args.size} MB | Bağlantı başına sınır: {args.rate} MB/s")
+    print(f"{'Mod':<6} {'Bağlantı':>8} {'Süre (s)':>9} {'MB/s':>8}  Doğrulama")
+    for count in (int(c) for c in args.connections.split(',')):
+        for mode, fd_class, info, params in (
+                ('http', partial(SegmentedHttpFD, segments=count), http_info, {}),
+                ('dash', DashSegmentsFD, dash_info, {'concurrent_fragment_downloads': count})):
+            elapsed, ok = run(fd_class, info, params, expected)
+            print(f"{mode:<6} {count:>8} {elapsed:>9.2f} {args.size / elapsed:>8.1f}  {'tamam' if ok else 'HATALI'}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,501 @@
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import yt_dlp
+from PyQt6.QtWidgets import QApplication, QTableView
+import fake_site
+from bench_segmented import FaultInjector
+from engine import DownloadEngine, format_fields
+from downloader import YouTubeDownloader
+from video_model import VideoTableModel, VideoRecord
+from thumbnails import ThumbnailLoader, visible_rows
+from planner import PlanRule, BatchPlan, PLAN_BATCH
+from metrics import metrics
+from retry import breakers, retry_policy
+
+# Ağa çıkmadan uçtan uca ölçüm takımı: bilgi alma gecikmesi, playlist işleme hızı, indirme hızı,
+# ilerleme olaylarının maliyeti ve tabloya satır ekleme maliyeti. Sonuçlar JSON olarak yazılır;
+# --baseline ile önceki bir çalıştırmanın sonuçlarıyla karşılaştırılıp gerilemeler raporlanır.
+RESULT_VERSION = 1
+ENGINE_OPTIONS = {'use_cache': False, 'use_history': False, 'persist_journal': False}
+
+
+class Results:
+    def __init__(self):
+        self.items = []
+
+    def add(self, name, value, unit, better='lower', **params):
+        self.items.append({'name': name, 'value': round(value, 4), 'unit': unit, 'better': better,
+                           'params': params})
+        print(f"  {name:<36} {value:>12.3f} {unit}", file=sys.stderr)
+
+
+def repeat(count, func):
+    # Her ölçüm count kez tekrarlanır; gürültüye karşı ortanca kullanılır
+    return statistics.median(func() for _ in range(count))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench_info(args, results):
+    engine = DownloadEngine(**ENGINE_OPTIONS)
+    received = []
+
+    def fetch(video_id):
+        task = engine.fetch_video_info(f'fakebench://video/{video_id}', start=False,
+                                       emit=lambda kind, *a: kind == 'progress' and a[3] and received.append(a[3]))
+        start = time.perf_counter()
+        task.run()
+        return (time.perf_counter() - start) * 1000
+
+    # İlk çağrı YoutubeDL örneğinin kurulumunu da içerir
+    results.add('info.cold_ms', fetch('cold'), 'ms')
+    samples = [fetch(f'v{i}') for i in range(args.info_runs)]
+    results.add('info.median_ms', statistics.median(samples), 'ms', runs=args.info_runs)
+    results.add('info.p95_ms', percentile(samples, 0.95), 'ms', runs=args.info_runs)
+    assert len(received) == args.info_runs + 1, "Video bilgisi alınamadı"
+    engine.shutdown()
+
+
+def bench_playlist(args, results):
+    engine = DownloadEngine(**ENGINE_OPTIONS)
+    for count in args.playlist_sizes:
+        def run():
+            state = {'entries': 0, 'first': None}
+            start = time.perf_counter()
+
+            def emit(kind, *a):
+                if kind == 'progress' and a[3] and 'playlist_entries' in a[3]:
+                    state['entries'] += len(a[3]['playlist_entries'])
+                    if state['first'] is None:
+                        state['first'] = time.perf_counter() - start
+
+            engine.fetch_playlist_info(f'fakebench://playlist/{count}', emit=emit, start=False).run()
+            elapsed = time.perf_counter() - start
+            assert state['entries'] == count, f"Playlist eksik: {state['entries']}/{count}"
+            return elapsed, state['first']
+
+        runs = [run() for _ in range(args.repeat)]
+        elapsed = statistics.median(r[0] for r in runs)
+        results.add(f'playlist.{count}.entries_per_s', count / elapsed, 'girdi/s', 'higher', entries=count)
+        results.add(f'playlist.{count}.first_entry_ms', statistics.median(r[1] for r in runs) * 1000, 'ms',
+                    entries=count)
+    engine.shutdown()
+
+
+def bench_lookups(args, results):
+    # Toplu URL içe aktarma: her arama yerel sunucudan bir sayfa ister (istek ve yeni bağlantı gecikmesi
+    # sunucuda taklit edilir). yt-dlp'nin kendi HTTP işleyicisi ile paylaşılan bağlantı havuzu karşılaştırılır.
+    for mode, async_io in (('urllib', False), ('pooled', True)):
+        engine = DownloadEngine(resolve_concurrency=args.lookup_concurrency, **dict(ENGINE_OPTIONS, async_io=async_io))
+        lock = threading.Lock()
+        state = {'count': 0, 'failed': 0, 'done': threading.Event()}
+
+        def listener(event, data):
+            if event in ('entry_resolved', 'entry_failed'):
+                with lock:
+                    state['count'] += 1
+                    state['failed'] += event == 'entry_failed'
+                    if state['count'] == args.lookups:
+                        state['done'].set()
+
+        engine.subscribe(listener)
+
+        def run():
+            state['count'] = state['failed'] = 0
+            state['done'].clear()
+            start = time.perf_counter()
+            for i in range(args.lookups):
+                engine.resolve_entry(str(i), f'fakebench://page/{mode}{i}')
+            state['done'].wait()
+            assert not state['failed'], f"Arama başarısız: {state['failed']}/{args.lookups}"
+            return time.perf_counter() - start
+
+        elapsed = repeat(args.repeat, run)
+        results.add(f'lookups.{mode}_per_s', args.lookups / elapsed, 'arama/s', 'higher', lookups=args.lookups,
+                    concurrency=args.lookup_concurrency, latency_ms=args.latency, connect_ms=args.connect_latency)
+        engine.shutdown()
+
+
+def bench_download(args, results):
+    engine = DownloadEngine(max_concurrent_downloads=args.download_jobs, segments=args.segments, **ENGINE_OPTIONS)
+    states = {}
+    engine.subscribe(lambda event, data: event == 'job' and states.__setitem__(data['key'], data['state']))
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            for i in range(args.download_jobs):
+                engine.download(f'fakebench://video/d{i}', '18', tmp, output='video')
+            engine.wait()
+            elapsed = time.perf_counter() - start
+        failed = [state for state in states.values() if state != 'completed']
+        assert not failed, f"İndirme başarısız: {failed}"
+        states.clear()
+        return elapsed
+
+    elapsed = repeat(args.repeat, run)
+    total = args.download_jobs * args.media_size
+    results.add('download.mb_per_s', total / elapsed, 'MB/s', 'higher', jobs=args.download_jobs,
+                segments=args.segments, media_mb=args.media_size)
+    engine.shutdown()
+
+
+def counter(name, **labels):
+    # Etiketleri verilenleri içeren tüm sayaçların toplamı
+    return sum(value for (counter_name, pairs), value in list(metrics.counters.items())
+               if counter_name == name and set(labels.items()) <= set(pairs))
+
+
+def bench_retries(args, results):
+    # Geçici sunucu hataları (429/503) ve tam kesinti altında toplu arama: yeniden deneme politikası ve
+    # devre kesici. Ölçüm uzamasın diye bekleme süreleri küçültülür, ölçümden sonra geri alınır.
+    saved = (retry_policy.base, retry_policy.cap, breakers.cooldown, breakers.max_cooldown)
+    retry_policy.base, retry_policy.cap, breakers.cooldown, breakers.max_cooldown = 0.05, 0.5, 0.5, 2.0
+    faults = FaultInjector(args.fault_rate, retry_after=0)
+    fake_site.FakeBenchIE.server.faults = faults
+    engine = DownloadEngine(resolve_concurrency=args.lookup_concurrency, **ENGINE_OPTIONS)
+    lock = threading.Lock()
+    state = {'count': 0, 'failed': 0, 'done': threading.Event()}
+
+    def listener(event, data):
+        if event in ('entry_resolved', 'entry_failed'):
+            with lock:
+                state['count'] += 1
+                state['failed'] += event == 'entry_failed'
+                if state['count'] == args.lookups:
+                    state['done'].set()
+
+    engine.subscribe(listener)
+
+    def run(name):
+        state['count'] = state['failed'] = 0
+        state['done'].clear()
+        retries, opens = counter('ytdl_retries_total', kind='extract'), counter('ytdl_breaker_transitions_total',
+                                                                                 state='open')
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            engine.resolve_entry(str(i), f'fakebench://page/{name}{i}')
+        state['done'].wait()
+        elapsed = time.perf_counter() - start
+        return (elapsed, (args.lookups - state['failed']) / args.lookups,
+                counter('ytdl_retries_total', kind='extract') - retries,
+                counter('ytdl_breaker_transitions_total', state='open') - opens)
+
+    try:
+        elapsed, success, retries, _ = run('flaky')
+        params = {'lookups': args.lookups, 'fault_rate': args.fault_rate}
+        results.add('retries.flaky_per_s', args.lookups / elapsed, 'arama/s', 'higher', **params)
+        results.add('retries.flaky_success_ratio', success, 'oran', 'higher', **params)
+        results.add('retries.flaky_retries', retries, 'deneme', **params)
+
+        # Kesinti: sunucu bir süre bütün isteklere 503 döner; devre kesici açılınca istekler sunucuya gitmez
+        faults.rate = 0
+        faults.outage(args.outage / 1000)
+        before = faults.outage_requests
+        elapsed, success, retries, opens = run('outage')
+        params = {'lookups': args.lookups, 'outage_ms': args.outage}
+        results.add('retries.outage_success_ratio', success, 'oran', 'higher', **params)
+        results.add('retries.outage_server_requests', faults.outage_requests - before, 'istek', **params)
+        results.add('retries.outage_breaker_opens', opens, 'kez', **params)
+        results.add('retries.outage_recovery_s', elapsed, 's', **params)
+    finally:
+        fake_site.FakeBenchIE.server.faults = None
+        retry_policy.base, retry_policy.cap, breakers.cooldown, breakers.max_cooldown = saved
+        breakers.reset()
+        engine.shutdown()
+
+
+def bench_progress(args, results, app):
+    # İşçi iş parçacıklarından gelen ilerleme olaylarının motor -> Qt katmanındaki maliyeti
+    downloader = YouTubeDownloader(**ENGINE_OPTIONS)
+    batches = []
+    downloader.progress_batch_signal.connect(batches.append)
+    downloader.progress_timer.stop()
+    total = args.progress_events * 1024
+
+    def worker(index):
+        for i in range(1, args.progress_events + 1):
+            downloader.on_engine_event('download_progress', {'key': f'job{index}', 'filename': f'video_{index}.mp4',
+                                                             'downloaded': i * 1024, 'total': total})
+
+    def run():
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.progress_jobs)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return (time.perf_counter() - start) / (args.progress_jobs * args.progress_events) * 1e6
+
+    results.add('progress.event_us', repeat(args.repeat, run), 'µs/olay', jobs=args.progress_jobs)
+
+    def tick():
+        for i in range(args.progress_jobs):
+            downloader.on_engine_event('download_progress', {'key': f'job{i}', 'filename': f'video_{i}.mp4',
+                                                             'downloaded': 1024, 'total': total})
+        start = time.perf_counter()
+        downloader.emit_progress_batch()
+        app.processEvents()
+        return (time.perf_counter() - start) * 1e6
+
+    results.add('progress.tick_us', repeat(max(args.repeat, 50), tick), 'µs/tick', jobs=args.progress_jobs)
+    downloader.engine.shutdown()
+
+
+def bench_table(args, results, app):
+    model = VideoTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.resize(800, 600)
+    view.show()
+    for count in args.table_sizes:
+        entries = [{'title': f'Sentetik video {i}', 'duration': '10:00', 'playlist_index': i,
+                    'webpage_url': f'https://www.youtube.com/watch?v=bench{i:07d}'} for i in range(count)]
+
+        def run():
+            model.clear()
+            app.processEvents()
+            start = time.perf_counter()
+            for entry in entries:
+                model.queue_video(dict(entry))
+            model.flush()
+            app.processEvents()
+            return time.perf_counter() - start
+
+        elapsed = repeat(args.repeat, run)
+        assert model.rowCount() == count
+        results.add(f'table.{count}.us_per_row', elapsed / count * 1e6, 'µs/satır', rows=count)
+    view.close()
+
+
+def bench_thumbnails(args, results, app):
+    # Uzun bir tabloyu baştan sona kaydırma: duraklar arasındaki satırlar için istek yapılmamalı, bellek
+    # önbelleği bütçede kalmalı. Her durakta görünür önizlemelerin yüklenme süresi önce ağdan, sonra yeni
+    # bir yükleyiciyle (boş bellek önbelleği) disk önbelleğinden ölçülür.
+    count = args.thumbnail_rows
+    entries = [{'title': f'Sentetik video {i}', 'duration': '10:00', 'playlist_index': i,
+                'webpage_url': f'https://www.youtube.com/watch?v=th{i:09d}',
+                'thumbnail': f'{fake_site.FakeBenchIE.thumbnail_url}/th{i}.png'} for i in range(count)]
+    params = {'rows': count, 'stops': args.thumbnail_stops, 'memory_mb': args.thumbnail_memory}
+    with tempfile.TemporaryDirectory() as tmp:
+        for source in ('network', 'disk'):
+            loader = ThumbnailLoader(cache_dir=tmp, memory_budget=args.thumbnail_memory * 1024 * 1024)
+            model = VideoTableModel(thumbnails=loader)
+            model.add_videos(entries)
+            view = QTableView()
+            view.setModel(model)
+            view.setIconSize(loader.size)
+            view.verticalHeader().setDefaultSectionSize(loader.size.height() + 4)
+            view.resize(800, 600)
+            view.show()
+            app.processEvents()
+            scrollbar = view.verticalScrollBar()
+            requests = counter('ytdl_thumbnail_requests_total')
+            samples, peak, shown = [], 0, 0
+            for stop in range(args.thumbnail_stops + 1):
+                # Duraklar arasında hızlı kaydırma: arayüzde zamanlayıcı sürekli ertelenir, istek yapılmaz
+                target = scrollbar.maximum() * stop // args.thumbnail_stops
+                while scrollbar.value() < target:
+                    scrollbar.setValue(min(target, scrollbar.value() + scrollbar.pageStep()))
+                    app.processEvents()
+                start = time.perf_counter()
+                items = model.thumbnail_items(*visible_rows(view))
+                loader.request(items)
+                while not loader.idle():
+                    app.processEvents()
+                    time.sleep(0.001)
+                samples.append((time.perf_counter() - start) * 1000)
+                peak = max(peak, loader.memory.bytes)
+                shown += sum(loader.pixmap(key) is not None for key, _ in items)
+                assert shown and not loader.failed, "Önizleme yüklenemedi"
+            results.add(f'thumbnails.{source}_visible_ms', statistics.median(samples), 'ms', **params)
+            if source == 'network':
+                results.add('thumbnails.requests', counter('ytdl_thumbnail_requests_total') - requests, 'istek',
+                            **params)
+                results.add('thumbnails.memory_peak_mb', peak / 1024 ** 2, 'MB', **params)
+            view.close()
+
+
+def bench_memory(args, results):
+    # Çözümlenmiş girdilerin tabloda tuttuğu bellek: ham bilgi sözlüğü (format listesiyle) ve VideoRecord
+    def entry(i):
+        video_id = f'mem{i:08d}'
+        formats = fake_site.fake_formats(video_id, fake_site.FakeBenchIE.media_url, args.media_size * 1024 * 1024)
+        return {'title': f'Sentetik video {i}', 'duration_string': '10:00', 'playlist_index': i,
+                'webpage_url': f'https://www.youtube.com/watch?v={video_id}', 'formats': formats,
+                **format_fields({'formats': formats})}
+
+    def retained(build):
+        gc.collect()
+        tracemalloc.start()
+        kept = [build(entry(i)) for i in range(args.memory_entries)]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        gc.collect()
+        return size
+
+    count = args.memory_entries
+    for name, build in (('raw_info', lambda info: info), ('record', VideoRecord.from_info)):
+        size = retained(build)
+        results.add(f'memory.{count}.{name}_mb', size / 1024 ** 2, 'MB', entries=count)
+        results.add(f'memory.{count}.{name}_bytes_per_entry', size / count, 'bayt', entries=count)
+
+
+def bench_planner(args, results):
+    # Toplu planlama: her girdinin merdiveninden kurala göre format seçimi ve boyut toplamı. Arayüz planı
+    # PLAN_BATCH'lik adımlarla hesaplar; bir adımın süresi olay döngüsünün bloklandığı en uzun süredir.
+    count = args.plan_entries
+    size = args.media_size * 1024 * 1024
+    records = []
+    for i in range(count):
+        video_id = f'plan{i:08d}'
+        formats = fake_site.fake_formats(video_id, fake_site.FakeBenchIE.media_url, size)
+        records.append(VideoRecord.from_info({'id': video_id, 'title': f'Sentetik video {i}', 'formats': formats,
+                                              'duration_string': '10:00', **format_fields({'formats': formats})}))
+    rule = PlanRule('video', max_height=1080, codec='avc1', max_size=size * 2)
+    params = {'entries': count, 'batch': PLAN_BATCH}
+
+    def run(cache):
+        plan = BatchPlan(records, rule, cache)
+        steps = []
+        start = time.perf_counter()
+        while not plan.done():
+            step_start = time.perf_counter()
+            plan.step()
+            steps.append(time.perf_counter() - step_start)
+        plan.summary()
+        return time.perf_counter() - start, max(steps)
+
+    cold = [run({}) for _ in range(args.repeat)]
+    results.add(f'planner.{count}.total_ms', statistics.median(t for t, _ in cold) * 1000, 'ms', **params)
+    results.add(f'planner.{count}.max_step_ms', statistics.median(m for _, m in cold) * 1000, 'ms', **params)
+    # Sadece seçim değiştiğinde plan önbellekten gelir
+    cache = {}
+    run(cache)
+    results.add(f'planner.{count}.cached_total_ms', repeat(args.repeat, lambda: run(cache)[0]) * 1000, 'ms',
+                **params)
+
+
+BENCHMARKS = ('info', 'playlist', 'lookups', 'download', 'retries', 'progress', 'table', 'thumbnails', 'memory',
+              'planner')
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'time': round(time.time(), 3),
+        'commit': commit,
+        'python': platform.python_version(),
+        'yt_dlp': yt_dlp.version.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(current, baseline, tolerance):
+    # better yönünde tolerans dışına düşen ölçümler gerileme sayılır
+    previous = {item['name']: item for item in baseline.get('results', [])}
+    regressions = []
+    for item in current:
+        old = previous.get(item['name'])
+        if old is None or not old['value']:
+            continue
+        change = (item['value'] - old['value']) / old['value']
+        worse = change > tolerance if item['better'] == 'lower' else change < -tolerance
+        print(f"  {item['name']:<36} {old['value']:>12.3f} -> {item['value']:>12.3f} {item['unit']:<9} "
+              f"{change:+7.1%}{'  GERİLEME' if worse else ''}", file=sys.stderr)
+        if worse:
+            regressions.append(dict(item, baseline=old['value'], change=round(change, 4)))
+    return regressions
+
+
+def sizes(value):
+    return [int(size) for size in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çevrimdışı performans ölçüm takımı (JSON çıktı)")
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help=f"Çalıştırılacak ölçümler ({','.join(BENCHMARKS)})")
+    parser.add_argument('--repeat', type=int, default=3, help="Ölçüm başına tekrar (ortanca alınır)")
+    parser.add_argument('--info-runs', type=int, default=50)
+    parser.add_argument('--playlist-sizes', type=sizes, default=[100, 1000, 10000])
+    parser.add_argument('--lookups', type=int, default=400, help="Toplu aramada URL sayısı")
+    parser.add_argument('--lookup-concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=int, default=20, help="Sayfa isteği gecikmesi (ms)")
+    parser.add_argument('--connect-latency', type=int, default=50, help="Yeni bağlantı kurma gecikmesi (ms)")
+    parser.add_argument('--media-size', type=int, default=16, help="İndirilen sentetik dosya boyutu (MB)")
+    parser.add_argument('--download-jobs', type=int, default=4)
+    parser.add_argument('--segments', type=int, default=4)
+    parser.add_argument('--fault-rate', type=float, default=0.2, help="Hatayla reddedilen istek oranı")
+    parser.add_argument('--outage', type=int, default=2000, help="Sunucu kesintisi süresi (ms)")
+    parser.add_argument('--progress-jobs', type=int, default=8)
+    parser.add_argument('--progress-events', type=int, default=5000)
+    parser.add_argument('--table-sizes', type=sizes, default=[1000, 10000])
+    parser.add_argument('--thumbnail-rows', type=int, default=5000)
+    parser.add_argument('--thumbnail-stops', type=int, default=20, help="Kaydırmada durulan ekran sayısı")
+    parser.add_argument('--thumbnail-memory', type=int, default=2, help="Önizleme bellek önbelleği (MB)")
+    parser.add_argument('--memory-entries', type=int, default=10000)
+    parser.add_argument('--plan-entries', type=int, default=10000, help="Planlanan girdi sayısı")
+    parser.add_argument('-o', '--output', help="Sonuç dosyası (varsayılan: stdout)")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Gerileme eşiği (oran)")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Bilinmeyen ölçüm: {', '.join(sorted(unknown))}")
+
+    server = fake_site.install(args.media_size * 1024 * 1024, latency=args.latency / 1000,
+                               connect_latency=args.connect_latency / 1000)
+    app = QApplication(sys.argv)
+    results = Results()
+    for name in selected:
+        print(f"{name}:", file=sys.stderr)
+        if name in ('progress', 'table', 'thumbnails'):
+            globals()[f'bench_{name}'](args, results, app)
+        else:
+            globals()[f'bench_{name}'](args, results)
+    server.shutdown()
+
+    report = {'version': RESULT_VERSION, 'meta': metadata(), 'results': results.items}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("Karşılaştırma:", file=sys.stderr)
+        report['regressions'] = compare(results.items, baseline, args.tolerance)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
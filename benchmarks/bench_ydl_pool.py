@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import argparse
+import yt_dlp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine import YoutubeDLPool
+
+# Ağa çıkmadan, her iş başında ödenen sabit kurulum maliyetini ölçer:
+# YoutubeDL oluşturma, açıcı kurulumu ve YouTube çıkarıcısının hazırlanması.
+OPTS = {
+    'ignoreerrors': True,
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': 'in_playlist',
+    'skip_download': True,
+}
+
+
+def fresh_setup(jobs):
+    start = time.perf_counter()
+    for i in range(jobs):
+        with yt_dlp.YoutubeDL(dict(OPTS, format=f'{i % 3 + 18}')) as ydl:
+            ydl._request_director
+            ydl.get_info_extractor('Youtube')
+    return time.perf_counter() - start
+
+
+def pooled_setup(jobs):
+    pool = YoutubeDLPool()
+    pool.warm(OPTS)
+    start = time.perf_counter()
+    for i in range(jobs):
+        with pool.checkout(dict(OPTS, format=f'{i % 3 + 18}')) as ydl:
+            ydl._request_director
+            ydl.get_info_extractor('Youtube')
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YoutubeDL havuzu kurulum süresi ölçümü")
+    parser.add_argument('--jobs', type=int, default=200)
+    args = parser.parse_args()
+
+    fresh = fresh_setup(args.jobs)
+    pooled = pooled_setup(args.jobs)
+    print(f"İş sayısı: {args.jobs}")
+    print(f"Her iş için yeni örnek : {fresh / args.jobs * 1000:8.3f} ms/iş")
+    print(f"Havuzdan örnek         : {pooled / args.jobs * 1000:8.3f} ms/iş")
+    print(f"İş başına kazanç       : {(fresh - pooled) / args.jobs * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
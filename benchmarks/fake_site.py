@@ -0,0 +1,156 @@
+import os
+import sys
+import zlib
+import base64
+import struct
+import random
+from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.globals import extractors as extractor_registry
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_segmented import start_server
+
+# Ağa çıkmadan ölçüm için sahte site: fakebench://video/<id> ve fakebench://playlist/<sayı>
+# adresleri, YouTube'a benzeyen sentetik bilgi sözlükleri döndürür. Format URL'leri yerel
+# HTTP sunucusundaki üretilmiş medyayı gösterir. fakebench://page/<id> bilgiyi döndürmeden önce
+# yerel sunucudan bir video sayfası indirir (ağ üzerinden bilgi almayı taklit eder).
+VIDEO_HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+VIDEO_CODECS = (('avc1.64001F', 'mp4'), ('vp09.00.40.08', 'webm'), ('av01.0.08M.08', 'mp4'))
+AUDIO_FORMATS = (('mp4a.40.5', 'm4a', 48), ('mp4a.40.2', 'm4a', 128), ('opus', 'webm', 70), ('opus', 'webm', 160))
+# Playlist girdileri YouTube'daki devam (continuation) istekleri gibi sayfa sayfa, her sayfa için
+# yerel sunucudan bir istek yapılarak üretilir
+PLAYLIST_PAGE = 100
+
+# Girdilerin önizleme görüntüsü (YouTube'daki 168x94 küçük resim boyutu)
+THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT = 168, 94
+
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-us,en;q=0.5',
+    'Sec-Fetch-Mode': 'navigate',
+}
+
+
+def signed_url(media_url, video_id, format_id, rng):
+    # YouTube format URL'leri gibi uzun, imzalı sorgu dizgisi (sunucu sorguyu yok sayar)
+    token = base64.urlsafe_b64encode(rng.randbytes(450)).decode()
+    return (f'{media_url}?v={video_id}&f={format_id}&expire=4102444800&ei={token[:24]}&ip=127.0.0.1'
+            f'&id=o-{token[24:68]}&itag={format_id}&source=youtube&requiressl=yes&mime=video%2Fmp4'
+            f'&sparams=expire%2Cei%2Cip%2Cid%2Citag%2Csource%2Crequiressl&sig={token[68:]}')
+
+
+def fake_png(width, height, seed=0):
+    # Sıkıştırılabilir gürültülü RGB görüntü (gerçek küçük resimlere yakın boyutta), saf Python ile
+    rng = random.Random(seed)
+    rows = b''.join(b'\x00' + bytes(rng.randrange(0, 256, 16) for _ in range(width * 3)) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def fake_format(media_url, video_id, rng, **fields):
+    fmt = {
+        'url': signed_url(media_url, video_id, fields['format_id'], rng),
+        'protocol': 'http', 'http_headers': dict(HTTP_HEADERS), 'has_drm': False, 'source_preference': -1,
+        'downloader_options': {'http_chunk_size': 10485760}, 'format_note': fields.get('format_note', ''),
+        **fields,
+    }
+    fmt['format'] = f"{fmt['format_id']} - {fmt.get('height') or 'audio only'} ({fmt['format_note']})"
+    return fmt
+
+
+def fake_formats(video_id, media_url, size):
+    rng = random.Random(video_id)
+    formats = []
+    # Önizleme (storyboard) formatları: her biri uzun bir fragman listesi taşır
+    for index, rows in enumerate((10, 30, 60)):
+        formats.append(fake_format(
+            media_url, video_id, rng, format_id=f'sb{index}', ext='mhtml', protocol='mhtml', vcodec='none',
+            acodec='none', format_note='storyboard', rows=rows, columns=rows,
+            fragments=[{'url': signed_url(media_url, video_id, f'sb{index}-{i}', rng), 'duration': 10.0}
+                       for i in range(10)]))
+    for codec, ext, abr in AUDIO_FORMATS:
+        formats.append(fake_format(
+            media_url, video_id, rng, format_id=f'a{len(formats)}', ext=ext, vcodec='none', acodec=codec,
+            abr=abr, tbr=abr, filesize=size // 8, format_note='medium', audio_ext=ext, video_ext='none'))
+    for height in VIDEO_HEIGHTS:
+        for codec, ext in VIDEO_CODECS:
+            formats.append(fake_format(
+                media_url, video_id, rng, format_id=f'v{height}{ext}{codec[:2]}', ext=ext, vcodec=codec,
+                acodec='none', height=height, width=height * 16 // 9, fps=30, tbr=height * 3, filesize=size,
+                format_note=f'{height}p', video_ext=ext, audio_ext='none', dynamic_range='SDR'))
+    # Tek dosyada ses + görüntü (YouTube'daki 18 numaralı format gibi); indirme ölçümü bunu seçer
+    formats.append(fake_format(
+        media_url, video_id, rng, format_id='18', ext='mp4', vcodec='avc1.42001E', acodec='mp4a.40.2',
+        height=360, width=640, tbr=500, filesize=size, format_note='360p'))
+    return formats
+
+
+class FakeBenchIE(InfoExtractor):
+    IE_NAME = 'fakebench'
+    _VALID_URL = r'fakebench://(?P<kind>video|playlist|page)/(?P<id>[^/?#]+)'
+    media_url = None
+    page_url = None
+    thumbnail_url = None
+    media_size = 0
+    server = None
+
+    def _real_extract(self, url):
+        kind, item_id = self._match_valid_url(url).group('kind', 'id')
+        if kind == 'playlist':
+            count = int(item_id)
+            return self.playlist_result(self._entries(count), item_id, f'Sentetik playlist ({count})')
+        title = f'Sentetik video {item_id}'
+        if kind == 'page':
+            webpage = self._download_webpage(f'{self.page_url}/{item_id}', item_id)
+            title = self._html_extract_title(webpage)
+        return {
+            'id': item_id,
+            'title': title,
+            'duration': 600,
+            'webpage_url': url,
+            'thumbnail': f'{self.thumbnail_url}/{item_id}.png',
+            'formats': fake_formats(item_id, self.media_url, self.media_size),
+        }
+
+    def _entries(self, count):
+        rng = random.Random(count)
+        for start in range(0, count, PLAYLIST_PAGE):
+            self._download_webpage(f'{self.page_url}/p{count}-{start // PLAYLIST_PAGE}', f'p{count}', note=False)
+            for i in range(start, min(start + PLAYLIST_PAGE, count)):
+                yield self.url_result(f'fakebench://video/p{count}v{i}', FakeBenchIE, f'p{count}v{i}',
+                                      f'Sentetik video {i}', duration=rng.randint(30, 3600),
+                                      thumbnails=[{'url': f'{self.thumbnail_url}/p{count}v{i}.png',
+                                                   'width': THUMBNAIL_WIDTH, 'height': THUMBNAIL_HEIGHT}])
+
+
+def register(base_url, media_size):
+    # Sahte çıkarıcıyı listenin başına ekler; base_url zaten çalışan bir medya sunucusudur
+    # (ör. başka bir süreçte install() ile başlatılmış)
+    import_extractors()
+    registry = extractor_registry.value
+    existing = dict(registry)
+    registry.clear()
+    registry['FakeBenchIE'] = FakeBenchIE
+    registry.update(existing)
+    FakeBenchIE.media_url = f"{base_url}/media.mp4"
+    FakeBenchIE.page_url = f"{base_url}/page"
+    FakeBenchIE.thumbnail_url = f"{base_url}/thumb"
+    FakeBenchIE.media_size = media_size
+
+
+def install(media_size=16 * 1024 * 1024, rate=1024 ** 3, latency=0, connect_latency=0):
+    # Sahte çıkarıcıyı kaydeder ve medya sunucusunu başlatır (saniye başı sınır: rate;
+    # latency sayfa isteği, connect_latency yeni bağlantı başına gecikme)
+    media = random.Random(0).randbytes(media_size)
+    server = start_server(media, rate, 512 * 1024, latency, connect_latency)
+    register(f"http://127.0.0.1:{server.server_address[1]}", media_size)
+    server.thumbnail = fake_png(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+    FakeBenchIE.server = server
+    return server
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+from utils import app_data_dir
+
+# Formatlardan sadece arayüzün ve indirmenin ihtiyaç duyduğu alanları sakla
+FORMAT_FIELDS = ('format_id', 'ext', 'height', 'vcodec', 'acodec', 'vbr', 'abr', 'tbr',
+                 'filesize', 'filesize_approx', 'protocol', 'url')
+
+
+def slim_formats(formats):
+    return [{k: f.get(k) for k in FORMAT_FIELDS if f.get(k) is not None} for f in formats or []]
+
+
+def formats_expire_time(formats, default_ttl, now=None):
+    # YouTube format URL'leri "expire=<unix zamanı>" parametresi taşır
+    now = now or time.time()
+    expires = now + default_ttl
+    for f in formats or []:
+        url = f.get('url')
+        if not url:
+            continue
+        value = parse_qs(urlparse(url).query).get('expire')
+        if value:
+            try:
+                # Süre dolmadan biraz önce yenilenmiş say
+                expires = min(expires, float(value[0]) - 300)
+            except ValueError:
+                pass
+    return expires
+
+
+class MetadataCache:
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024, info_ttl=7 * 24 * 3600,
+                 formats_ttl=5 * 3600, playlist_ttl=3600):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.path.join(app_data_dir(), 'metadata_cache.sqlite3')
+        self.max_bytes = max_bytes
+        self.info_ttl = info_ttl
+        self.formats_ttl = formats_ttl
+        self.playlist_ttl = playlist_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                formats TEXT,
+                info_expires REAL NOT NULL,
+                formats_expires REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access)")
+        self.conn.commit()
+
+    def get(self, key, now=None):
+        # Dönüş: (video_info, formats_stale) ya da kayıt yoksa/bilgi eskiyse None
+        now = now or time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT info, formats, info_expires, formats_expires FROM entries WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            info, formats, info_expires, formats_expires = row
+            if info_expires <= now:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+
+        video_info = json.loads(info)
+        if formats is not None:
+            video_info['formats'] = json.loads(formats)
+        return video_info, formats_expires <= now
+
+    def put(self, key, video_info, ttl=None, now=None):
+        now = now or time.time()
+        info = dict(video_info)
+        formats = info.pop('formats', None)
+        info_blob = json.dumps(info, ensure_ascii=False)
+        if formats is not None:
+            formats = slim_formats(formats)
+            formats_blob = json.dumps(formats, ensure_ascii=False)
+            formats_expires = formats_expire_time(formats, self.formats_ttl, now)
+        else:
+            formats_blob = None
+            formats_expires = now + (ttl or self.info_ttl)
+
+        size = len(info_blob) + len(formats_blob or '')
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, info_blob, formats_blob, now + (ttl or self.info_ttl), formats_expires, now, size))
+            self._evict()
+            self.conn.commit()
+
+    def update_formats(self, key, formats, fields, now=None):
+        # Bilgi kısmına dokunmadan sadece süresi dolan format kısmını yenile
+        now = now or time.time()
+        formats = slim_formats(formats)
+        formats_blob = json.dumps(formats, ensure_ascii=False)
+        with self.lock:
+            row = self.conn.execute("SELECT info FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            info = json.loads(row[0])
+            # Formatlardan türetilen alanlar (kalite listeleri, format merdiveni)
+            info.update(fields)
+            info_blob = json.dumps(info, ensure_ascii=False)
+            self.conn.execute(
+                "UPDATE entries SET info = ?, formats = ?, formats_expires = ?, last_access = ?, size = ? "
+                "WHERE key = ?",
+                (info_blob, formats_blob, formats_expire_time(formats, self.formats_ttl, now), now,
+                 len(info_blob) + len(formats_blob), key))
+            self._evict()
+            self.conn.commit()
+        return True
+
+    def invalidate(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.commit()
+
+    def _evict(self):
+        # Toplam boyut sınırı aşılırsa en uzun süredir kullanılmayan kayıtları sil
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        self.logger.debug("Önbellekten %s kayıt çıkarıldı", removed)
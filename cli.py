@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import argparse
+import threading
+from engine import DownloadEngine
+from progress import ProgressAggregator
+from postprocess import default_output
+from storage import MIN_FREE
+from metrics import metrics, MetricsServer
+from utils import start_queue_logging
+
+# Çıkış kodları
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+FORMATS = {
+    'video': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+    'audio': 'bestaudio/best',
+}
+
+
+def parse_rate(value):
+    # "500K", "2M", "1.5G" ya da bayt/saniye cinsinden sayı
+    if value is None:
+        return None
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    value = value.strip().upper()
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Geçersiz hız değeri: {value}")
+
+
+def read_jobs(path, default_format):
+    # Her satır: URL [format]; boş satırlar ve # ile başlayanlar atlanır
+    stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    jobs = []
+    with stream:
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(None, 1)
+            fmt = parts[1].strip() if len(parts) > 1 else default_format
+            jobs.append((parts[0], FORMATS.get(fmt, fmt)))
+    return jobs
+
+
+class JsonReporter:
+    # Her olay stdout'a tek satırlık JSON olarak yazılır; ilerleme progress_rate ile birleştirilir
+    def __init__(self, stream=sys.stdout, progress=True, progress_rate=2):
+        self.stream = stream
+        self.progress = ProgressAggregator(progress_rate) if progress else None
+        self.lock = threading.Lock()
+        self.states = {}
+        self.stopped = threading.Event()
+
+    def run_ticker(self):
+        while not self.stopped.wait(self.progress.interval):
+            batch = self.progress.tick()
+            if batch is not None:
+                self.write('progress', **batch)
+
+    def write(self, event, **data):
+        line = json.dumps(dict(data, event=event, time=round(time.time(), 3)), ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def __call__(self, event, data):
+        if event == 'job':
+            self.states[data['key']] = data['state']
+            if self.progress and data['state'] not in ('queued', 'running'):
+                self.progress.finish(data['key'])
+            self.write('job', **data)
+        elif event in ('postprocess', 'storage'):
+            self.write(event, **data)
+        elif event == 'download_progress' and self.progress:
+            self.progress.update(data['key'], data['filename'], data['downloaded'], data['total'])
+
+    def summary(self):
+        states = list(self.states.values())
+        return {state: states.count(state) for state in set(states)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description="YouTube Video İndirici - arayüzsüz toplu indirme")
+    parser.add_argument('url_file', help="URL listesi dosyası (stdin için -)")
+    parser.add_argument('-f', '--format', default='video',
+                        help="Varsayılan format: video, audio ya da yt-dlp format ifadesi")
+    parser.add_argument('--audio-output', choices=['native', 'mp3', 'm4a', 'opus'], default='mp3',
+                        help="Ses indirmelerinin çıktısı; native akışı yeniden kodlamadan kaydeder")
+    parser.add_argument('-o', '--output', default=os.getcwd(), help="İndirme klasörü")
+    parser.add_argument('-j', '--jobs', type=int, default=3, help="Eş zamanlı indirme sayısı")
+    parser.add_argument('-s', '--segments', type=int, default=4,
+                        help="Dosya başına bağlantı sayısı (HTTP parçaları / DASH-HLS fragmanları)")
+    parser.add_argument('--rate-limit', type=parse_rate, help="Toplam hız sınırı (ör. 2M)")
+    parser.add_argument('--job-rate-limit', type=parse_rate, help="İş başına hız sınırı (ör. 500K)")
+    parser.add_argument('--connections-per-host', type=int, default=16,
+                        help="Ana makine başına en fazla bağlantı (paylaşılan bağlantı havuzu)")
+    parser.add_argument('--no-pool', action='store_true',
+                        help="Paylaşılan bağlantı havuzunu kapat, yt-dlp'nin kendi HTTP işleyicisini kullan")
+    parser.add_argument('--min-free', type=parse_rate, default=MIN_FREE,
+                        help="Hedef diskte boş bırakılacak alan (ör. 1G); sığmayan işler ertelenir/reddedilir")
+    parser.add_argument('--journal', help="İş günlüğü dosyası; verilirse yarım kalan işler sürdürülür")
+    parser.add_argument('--history', help="İndirme geçmişi veritabanı (varsayılan: uygulama veri klasörü)")
+    parser.add_argument('--no-history', action='store_true', help="Geçmişi kullanma ve güncelleme")
+    parser.add_argument('--force', action='store_true', help="Geçmişte olsa bile yeniden indir")
+    parser.add_argument('--no-progress', action='store_true', help="İlerleme olaylarını yazdırma")
+    parser.add_argument('--progress-rate', type=float, default=2, help="Saniyedeki ilerleme satırı sayısı")
+    parser.add_argument('--metrics-port', type=int, help="Metrikleri http://127.0.0.1:<port>/metrics adresinden yayınla")
+    parser.add_argument('--metrics-json', help="Bitişte metriklerin JSON anlık görüntüsünü bu dosyaya yaz")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Ayrıntılı günlük (stderr)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    start_queue_logging([console], logging.DEBUG if args.verbose else logging.WARNING)
+
+    try:
+        jobs = read_jobs(args.url_file, args.format)
+    except OSError as e:
+        print(f"URL dosyası okunamadı: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    os.makedirs(args.output, exist_ok=True)
+
+    engine = DownloadEngine(max_concurrent_downloads=args.jobs, global_rate_limit=args.rate_limit,
+                            use_cache=False, journal_path=args.journal, persist_journal=bool(args.journal),
+                            segments=args.segments, use_history=not args.no_history, history_path=args.history,
+                            async_io=not args.no_pool, connections_per_host=args.connections_per_host,
+                            min_free_space=args.min_free)
+    metrics_server = MetricsServer(args.metrics_port) if args.metrics_port is not None else None
+    reporter = JsonReporter(progress=not args.no_progress, progress_rate=args.progress_rate)
+    engine.subscribe(reporter)
+    if reporter.progress:
+        threading.Thread(target=reporter.run_ticker, daemon=True).start()
+
+    restored = engine.restore_jobs() if args.journal else 0
+    if not jobs and not restored:
+        print("İndirilecek URL bulunamadı", file=sys.stderr)
+        return EXIT_USAGE
+    for url, format_id in jobs:
+        output = 'video' if default_output(format_id) == 'video' else args.audio_output
+        engine.download(url, format_id, args.output, rate_limit=args.job_rate_limit, output=output, force=args.force)
+
+    interrupted = threading.Event()
+
+    def on_interrupt(signum, frame):
+        # Yarım kalan işleri duraklat; günlük verildiyse bir sonraki çalıştırmada sürer
+        interrupted.set()
+        for key in engine.active_jobs():
+            engine.pause_job(key)
+
+    signal.signal(signal.SIGINT, on_interrupt)
+    signal.signal(signal.SIGTERM, on_interrupt)
+
+    while not engine.wait(timeout=0.5):
+        pass
+    engine.shutdown()
+    reporter.stopped.set()
+    if metrics_server is not None:
+        metrics_server.close()
+    if args.metrics_json:
+        metrics.write_snapshot(args.metrics_json)
+
+    summary = reporter.summary()
+    reporter.write('summary', **summary)
+    if interrupted.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if summary.get('failed') else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
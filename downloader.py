@@ -1,7 +1,14 @@
-import os
+import uuid
 import logging
-import yt_dlp
-from PyQt6.QtCore import QObject, pyqtSignal, QRunnable, QThreadPool
+import sqlite3
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from engine import DownloadEngine, get_available_formats
+from jobqueue import open_queue, POLL_INTERVAL, QUEUED, LEASED, PAUSED, ACTIVE_STATES
+from progress import ProgressAggregator
+from metrics import metrics
+from utils import canonical_id
+
 
 class WorkerSignals(QObject):
     finished = pyqtSignal()
@@ -9,273 +16,331 @@ class WorkerSignals(QObject):
     result = pyqtSignal(object)
     progress = pyqtSignal(str, int, int, object)
 
-class DownloadWorker(QRunnable):
-    def __init__(self, url, ydl_opts):
-        super().__init__()
-        self.url = url
-        self.ydl_opts = ydl_opts
-        self.signals = WorkerSignals()
-        self.logger = logging.getLogger(__name__)
 
-    def run(self):
-        try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                self.logger.info(f"İndirme başlatılıyor: {self.url}")
-                ydl.download([self.url])
-            self.signals.finished.emit()
-            self.logger.info(f"İndirme tamamlandı: {self.url}")
-        except Exception as e:
-            self.logger.error(f"İndirme hatası: {str(e)}, URL: {self.url}")
-            self.signals.error.emit(str(e))
+class InfoFlight:
+    # Aynı video/playlist için süren tek bilgi alma görevi. Olaylar bağlı tüm çağıranların
+    # sinyallerine iletilir; sonradan katılana o ana kadarki olaylar sırasıyla yeniden oynatılır.
+    def __init__(self, key, refresh):
+        self.key = key
+        self.refresh = refresh
+        self.task = None
+        self.lock = threading.Lock()
+        self.events = []
+        self.subscribers = []
+        # Katılmış ama sinyallerine henüz bağlanılmamış çağıranlar (bkz. create_request)
+        self.joining = set()
+
+    def emit(self, kind, *args):
+        with self.lock:
+            self.events.append((kind, args))
+            for signals in self.subscribers:
+                getattr(signals, kind).emit(*args)
+
+    def attach(self, signals):
+        with self.lock:
+            if signals not in self.joining:
+                # Bağlanmadan önce iptal edildi
+                return
+            self.joining.discard(signals)
+            for kind, args in self.events:
+                getattr(signals, kind).emit(*args)
+            self.subscribers.append(signals)
+
+    def detach(self, signals):
+        # Son çağıran da ayrıldıysa görev iptal edilir
+        with self.lock:
+            self.joining.discard(signals)
+            if signals in self.subscribers:
+                self.subscribers.remove(signals)
+            idle = not self.subscribers and not self.joining
+        if idle:
+            self.task.cancel()
+
+
+class InfoRequest:
+    # Bilgi alma görevinin arayüz tarafındaki tutamacı; görev başka isteklerle paylaşılıyor olabilir
+    def __init__(self, flight, signals):
+        self.flight = flight
+        self.task = flight.task
+        self.signals = signals
+
+    def cancel(self):
+        self.flight.detach(self.signals)
+
 
 class YouTubeDownloader(QObject):
+    # DownloadEngine olaylarını Qt sinyallerine çeviren ince katman
     progress_signal = pyqtSignal(str, int, int, object)
-    download_progress_signal = pyqtSignal(str, float, float)
-
-    def __init__(self):
+    progress_batch_signal = pyqtSignal(object)
+    entry_resolved_signal = pyqtSignal(str, object)
+    entry_failed_signal = pyqtSignal(str, str)
+    queue_stats_signal = pyqtSignal(int, int)
+    job_state_signal = pyqtSignal(str, str)
+    postprocess_signal = pyqtSignal(str, float, float)
+    history_signal = pyqtSignal(object)
+
+    def __init__(self, progress_rate=10, engine=None, **engine_options):
         super().__init__()
         self.logger = logging.getLogger(__name__)
-        self.ydl_opts = {
-            'ignoreerrors': True,
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': 'in_playlist',
-            'skip_download': True,
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-        }
-
-        self.thread_pool = QThreadPool()
-        self.logger.info(f"Multithreading with maximum {self.thread_pool.maxThreadCount()} threads")
-
-    def get_video_info(self, url):
-        self.logger.info(f"Fetching video info for URL: {url}")
-        worker = VideoInfoWorker(url, self.ydl_opts, self.get_available_formats)
-        worker.signals.progress.connect(self.progress_signal.emit)
-        worker.signals.finished.connect(self.on_worker_finished)
-        worker.signals.error.connect(self.on_worker_error)
-        self.thread_pool.start(worker)
-        return worker
-
-    def get_playlist_info(self, url):
-        self.logger.info(f"Fetching playlist info for URL: {url}")
-        worker = PlaylistInfoWorker(url, self.ydl_opts, self.get_available_formats)
-        worker.signals.progress.connect(self.progress_signal.emit)
-        worker.signals.finished.connect(self.on_worker_finished)
-        worker.signals.error.connect(self.on_worker_error)
-        self.thread_pool.start(worker)
-        return worker
+        # Hazır (arka planda kurulup ısıtılmış) bir motor verilebilir
+        if engine is None:
+            engine = DownloadEngine(**engine_options)
+            engine.warm_up()
+        self.engine = engine
+        self.engine.subscribe(self.on_engine_event)
+        self.scheduler = self.engine.scheduler
+        # Süren bilgi alma görevleri (tür, kanonik kimlik) -> InfoFlight
+        self.flights = {}
+        self.flights_lock = threading.Lock()
+
+        # Parça başına gelen ilerleme olayları birleştirilir, arayüze tick başına tek sinyal gider
+        self.progress = ProgressAggregator(progress_rate)
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(int(self.progress.interval * 1000))
+        self.progress_timer.timeout.connect(self.emit_progress_batch)
+        self.progress_timer.start()
+
+    def emit_progress_batch(self):
+        batch = self.progress.tick()
+        if batch is not None:
+            self.progress_batch_signal.emit(batch)
+
+    def on_engine_event(self, event, data):
+        # İşçi iş parçacıklarından çağrılır; sinyaller arayüz iş parçacığına kuyruklanır
+        if event == 'status':
+            self.progress_signal.emit(data['message'], data['current'], data['total'], None)
+        elif event == 'download_progress':
+            self.progress.update(data['key'], data['filename'], data['downloaded'], data['total'])
+        elif event == 'entry_resolved':
+            self.entry_resolved_signal.emit(data['key'], data['info'])
+        elif event == 'entry_failed':
+            self.entry_failed_signal.emit(data['key'], data['error'])
+        elif event == 'queue':
+            self.queue_stats_signal.emit(data['queued'], data['running'])
+        elif event == 'postprocess':
+            self.postprocess_signal.emit(data['filename'], data['wait'], data['elapsed'])
+        elif event == 'job':
+            if data['state'] not in ('queued', 'running'):
+                self.progress.finish(data['key'])
+            self.job_state_signal.emit(data['key'], data['state'])
+        elif event == 'history':
+            self.history_signal.emit(data['entry'])
+
+    def create_request(self, kind, fetch, url, refresh):
+        signals = WorkerSignals()
+        signals.finished.connect(self.on_worker_finished)
+        signals.error.connect(self.on_worker_error)
+        key = (kind, canonical_id(url))
+        with self.flights_lock:
+            flight = self.flights.get(key)
+            # Yenileme isteği, önbellekten cevaplanıyor olabilecek bir göreve katılmaz
+            if flight is not None and (flight.refresh or not refresh) and not flight.task.cancelled.is_set():
+                flight.joining.add(signals)
+                joined = True
+            else:
+                flight = self.flights[key] = InfoFlight(key, refresh)
+                flight.subscribers.append(signals)
+                flight.task = fetch(url, refresh, lambda kind, *args: self.on_flight_event(flight, kind, *args),
+                                    start=False)
+                joined = False
+        # Çağıran sinyallere bağlandıktan sonra, olay döngüsünün bir sonraki turunda görev başlar
+        # ya da mevcut göreve katılınır
+        if joined:
+            self.logger.info("Aynı bilgi alma işlemi sürüyor, mevcut göreve bağlanıldı: %s", url)
+            metrics.inc('ytdl_deduplicated_total', kind=kind)
+            QTimer.singleShot(0, lambda: flight.attach(signals))
+        else:
+            QTimer.singleShot(0, lambda: self.engine.start_task(flight.task))
+        return InfoRequest(flight, signals)
+
+    def on_flight_event(self, flight, kind, *args):
+        if kind == 'finished':
+            # Biten görev yeni isteklere kapanır; katılmakta olanlar kayıtlı olayları yine alır
+            with self.flights_lock:
+                if self.flights.get(flight.key) is flight:
+                    del self.flights[flight.key]
+        flight.emit(kind, *args)
+
+    def get_video_info(self, url, refresh=False):
+        return self.create_request('video_info', self.engine.fetch_video_info, url, refresh)
+
+    def get_playlist_info(self, url, refresh=False):
+        return self.create_request('playlist_info', self.engine.fetch_playlist_info, url, refresh)
+
+    def resolve_entry(self, key, url, priority=0):
+        return self.engine.resolve_entry(key, url, priority)
+
+    def cancel_pending_resolves(self):
+        self.engine.cancel_pending_resolves()
 
     def on_worker_finished(self):
         self.logger.info("Worker finished successfully")
         self.progress_signal.emit("İşlem tamamlandı", 100, 100, None)
 
     def on_worker_error(self, error):
-        self.logger.error(f"Worker encountered an error: {error}")
+        self.logger.error("Worker encountered an error: %s", error)
         self.progress_signal.emit(f"Hata oluştu: {error}", 0, 100, None)
 
     def get_available_formats(self, info):
-        video_formats = []
-        audio_formats = []
-        seen_resolutions = set()
-
-        for f in info.get('formats', []):
-            if f.get('vcodec', 'none') != 'none' and f.get('acodec', 'none') != 'none':
-                height = f.get('height', 0)
-                format_id = f.get('format_id', 'unknown')
-                vbr = f.get('vbr', 0)
-                format_note = f"{height}p"
-
-                if format_note not in seen_resolutions:
-                    video_formats.append((format_note, format_id, vbr))
-                    seen_resolutions.add(format_note)
-                else:
-                    for i, (res, fid, old_vbr) in enumerate(video_formats):
-                        if res == format_note and vbr > old_vbr:
-                            video_formats[i] = (format_note, format_id, vbr)
-                            break
-
-            if f.get('acodec', 'none') != 'none' and f.get('vcodec') == 'none':
-                abr = f.get('abr', 0)
-                format_id = f.get('format_id', 'unknown')
-                audio_formats.append((f"{abr}kbps", format_id))
-
-        video_formats = sorted(video_formats, key=lambda x: int(x[0].split('p')[0]), reverse=True)
-        video_formats = [(f"{res} ({vbr:.1f}Mbps)", fid) for res, fid, vbr in video_formats]
-
-        audio_formats = sorted(set(audio_formats), key=lambda x: float(x[0].split('kbps')[0]), reverse=True)
-
-        video_formats.insert(0, ("En İyi Kalite", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best"))
-
-        return video_formats, audio_formats
-
-    def download_video(self, url, format_id, output_path):
-        self.logger.info(f"Starting download: URL={url}, format_id={format_id}, output_path={output_path}")
-
-        ydl_opts = {
-            'format': format_id,
-            'outtmpl': os.path.join(output_path, '%(title)s.%(ext)s'),
-            'progress_hooks': [self.progress_hook],
-        }
-
-        if 'audio' in format_id.lower():
-            ydl_opts['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }]
-        else:
-            ydl_opts['postprocessors'] = [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }]
-
-        worker = DownloadWorker(url, ydl_opts)
-        worker.signals.progress.connect(self.download_progress_signal.emit)
-        worker.signals.finished.connect(self.on_download_finished)
-        worker.signals.error.connect(self.on_download_error)
-        self.thread_pool.start(worker)
-
-    def progress_hook(self, d):
-        if d['status'] == 'downloading':
-            downloaded = d.get('downloaded_bytes', 0)
-            total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-            filename = os.path.basename(d.get('filename', ''))
-            self.download_progress_signal.emit(filename, downloaded, total)
-
-    def on_download_finished(self):
-        self.logger.info("Download finished")
-        self.progress_signal.emit("İndirme tamamlandı", 100, 100, None)
-
-    def on_download_error(self, error):
-        self.logger.error(f"Download error: {error}")
-        self.progress_signal.emit(f"İndirme hatası: {error}", 0, 100, None)
-
-class VideoInfoWorker(QRunnable):
-    def __init__(self, url, ydl_opts, get_available_formats):
-        super().__init__()
-        self.url = url
-        self.ydl_opts = ydl_opts
-        self.get_available_formats = get_available_formats
-        self.signals = WorkerSignals()
-        self.logger = logging.getLogger(__name__)
+        return get_available_formats(info)
 
-    def run(self):
-        try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                self.signals.progress.emit("Video bilgileri alınıyor...", 0, 100, None)
-                info = ydl.extract_info(self.url, download=False)
-                if info is None:
-                    raise ValueError("Video bilgisi alınamadı.")
-                self.process_info(info)
-        except Exception as e:
-            self.logger.error(f"Video bilgisi alınırken hata oluştu: {str(e)}")
-            self.signals.error.emit(str(e))
-        finally:
-            self.signals.finished.emit()
-
-    def process_info(self, info):
-        try:
-            self.logger.debug("Video bilgileri işleniyor...")
-            video_formats, audio_formats = self.get_available_formats(info)
-            video_info = {
-                'title': info.get('title', 'Başlık Alınamadı'),
-                'duration_string': info.get('duration_string', '00:00'),
-                'video_formats': video_formats,
-                'audio_formats': audio_formats,
-                'webpage_url': info.get('webpage_url'),
-                'formats': info.get('formats', []),
-            }
-            self.logger.debug(f"İşlenmiş video bilgileri: {video_info}")
-            self.signals.progress.emit("Video bilgileri alındı.", 100, 100, video_info)
-        except Exception as e:
-            self.logger.error(f"Video bilgisi işlenirken hata: {str(e)}")
-            self.signals.error.emit(f"Video bilgisi işlenirken hata: {str(e)}")
-
-    @staticmethod
-    def format_duration(seconds):
-        if seconds is None:
-            return "00:00"
-        try:
-            seconds = int(float(seconds))
-            minutes, seconds = divmod(seconds, 60)
-            hours, minutes = divmod(minutes, 60)
-            if hours > 0:
-                return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            else:
-                return f"{minutes:02d}:{seconds:02d}"
-        except ValueError:
-            return "00:00"
+    def download_video(self, url, format_id, output_path, priority=0, rate_limit=None, segments=None, output=None,
+                       force=False):
+        return self.engine.download(url, format_id, output_path, priority, rate_limit, segments, output, force)
+
+    def history_page(self, before=None, limit=100):
+        if self.engine.history is None:
+            return []
+        return self.engine.history.page(before, limit)
+
+    def pause_job(self, key):
+        self.engine.pause_job(key)
+
+    def resume_job(self, key):
+        self.engine.resume_job(key)
 
-class PlaylistInfoWorker(QRunnable):
-    def __init__(self, url, ydl_opts, get_available_formats):
+    def cancel_job(self, key):
+        self.engine.cancel_job(key)
+
+    def active_jobs(self):
+        return self.engine.active_jobs()
+
+    def restore_jobs(self):
+        return self.engine.restore_jobs()
+
+
+class RemoteQueue(QObject):
+    # İndirmeleri bu süreçte değil, paylaşılan kuyruğa (jobqueue) ekleyip başka süreçlerdeki/makinelerdeki
+    # işçilere yaptırır; işlerin durumu ve ilerlemesi kuyruktan okunur. İş yönetimi yöntemleri
+    # YouTubeDownloader'ınkilerle aynıdır. Kuyruğa erişim arayüzü bekletmesin diye tüm çağrılar izleme
+    # iş parçacığından yapılır; kuyruğa ulaşılamazsa istekler bekletilip yeniden gönderilir.
+    progress_batch_signal = pyqtSignal(object)
+    job_state_signal = pyqtSignal(str, str)
+    # Kuyruk özeti (JobQueue.status()); kuyruğa ulaşılamıyorsa None
+    queue_status_signal = pyqtSignal(object)
+
+    def __init__(self, target, token=None, poll_interval=POLL_INTERVAL):
         super().__init__()
-        self.url = url
-        self.ydl_opts = ydl_opts
-        self.get_available_formats = get_available_formats
-        self.signals = WorkerSignals()
         self.logger = logging.getLogger(__name__)
+        self.target = target
+        self.queue = open_queue(target, token)
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        # Gönderilecek istekler (yöntem, yerel anahtar, argümanlar); yerel anahtar -> kuyruk iş kimliği;
+        # kuyruk iş kimliği -> yerel anahtarlar (kuyruk aynı işi birleştirmiş olabilir) ve son durumu
+        self.outbox = []
+        self.remote = {}
+        self.keys = {}
+        self.states = {}
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+        # İlerleme kuyruktan okundukça birleştirilir, arayüze okuma başına tek sinyal gider
+        self.progress = ProgressAggregator(1 / poll_interval)
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(int(self.progress.interval * 1000))
+        self.progress_timer.timeout.connect(self.emit_progress_batch)
+        self.progress_timer.start()
+        threading.Thread(target=self.run, name='remote-queue', daemon=True).start()
+
+    def emit_progress_batch(self):
+        batch = self.progress.tick()
+        if batch is not None:
+            self.progress_batch_signal.emit(batch)
+
+    def request(self, method, key, **kwargs):
+        with self.lock:
+            self.outbox.append((method, key, kwargs))
+        self.wake.set()
+
+    def download_video(self, url, format_id, output_path, priority=0, rate_limit=None, segments=None, output=None,
+                       force=False):
+        # Hız sınırı işçinin ayarıdır (jobqueue.py work --rate-limit); iş başına uygulanmaz
+        key = uuid.uuid4().hex
+        self.request('submit', key, url=url, format_id=format_id, output_path=output_path, priority=priority,
+                     segments=segments, output=output or 'video', force=force)
+        return key
+
+    def pause_job(self, key):
+        self.request('pause', key)
+
+    def resume_job(self, key):
+        self.request('resume', key)
+
+    def cancel_job(self, key):
+        self.request('cancel', key)
+
+    def active_jobs(self):
+        with self.lock:
+            pending = [key for method, key, _ in self.outbox if method == 'submit']
+            return pending + [key for job_id, keys in self.keys.items() for key in keys
+                              if self.states.get(job_id, (QUEUED,))[0] in ACTIVE_STATES]
+
+    def send(self):
+        with self.lock:
+            outbox, self.outbox = self.outbox, []
+        for index, (method, key, kwargs) in enumerate(outbox):
+            try:
+                if method == 'submit':
+                    job = self.queue.submit(**kwargs)
+                    with self.lock:
+                        self.remote[key] = job['id']
+                        self.keys.setdefault(job['id'], []).append(key)
+                        # Kuyruk isteği mevcut işle birleştirdiyse yeni anahtar da güncel durumu almalı
+                        self.states.pop(job['id'], None)
+                    self.update(job)
+                elif key in self.remote:
+                    getattr(self.queue, method)(job_id=self.remote[key])
+            except (OSError, sqlite3.Error):
+                with self.lock:
+                    self.outbox[:0] = outbox[index:]
+                raise
+
+    def update(self, job):
+        # Kuyruktaki iş durumunu bağlı yerel işlere yansıtır; işçideki aşama (kuyrukta, indiriliyor,
+        # dönüştürülüyor...) değiştikçe de bildirilir
+        if job['state'] == LEASED:
+            state = job['stage'] or 'running'
+            if job['total']:
+                for key in self.keys[job['id']]:
+                    self.progress.update(key, job['url'], job['downloaded'], job['total'])
+        else:
+            state = {QUEUED: 'queued', PAUSED: 'paused'}.get(job['state'], job['state'])
+            for key in self.keys[job['id']]:
+                self.progress.finish(key)
+        with self.lock:
+            changed = self.states.get(job['id'], (None, None))[1] != state
+            self.states[job['id']] = (job['state'], state)
+            keys = list(self.keys[job['id']])
+            if job['state'] not in ACTIVE_STATES:
+                # Bitmiş iş artık izlenmez
+                del self.keys[job['id']]
+                del self.states[job['id']]
+                for key in keys:
+                    self.remote.pop(key, None)
+        if changed:
+            for key in keys:
+                self.job_state_signal.emit(key, state)
+
+    def poll(self):
+        with self.lock:
+            ids = list(self.keys)
+        if ids:
+            for job in self.queue.jobs(ids=ids):
+                self.update(job)
+        self.queue_status_signal.emit(self.queue.status())
 
     def run(self):
-        try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                self.signals.progress.emit("Playlist bilgileri alınıyor...", 0, 100, None)
-                playlist_info = ydl.extract_info(self.url, download=False)
-                if playlist_info is None:
-                    raise ValueError("Playlist bilgisi alınamadı.")
-                self.process_info(playlist_info)
-        except Exception as e:
-            self.logger.error(f"Playlist bilgisi alınırken hata oluştu: {str(e)}")
-            self.signals.error.emit(str(e))
-        finally:
-            self.signals.finished.emit()
-
-    def process_info(self, playlist_info):
-        if 'entries' not in playlist_info:
-            self.signals.error.emit("Bu bir playlist URL'si değil")
-            return
-
-        total_videos = len(playlist_info['entries'])
-        self.logger.info(f"Playlist: {playlist_info.get('title', 'Başlık Alınamadı')} - Toplam Video: {total_videos}")
-        self.signals.progress.emit(
-            f"Playlist: {playlist_info.get('title', 'Başlık Alınamadı')} - Toplam Video: {total_videos}",
-            10, 100, None
-        )
-
-        playlist_videos = []
-        for i, entry in enumerate(playlist_info['entries']):
-            if entry is not None:
-                try:
-                    video_formats, audio_format = self.get_available_formats(entry)
-                    video_info = {
-                        'title': entry.get('title', 'Video Başlığı Alınamadı'),
-                        'duration': self.format_duration(entry.get('duration', 0)),
-                        'video_formats': video_formats,
-                        'audio_format': audio_format,
-                        'webpage_url': entry.get('webpage_url'),
-                    }
-                    playlist_videos.append(video_info)
-                    progress = 10 + int((i + 1) / total_videos * 90)
-                    self.signals.progress.emit(f"Video bilgisi alınıyor ({i + 1}/{total_videos})", progress, 100,
-                                               video_info)
-                    self.logger.debug(f"Video bilgisi alındı: {video_info['title']}")
-                except Exception as e:
-                    self.logger.error(f"Video bilgisi alınamadı: {i + 1}/{total_videos}, Hata: {str(e)}")
-                    self.signals.progress.emit(f"Video bilgisi alınamadı: {i + 1}/{total_videos}", progress, 100, None)
-
-        self.signals.progress.emit("Playlist bilgileri alındı.", 100, 100, {'playlist_videos': playlist_videos})
-        self.logger.info(f"Playlist işleme tamamlandı. Toplam video sayısı: {len(playlist_videos)}")
-
-    @staticmethod
-    def format_duration(seconds):
-        if seconds is None:
-            return "00:00"
-        try:
-            seconds = int(float(seconds))
-            minutes, seconds = divmod(seconds, 60)
-            hours, minutes = divmod(minutes, 60)
-            if hours > 0:
-                return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            else:
-                return f"{minutes:02d}:{seconds:02d}"
-        except ValueError:
-            return "00:00"
\ No newline at end of file
+        while not self.stopped.is_set():
+            try:
+                self.send()
+                self.poll()
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("Queue %s unreachable: %s", self.target, e)
+                self.queue_status_signal.emit(None)
+            self.wake.wait(self.poll_interval)
+            self.wake.clear()
+
+    def close(self):
+        self.stopped.set()
+        self.wake.set()
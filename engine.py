@@ -0,0 +1,1046 @@
+import os
+import json
+import errno
+import time
+import uuid
+import logging
+import threading
+import urllib.parse
+from collections import OrderedDict
+from contextlib import contextmanager
+import yt_dlp
+from yt_dlp.utils import DownloadCancelled, PagedList
+from yt_dlp.postprocessor.common import PostProcessor
+from cache import MetadataCache
+from scheduler import DownloadScheduler, PriorityLane
+from journal import JobJournal
+from history import DownloadHistory, history_format
+from metrics import metrics, SIZE_BUCKETS
+from utils import canonical_id, thumbnail_url
+from formats import build_ladder, video_options, audio_options
+from segmented import SegmentedHttpFD, STATE_SUFFIX
+import network
+from storage import DiskSpace, MIN_FREE, DEFER, REFUSE, estimate_size, write_stats
+from retry import retry_policy, breakers
+from postprocess import (portable_info, run_postprocessors, plan_postprocess, postprocess_options,
+                         default_output)
+
+# Playlist girdileri arayüze bu kadar girdilik ya da bu kadar saniyelik gruplar halinde gönderilir
+ENTRY_BATCH = 100
+ENTRY_BATCH_INTERVAL = 0.25
+# Sayfalı (PagedList) playlistlerden bir seferde istenen girdi sayısı
+PLAYLIST_PAGE = 100
+# Playlist adresi başka bir adrese yönlendirilirse (ör. izleme sayfasından liste sekmesine) izlenecek en fazla adım
+MAX_URL_HOPS = 3
+
+BASE_YDL_OPTS = {
+    # Hata yutulmasın: yeniden deneme politikası asıl hatayı (HTTP durumu, Retry-After) sınıflandırır
+    'ignoreerrors': False,
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': 'in_playlist',
+    'skip_download': True,
+    'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+}
+
+
+class EngineYoutubeDL(yt_dlp.YoutubeDL):
+    # Havuzdaki örnek. İş bazındaki ilerleme kancaları ve aktarım öncesi denetim kurulumda bir kez, açık API ile
+    # (add_progress_hook / add_post_processor) eklenen aracılar üzerinden çağrılır; iş değişince yt-dlp'nin iç
+    # listelerine dokunulmaz, sadece bu sınıfın alanları (start_job / end_job) değişir.
+    PRINT_OPTIONS = ('listformats', 'list_thumbnails', 'listsubtitles')
+
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        self.job_hooks = []
+        self.before_download = None
+        self.segments = 1
+        # yt-dlp, --print kullanılmasa da her video için format/küçük resim/altyazı tablolarını metin olarak
+        # hazırlıyor (toplu bilgi almada CPU süresinin çoğu); yazdırılacak ya da listelenecek bir şey yoksa atlanır
+        params = self.params
+        self.skip_tables = not (any(params['forceprint'].values()) or any(params['print_to_file'].values())
+                                or any(value for key, value in params.items() if key.startswith('force'))
+                                or any(params.get(key) for key in self.PRINT_OPTIONS))
+        self.add_progress_hook(self.run_job_hooks)
+        self.add_post_processor(BeforeDownloadPP(self, self.run_before_download), when='before_dl')
+
+    def start_job(self, fmt=None, progress_hooks=(), before_download=None, segments=1):
+        self.params['format'] = fmt
+        self.format_selector = fmt if fmt in (None, '-') or callable(fmt) else self.build_format_selector(fmt)
+        self.job_hooks = list(progress_hooks)
+        self.before_download = before_download
+        self.segments = segments or 1
+
+    def end_job(self):
+        # Havuza dönerken iş alanları sıfırlanır; sonraki iş önceki işin kancalarını ya da formatını görmez
+        self.start_job()
+
+    def run_job_hooks(self, d):
+        for hook in self.job_hooks:
+            hook(d)
+
+    def run_before_download(self, info):
+        if self.before_download is not None:
+            self.before_download(info)
+
+    def dl(self, name, info, subtitle=False, test=False):
+        # Düz HTTP(S) dosyaları işin bağlantı sayısıyla parçalı indirilir; diğer protokoller, altyazılar ve
+        # format denemeleri yt-dlp'nin seçtiği indiriciye kalır
+        if (self.segments < 2 or subtitle or test or name == '-' or info.get('http_headers') is None
+                or not SegmentedHttpFD.can_download(info)):
+            return super().dl(name, info, subtitle, test)
+        fd = SegmentedHttpFD(self, self.params, self.segments)
+        # yt-dlp'nin kendi indiricilerine eklediği kancalar: params'takiler ve iş kancalarının aracısı
+        for hook in [*(self.params.get('progress_hooks') or ()), self.run_job_hooks]:
+            fd.add_progress_hook(hook)
+        return fd.download(name, dict(info), subtitle)
+
+    def render_formats_table(self, info_dict):
+        return None if self.skip_tables else super().render_formats_table(info_dict)
+
+    def render_thumbnails_table(self, info_dict):
+        return None if self.skip_tables else super().render_thumbnails_table(info_dict)
+
+    def render_subtitles_table(self, video_id, subtitles):
+        return None if self.skip_tables else super().render_subtitles_table(video_id, subtitles)
+
+
+class PooledEngineYoutubeDL(network.PooledYoutubeDL, EngineYoutubeDL):
+    # Paylaşılan HTTP istemcisini kullanan havuz örneği
+    pass
+
+
+class YoutubeDLPool:
+    # İş bazında değişen seçenekler imzaya dahil edilmez, örnek teslim edilirken start_job ile ayarlanır.
+    # Çıktı şablonu ve fragman bağlantı sayısı imzadadır (yt-dlp bunları kurulumda okur); aynı klasöre ve aynı
+    # ayarlarla inen işler aynı örnekleri paylaşır.
+    JOB_OPTIONS = ('format', 'progress_hooks', 'before_download', 'segments')
+
+    def __init__(self, max_idle_per_signature=4, max_signatures=8, ydl_class=EngineYoutubeDL):
+        self.logger = logging.getLogger(__name__)
+        self.ydl_class = ydl_class
+        self.max_idle_per_signature = max_idle_per_signature
+        self.max_signatures = max_signatures
+        self.lock = threading.Lock()
+        self.idle = OrderedDict()
+        self.created = 0
+        self.reused = 0
+
+    @classmethod
+    def signature(cls, opts):
+        base = {k: v for k, v in opts.items() if k not in cls.JOB_OPTIONS}
+        return json.dumps(base, sort_keys=True, default=repr)
+
+    def create(self, opts):
+        base = {k: v for k, v in opts.items() if k not in self.JOB_OPTIONS}
+        ydl = self.ydl_class(base)
+        # Açıcı (request director) ve YouTube çıkarıcısı ilk işten önce hazırlansın
+        getattr(ydl, '_request_director', None)
+        ydl.get_info_extractor('Youtube')
+        with self.lock:
+            self.created += 1
+        return ydl
+
+    def warm(self, opts, count=1):
+        for _ in range(count):
+            self.release(self.create(opts), opts)
+
+    def acquire(self, opts):
+        key = self.signature(opts)
+        with self.lock:
+            instances = self.idle.get(key)
+            ydl = instances.pop() if instances else None
+            if ydl is not None:
+                self.idle.move_to_end(key)
+                self.reused += 1
+        if ydl is None:
+            ydl = self.create(opts)
+        ydl.start_job(opts.get('format'), opts.get('progress_hooks', ()), opts.get('before_download'),
+                      opts.get('segments'))
+        return ydl
+
+    def release(self, ydl, opts):
+        ydl.end_job()
+        key = self.signature(opts)
+        discarded = []
+        with self.lock:
+            instances = self.idle.setdefault(key, [])
+            self.idle.move_to_end(key)
+            if len(instances) < self.max_idle_per_signature:
+                instances.append(ydl)
+            else:
+                discarded.append(ydl)
+            while len(self.idle) > self.max_signatures:
+                _, old = self.idle.popitem(last=False)
+                discarded.extend(old)
+        for old in discarded:
+            old.close()
+
+    @contextmanager
+    def checkout(self, opts):
+        ydl = self.acquire(opts)
+        try:
+            yield ydl
+        except BaseException:
+            # Hata sonrası örneğin durumuna güvenme, havuza geri koyma
+            ydl.close()
+            raise
+        else:
+            self.release(ydl, opts)
+
+    def close(self):
+        with self.lock:
+            instances = [ydl for group in self.idle.values() for ydl in group]
+            self.idle.clear()
+        for ydl in instances:
+            ydl.close()
+
+    def stats(self):
+        with self.lock:
+            idle = sum(len(group) for group in self.idle.values())
+            return {'created': self.created, 'reused': self.reused, 'idle': idle, 'signatures': len(self.idle)}
+
+
+class BeforeDownloadPP(PostProcessor):
+    # Formatlar seçildikten sonra, aktarım başlamadan çağrılır (disk kabul denetimi)
+    def __init__(self, downloader, callback):
+        super().__init__(downloader)
+        self.callback = callback
+
+    def run(self, info):
+        self.callback(info)
+        return [], info
+
+
+class DownloadPaused(DownloadCancelled):
+    msg = 'İndirme duraklatıldı'
+
+
+class DownloadDeferred(DownloadCancelled):
+    msg = 'Disk alanı bekleniyor'
+
+
+class JobControl:
+    # İşçi iş parçacığı bu bayrakları ilerleme kancasında okur (işbirlikçi durdurma)
+    def __init__(self):
+        self.paused = threading.Event()
+        self.cancelled = threading.Event()
+        self.partial_files = set()
+
+    def hook(self, d):
+        if d.get('tmpfilename'):
+            self.partial_files.add(d['tmpfilename'])
+        if self.cancelled.is_set():
+            raise DownloadCancelled('İndirme iptal edildi')
+        if self.paused.is_set():
+            raise DownloadPaused()
+
+
+def get_available_formats(info):
+    # Merdiven bilgiyle birlikte saklanır; yoksa (eski önbellek kaydı) bir kez kurulur
+    ladder = info.get('format_ladder') or build_ladder(info.get('formats', []))
+    video_formats = [(label, format_id) for label, format_id, _ in video_options(ladder)]
+    return video_formats, audio_options(ladder)
+
+
+def format_fields(info):
+    ladder = build_ladder(info.get('formats', []))
+    video_formats, audio_formats = get_available_formats({'format_ladder': ladder})
+    return {'format_ladder': ladder, 'video_formats': video_formats, 'audio_formats': audio_formats}
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "00:00"
+    try:
+        seconds = int(float(seconds))
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours > 0:
+            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        else:
+            return f"{minutes:02d}:{seconds:02d}"
+    except ValueError:
+        return "00:00"
+
+
+def flight_key(url, format_id, output, output_path):
+    # Aynı işi tanımlayan anahtar: video kimliği + format (arşivdeki biçimiyle) + hedef klasör
+    return canonical_id(url), history_format(format_id, output), os.path.abspath(output_path)
+
+
+def iter_entries(entries):
+    # Üreteç/LazyList girdileri geldikçe, PagedList sayfa sayfa okunur; liste hiçbir zaman tamamen beklenmez
+    if isinstance(entries, PagedList):
+        start = 0
+        while True:
+            page = entries.getslice(start, start + PLAYLIST_PAGE)
+            yield from page
+            if len(page) < PLAYLIST_PAGE:
+                return
+            start += len(page)
+    else:
+        yield from entries
+
+
+class Task:
+    # emit(kind, *args): 'progress', 'error', 'finished' olaylarını çağırana iletir
+    def __init__(self, url, ydl_opts, cache=None, refresh=False, ydl_pool=None, emit=None):
+        self.url = url
+        self.ydl_opts = ydl_opts
+        self.ydl_pool = ydl_pool or YoutubeDLPool()
+        self.cache = cache
+        self.refresh = refresh
+        self.cache_key = canonical_id(url)
+        self.emit = emit or (lambda kind, *args: None)
+        self.cancelled = threading.Event()
+        self.logger = logging.getLogger(__name__)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def extract(self, call):
+        # Geçici hatalar (429, 5xx, ağ, açık devre kesici) politika bütçesi içinde beklenip yeniden denenir
+        attempts = {}
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                delay, error_class = retry_policy.next_delay(e, attempts, 'extract')
+                if delay is None or self.cancelled.is_set():
+                    raise
+                self.logger.warning("Bilgi alınamadı (%s), %.1f sn sonra yeniden denenecek: %s",
+                                    error_class, delay, self.url)
+                self.emit('progress', f"Sunucu yanıt vermiyor, {delay:.0f} sn sonra yeniden denenecek...",
+                          0, 0, None)
+                if self.cancelled.wait(delay):
+                    raise
+
+
+class VideoInfoTask(Task):
+    def run(self):
+        try:
+            cached = None
+            if self.cache is not None and not self.refresh:
+                cached = self.cache.get(self.cache_key)
+            if cached is not None:
+                video_info, formats_stale = cached
+                self.logger.info("Video bilgisi önbellekten alındı: %s", self.cache_key)
+                self.emit('progress', "Video bilgileri alındı.", 100, 100, video_info)
+                if not formats_stale:
+                    return
+
+            with self.ydl_pool.checkout(self.ydl_opts) as ydl:
+                if cached is None:
+                    self.emit('progress', "Video bilgileri alınıyor...", 0, 100, None)
+                with metrics.span('extract_info', kind='video'):
+                    info = self.extract(lambda: ydl.extract_info(self.url, download=False))
+                if info is None:
+                    raise ValueError("Video bilgisi alınamadı.")
+                if cached is None:
+                    self.process_info(info)
+                else:
+                    self.revalidate_formats(info)
+        except Exception as e:
+            self.logger.error("Video bilgisi alınırken hata oluştu: %s", e)
+            metrics.inc('ytdl_errors_total', stage='extract_info')
+            self.emit('error', str(e))
+        finally:
+            self.emit('finished')
+
+    def process_info(self, info):
+        try:
+            self.logger.debug("Video bilgileri işleniyor...")
+            with metrics.span('formats'):
+                fields = format_fields(info)
+            video_info = {
+                'title': info.get('title', 'Başlık Alınamadı'),
+                'duration_string': info.get('duration_string', '00:00'),
+                'webpage_url': info.get('webpage_url'),
+                'thumbnail': thumbnail_url(info),
+                **fields,
+            }
+            # Ham format listesi arayüze gönderilmez (merdiven yeterli); sadece önbelleğe yazılır
+            self.logger.debug("İşlenmiş video bilgileri: %s (%d format)", video_info['title'],
+                              len(info.get('formats') or []))
+            if self.cache is not None:
+                self.cache.put(self.cache_key, dict(video_info, formats=info.get('formats', [])))
+            self.emit('progress', "Video bilgileri alındı.", 100, 100, video_info)
+        except Exception as e:
+            self.logger.error("Video bilgisi işlenirken hata: %s", e)
+            self.emit('error', f"Video bilgisi işlenirken hata: {str(e)}")
+
+    def revalidate_formats(self, info):
+        # Başlık/süre önbellekte geçerli; sadece süresi dolan format URL'lerini yenile
+        with metrics.span('formats'):
+            fields = format_fields(info)
+        self.cache.update_formats(self.cache_key, info.get('formats', []), fields)
+        self.logger.info("Format bilgileri yenilendi: %s", self.cache_key)
+
+
+class PlaylistInfoTask(Task):
+    def run(self):
+        try:
+            if self.cache is not None and not self.refresh:
+                cached = self.cache.get(self.cache_key)
+                if cached is not None:
+                    self.logger.info("Playlist bilgisi önbellekten alındı: %s", self.cache_key)
+                    self.replay_cached(cached[0])
+                    return
+
+            with self.ydl_pool.checkout(self.ydl_opts) as ydl:
+                self.emit('progress', "Playlist bilgileri alınıyor...", 0, 0, None)
+                with metrics.span('extract_info', kind='playlist'):
+                    playlist_info = self.extract(lambda: self.extract_playlist(ydl))
+                if playlist_info is None:
+                    raise ValueError("Playlist bilgisi alınamadı.")
+                # Girdiler bu aşamada, sayfalar okundukça çekilir; örnek o sırada havuza dönmemeli
+                with metrics.span('enumerate', kind='playlist'):
+                    self.process_info(playlist_info)
+        except Exception as e:
+            self.logger.error("Playlist bilgisi alınırken hata oluştu: %s", e)
+            metrics.inc('ytdl_errors_total', stage='extract_info')
+            self.emit('error', str(e))
+        finally:
+            self.emit('finished')
+
+    def extract_playlist(self, ydl):
+        # process=False: girdiler tüm liste indirilmeden üreteç/sayfalı liste olarak döner
+        info = ydl.extract_info(self.url, download=False, process=False)
+        for _ in range(MAX_URL_HOPS):
+            if info is None or info.get('_type') not in ('url', 'url_transparent'):
+                break
+            info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+        return info
+
+    def process_info(self, playlist_info):
+        entries = playlist_info.get('entries')
+        if entries is None:
+            self.emit('error', "Bu bir playlist URL'si değil")
+            return
+
+        title = playlist_info.get('title') or 'Başlık Alınamadı'
+        # Toplam sadece çıkarıcı bildiriyorsa kullanılır; yoksa ilerleme görülen girdi sayısıdır (total=0)
+        total = playlist_info.get('playlist_count') or (len(entries) if isinstance(entries, list) else 0)
+        self.logger.info("Playlist: %s - Toplam Video: %s", title, total or 'bilinmiyor')
+        self.emit('progress', f"Playlist: {title}", 0, total, None)
+
+        playlist_videos = []
+        batch = []
+        flushed = time.monotonic()
+        for i, entry in enumerate(iter_entries(entries)):
+            if entry is not None:
+                try:
+                    video_info = {
+                        'title': entry.get('title', 'Video Başlığı Alınamadı'),
+                        'duration': format_duration(entry.get('duration', 0)),
+                        'webpage_url': entry.get('webpage_url') or entry.get('url'),
+                        'playlist_index': i,
+                        'thumbnail': thumbnail_url(entry),
+                        **format_fields(entry),
+                    }
+                    playlist_videos.append(video_info)
+                    batch.append(video_info)
+                except Exception as e:
+                    self.logger.error("Video bilgisi alınamadı: %s, Hata: %s", i + 1, e)
+            if batch and (len(batch) >= ENTRY_BATCH or time.monotonic() - flushed >= ENTRY_BATCH_INTERVAL):
+                self.emit_batch(batch, len(playlist_videos), total)
+                batch = []
+                flushed = time.monotonic()
+            # Sonraki girdi yeni bir sayfa isteği başlatabilir; iptal ondan önce kontrol edilir
+            if self.cancelled.is_set():
+                if batch:
+                    self.emit_batch(batch, len(playlist_videos), total)
+                self.logger.info("Playlist yükleme iptal edildi: %s girdi okundu", len(playlist_videos))
+                self.emit('progress', "Playlist yükleme iptal edildi.", 100, 100, None)
+                return
+        if batch:
+            self.emit_batch(batch, len(playlist_videos), total)
+
+        if self.cache is not None:
+            self.cache.put(self.cache_key, {'title': playlist_info.get('title'), 'playlist_videos': playlist_videos},
+                           ttl=self.cache.playlist_ttl)
+        self.emit('progress', "Playlist bilgileri alındı.", 100, 100, {'playlist_videos': playlist_videos})
+        self.logger.info("Playlist işleme tamamlandı. Toplam video sayısı: %s", len(playlist_videos))
+
+    def emit_batch(self, batch, seen, total):
+        status = f"{seen}/{total}" if total else str(seen)
+        self.emit('progress', f"Video bilgisi alınıyor ({status})", seen, max(total, seen) if total else 0,
+                  {'playlist_entries': batch})
+
+    def replay_cached(self, cached):
+        playlist_videos = cached.get('playlist_videos', [])
+        total = len(playlist_videos)
+        self.emit('progress', f"Playlist: {cached.get('title') or 'Başlık Alınamadı'} - Toplam Video: {total}",
+                  0, total, None)
+        for start in range(0, total, ENTRY_BATCH):
+            self.emit_batch(playlist_videos[start:start + ENTRY_BATCH], min(start + ENTRY_BATCH, total), total)
+        self.emit('progress', "Playlist bilgileri alındı.", 100, 100, {'playlist_videos': playlist_videos})
+
+
+class DownloadEngine:
+    # Qt'den bağımsız çekirdek. Olaylar subscribe() ile verilen geri çağrılara
+    # callback(event, data) biçiminde, işçi iş parçacıklarından iletilir.
+    def __init__(self, max_concurrent_downloads=3, resolve_concurrency=8, entry_timeout=15,
+                 global_rate_limit=None, metadata_threads=None, use_cache=True, journal_path=None,
+                 persist_journal=True, segments=4, use_history=True, history_path=None, async_io=True,
+                 connections_per_host=network.CONNECTIONS_PER_HOST, min_free_space=MIN_FREE):
+        self.logger = logging.getLogger(__name__)
+        self.ydl_opts = dict(BASE_YDL_OPTS)
+        self.listeners = []
+        self.lock = threading.RLock()
+        self.idle = threading.Condition(self.lock)
+        self.jobs = {}
+        # Listeden çıkmış ama son durum olayı henüz yayınlanmamış işler; wait bunları da bekler
+        self.finishing = set()
+        # Kuyruk dışında bekleyen işlerin (yeniden deneme / devre kesici) zamanlayıcıları
+        self.timers = {}
+        # Süren indirmeler (video kimliği, format, klasör) -> iş anahtarı; aynı istek yeni iş başlatmaz
+        self.flights = {}
+        # İş başına varsayılan bağlantı sayısı (HTTP Range parçaları / DASH-HLS fragmanları)
+        self.segments = segments
+
+        metadata_threads = metadata_threads or os.cpu_count() or 2
+        self.logger.info("Multithreading with maximum %s metadata threads", metadata_threads)
+
+        # İndirmeler öncelik kuyruğundan, bilgi alma işlerinden ayrı kulvarda başlatılır
+        self.scheduler = DownloadScheduler(max_concurrent_downloads, global_rate_limit,
+                                           on_stats=lambda queued, running: self.publish(
+                                               'queue', queued=queued, running=running))
+        self.metadata_lane = PriorityLane('metadata', metadata_threads)
+
+        # Playlist girdilerinin tam bilgisi ayrı ve sınırlı bir kulvarda çözümlenir
+        self.resolve_lane = PriorityLane('resolve', resolve_concurrency)
+        self.resolve_opts = dict(self.ydl_opts, socket_timeout=entry_timeout, extractor_retries=1)
+
+        # Hedef dosya sistemine sığmayacak işler aktarım başlamadan reddedilir ya da ertelenir
+        self.disk = DiskSpace(min_free_space)
+
+        # Yarım kalan işler günlüğe yazılır; yeniden başlatmada kaldığı yerden devam eder
+        self.journal = JobJournal(journal_path, persist=persist_journal)
+
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = MetadataCache()
+            except Exception as e:
+                # Önbellek açılamazsa uygulama önbelleksiz çalışmaya devam etsin
+                self.logger.error("Metadata cache disabled: %s", e)
+
+        # Tamamlanan indirmeler (video kimliği + çıktı + format) arşivi; tekrar indirmeyi önler
+        self.history = None
+        if use_history:
+            try:
+                self.history = DownloadHistory(history_path)
+            except Exception as e:
+                self.logger.error("Download history disabled: %s", e)
+
+        # yt-dlp'nin tüm HTTP istekleri tek asyncio döngüsündeki paylaşılan bağlantı havuzundan geçer
+        self.http_client = network.start_shared_client(per_host=connections_per_host) if async_io else None
+
+        # Bilgi alma işleri için hazır YoutubeDL örneklerini arka planda oluştur
+        # Paylaşılan istemci sadece bu havuzun oluşturduğu örneklerde kullanılır
+        self.ydl_pool = YoutubeDLPool(max_idle_per_signature=max(2, metadata_threads),
+                                      ydl_class=PooledEngineYoutubeDL if async_io else EngineYoutubeDL)
+
+    def warm_up(self):
+        self.metadata_lane.submit(lambda: self.ydl_pool.warm(self.ydl_opts))
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.listeners.remove(callback)
+
+    def publish(self, event, **data):
+        if event == 'job':
+            metrics.inc('ytdl_jobs_total', state=data['state'])
+        for callback in list(self.listeners):
+            try:
+                callback(event, data)
+            except Exception as e:
+                self.logger.error("Event listener failed for %s: %s", event, e)
+
+    def status(self, message, current=0, total=100):
+        self.publish('status', message=message, current=current, total=total)
+
+    def fetch_video_info(self, url, refresh=False, emit=None, start=True):
+        self.logger.info("Fetching video info for URL: %s (refresh=%s)", url, refresh)
+        task = VideoInfoTask(url, self.ydl_opts, self.cache, refresh, self.ydl_pool, emit)
+        if start:
+            self.start_task(task)
+        return task
+
+    def fetch_playlist_info(self, url, refresh=False, emit=None, start=True):
+        self.logger.info("Fetching playlist info for URL: %s (refresh=%s)", url, refresh)
+        task = PlaylistInfoTask(url, self.ydl_opts, self.cache, refresh, self.ydl_pool, emit)
+        if start:
+            self.start_task(task)
+        return task
+
+    def start_task(self, task, priority=0):
+        return self.metadata_lane.submit(task.run, priority)
+
+    def resolve_entry(self, key, url, priority=0):
+        self.logger.debug("Resolving playlist entry %s: %s", key, url)
+
+        def emit(kind, *args):
+            if kind == 'progress' and args[3]:
+                self.publish('entry_resolved', key=key, info=args[3])
+            elif kind == 'error':
+                self.publish('entry_failed', key=key, error=args[0])
+
+        task = VideoInfoTask(url, self.resolve_opts, self.cache, False, self.ydl_pool, emit)
+        self.resolve_lane.submit(task.run, priority)
+        return task
+
+    def cancel_pending_resolves(self):
+        # Henüz başlamamış çözümleme işlerini kuyruktan at
+        self.resolve_lane.clear()
+
+    def download(self, url, format_id, output_path, priority=0, rate_limit=None, segments=None, output=None,
+                 force=False):
+        # output: postprocess.OUTPUTS'tan biri; verilmezse format ifadesinden çıkarılır
+        self.logger.info("Starting download: URL=%s, format_id=%s, output_path=%s", url, format_id, output_path)
+        output = output or default_output(format_id)
+        flight = flight_key(url, format_id, output, output_path)
+        record = dict(url=url, format_id=format_id, output_path=output_path, priority=priority,
+                      rate_limit=rate_limit, segments=segments or self.segments, output=output)
+        with self.lock:
+            # Aynı video aynı formatta aynı klasöre zaten iniyorsa (duraklatılmış olsa da) çağıran o işe
+            # bağlanır; force da yeni iş açmaz, iki iş aynı .part dosyasına yazardı
+            key = self.flights.get(flight)
+            if key is not None:
+                self.logger.info("Aynı indirme sürüyor, mevcut işe bağlanıldı: %s (%s)", url, key)
+                metrics.inc('ytdl_deduplicated_total', kind='download')
+                return key
+            key = uuid.uuid4().hex
+            existing = None
+            if not force and self.history is not None:
+                existing = self.history.find(canonical_id(url), history_format(format_id, output))
+            if existing is None:
+                return self.add_job(key, record)
+        # Arşivdeki dosyaya bağlantı ve olay yayını kilit dışında; diğer işler beklemez
+        if self.reuse_download(key, url, existing, output_path):
+            return key
+        with self.lock:
+            # Bağlantı verilemedi, normal indirilir; bu arada aynı istek başladıysa ona bağlanılır
+            return self.flights.get(flight) or self.add_job(key, record)
+
+    def add_job(self, key, record):
+        self.journal.add(key, **record)
+        self.submit_job(key)
+        return key
+
+    def reuse_download(self, key, url, existing, output_path):
+        # Arşivde aynı video + format varsa indirme atlanır; dosya başka klasördeyse
+        # hedefe sabit bağlantı (hard link) verilir, bağlanamazsa normal indirilir
+        target = os.path.join(output_path, os.path.basename(existing))
+        if os.path.exists(target):
+            self.logger.info("Zaten indirilmiş, atlanıyor: %s (%s)", url, target)
+            self.publish('job', key=key, url=url, state='skipped', filepath=target)
+            return True
+        try:
+            os.link(existing, target)
+        except OSError as e:
+            self.logger.info("Arşivdeki dosyaya bağlantı verilemedi (%s), yeniden indirilecek: %s", e, url)
+            return False
+        self.logger.info("Arşivdeki dosya bağlandı: %s -> %s", existing, target)
+        self.publish('job', key=key, url=url, state='completed', filepath=target, linked=True)
+        return True
+
+    def submit_job(self, key):
+        record = self.journal.get(key)
+        url, format_id = record['url'], record['format_id']
+
+        ydl_opts = {
+            'format': format_id,
+            'outtmpl': os.path.join(record['output_path'], '%(title)s.%(ext)s'),
+            # .part dosyası varsa kaldığı bayttan devam et
+            'continuedl': True,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            # HTTP dosyaları eş zamanlı Range istekleriyle (EngineYoutubeDL.dl), DASH/HLS fragmanları paralel indirilir
+            'segments': record.get('segments') or self.segments,
+            'concurrent_fragment_downloads': record.get('segments') or self.segments,
+        }
+        if record.get('rate_limit'):
+            ydl_opts['ratelimit'] = record['rate_limit']
+        output = record.get('output') or default_output(format_id)
+
+        control = JobControl()
+        control.partial_files.update(record.get('partial_files', []))
+        flight = flight_key(url, format_id, output, record['output_path'])
+        with self.lock:
+            self.jobs[key] = {'control': control, 'job_id': None, 'flight': flight}
+            self.flights[flight] = key
+            self.journal.update(key, status='queued')
+            self.publish('job', key=key, url=url, state='queued')
+            self.jobs[key]['job_id'] = self.scheduler.submit(
+                lambda: self.run_download(key, url, ydl_opts, output, control), record.get('priority', 0))
+
+    def run_download(self, key, url, ydl_opts, output, control):
+        # Sayfa adresinin makinesi için devre kesici açıksa iş başlamaz, süre dolunca yeniden kuyruğa girer
+        wait = breakers.blocked_for(urllib.parse.urlsplit(url).hostname, probe=False)
+        if wait:
+            self.logger.info("Devre kesici açık, indirme %.0f sn bekletiliyor: %s", wait, url)
+            self.park_job(key, url, 'retrying', wait, reason='circuit_open')
+            return
+        self.journal.update(key, status='running')
+        self.publish('job', key=key, url=url, state='running')
+        hooks = [control.hook, self.progress_hook(key), self.scheduler.throttle_hook()]
+        admit = lambda info: self.admit_job(key, info, control)
+        try:
+            with self.ydl_pool.checkout(dict(ydl_opts, progress_hooks=hooks, before_download=admit)) as ydl:
+                self.logger.info("İndirme başlatılıyor: %s", url)
+                # Bilgi alma ve aktarım ayrı ölçülsün diye iki adımda: önce çıkarım, sonra format
+                # seçimi + indirme (extract_info(download=True) ile aynı akış)
+                with metrics.span('extract_info', kind='download'):
+                    info = ydl.extract_info(url, download=False, process=False)
+                if info is None:
+                    raise ValueError("Video indirilemedi.")
+                with metrics.span('transfer'):
+                    info = ydl.process_ie_result(info, download=True)
+            if info is None:
+                raise ValueError("Video indirilemedi.")
+            self.logger.info("İndirme tamamlandı: %s", url)
+        except DownloadDeferred:
+            self.defer_job(key, url)
+            return
+        except DownloadCancelled as e:
+            # Duraklatma/iptal: .part dosyası yerinde kalır
+            self.logger.info("İndirme durduruldu: %s, URL: %s", e.msg, url)
+            self.on_transfer_stopped(key)
+            return
+        except Exception as e:
+            if self.retry_job(key, url, e, control):
+                return
+            self.logger.error("İndirme hatası: %s, URL: %s", e, url)
+            self.fail_job(key, str(e))
+            return
+        # Aktarım bitti; indirme kulvarı serbest kalır, dönüştürme kendi süreç havuzunda sıraya girer
+        self.run_postprocess(key, info, output)
+
+    def admit_job(self, key, info, control):
+        # Seçilen format(lar)ın tahmini boyutu hedef dosya sistemine sığmıyorsa aktarım başlamaz
+        size = estimate_size(info)
+        if size is None:
+            self.logger.debug("Boyut tahmini yok, disk denetimi atlandı: %s", key)
+            return
+        output_path = self.journal.get(key)['output_path']
+        partial = sum(os.path.getsize(path) for path in control.partial_files if os.path.isfile(path))
+        decision, needed, free = self.disk.admit(key, output_path, size, partial)
+        if decision == DEFER:
+            raise DownloadDeferred()
+        if decision == REFUSE:
+            metrics.inc('ytdl_errors_total', stage='disk_space')
+            raise OSError(errno.ENOSPC, f"Yetersiz disk alanı: {needed / 1024 ** 2:.0f} MB gerekli, "
+                                        f"{max(free, 0) / 1024 ** 2:.0f} MB kullanılabilir ({output_path})")
+
+    def defer_job(self, key, url):
+        # Diğer işlerin ayırdığı alan bitene kadar beklenir; bir ayırma kalkınca iş yeniden kuyruğa girer.
+        # Bekleme kaydı iş park edildikten sonra yapılır; aradaki serbest bırakmayı disk.wait yakalar.
+        self.logger.info("Disk alanı yetersiz, indirme ertelendi: %s", url)
+        self.park_job(key, url, 'deferred')
+        self.disk.wait(key, lambda: self.resume_parked(key))
+
+    def retry_job(self, key, url, error, control):
+        # Geçici hata: iş kuyruk dışında bekler, hata sınıfının bütçesi içinde yeniden kuyruğa girer.
+        # Deneme sayıları günlükte tutulur; yeniden başlatma bütçeyi sıfırlamaz.
+        record = self.journal.get(key) or {}
+        attempts = dict(record.get('attempts') or {})
+        delay, error_class = retry_policy.next_delay(error, attempts, 'download')
+        if delay is None:
+            return False
+        self.logger.warning("İndirme hatası (%s), %.1f sn sonra yeniden denenecek: %s (%s)",
+                            error_class, delay, url, error)
+        self.journal.update(key, attempts=attempts, partial_files=sorted(control.partial_files))
+        self.park_job(key, url, 'retrying', delay, reason=error_class, error=str(error))
+        return True
+
+    def park_job(self, key, url, state, delay=None, **data):
+        # İş kuyruk dışında bekler (çalışma yeri tutmaz); delay verilirse süre sonunda, verilmezse
+        # resume_parked çağrıldığında yeniden kuyruğa girer
+        self.disk.release(key)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None:
+                return
+            job['parked'] = True
+            if delay is not None:
+                timer = threading.Timer(delay, self.resume_parked, (key,))
+                timer.daemon = True
+                self.timers[key] = timer
+                timer.start()
+        self.journal.update(key, status=state)
+        self.publish('job', key=key, url=url, state=state, delay=delay and round(delay, 1), **data)
+
+    def resume_parked(self, key):
+        with self.lock:
+            self.timers.pop(key, None)
+            job = self.jobs.get(key)
+            if job is None or not job.get('parked'):
+                return
+            control = job['control']
+            if control.cancelled.is_set() or control.paused.is_set():
+                return
+            self.submit_job(key)
+
+    def run_postprocess(self, key, info, output):
+        downloads = info.get('requested_downloads') or [info]
+        filepath = downloads[0].get('filepath') or downloads[0].get('_filename')
+        # İnen akışların kodeklerine göre en ucuz işlem: dokunma, kap değiştirme ya da dönüştürme
+        operation, postprocessors = plan_postprocess(dict(info, **downloads[0]), output)
+        self.logger.info("Post-processing plan for %s: %s (%s)", os.path.basename(filepath), operation, output)
+        if operation == 'none':
+            self.complete_job(key, filepath, info.get('title'))
+            return
+
+        # Dönüştürme başladıktan sonra iş duraklatılamaz; iptal edilirse süreç dosyayı bırakınca kaldırılır
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                job['postprocessing'] = True
+        if job is not None and job['control'].cancelled.is_set():
+            # Aktarımın son baytlarında iptal edildi
+            self.discard_job(key)
+            return
+        self.publish('job', key=key, state='postprocessing')
+        self.logger.info("Dönüştürme kuyruğa alındı: %s (aşamadaki iş: %s)",
+                         filepath, self.scheduler.postprocess_depth() + 1)
+        try:
+            future = self.scheduler.run_postprocess(
+                run_postprocessors, filepath, portable_info(info), postprocess_options(postprocessors), time.time())
+        except Exception as e:
+            self.logger.error("Dönüştürme hatası: %s", e)
+            self.fail_job(key, str(e), 'postprocess')
+            return
+        with self.lock:
+            if job is not None:
+                job['future'] = future
+        future.add_done_callback(lambda f: self.on_postprocessed(key, operation, info.get('duration'),
+                                                                 info.get('title'), f))
+
+    def on_postprocessed(self, key, operation, duration, title, future):
+        with self.lock:
+            job = self.jobs.get(key)
+        if job is None:
+            return
+        if job['control'].cancelled.is_set():
+            # Dönüştürme sürerken iptal edildi; süreç dosyayla işini bitirdi, iş artık kaldırılabilir
+            self.discard_job(key)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            self.logger.error("Dönüştürme hatası: %s", e)
+            self.fail_job(key, str(e), 'postprocess')
+            return
+        # Dönüştürme ayrı süreçte çalışır; süreleri sonuçla birlikte gelir
+        metrics.observe('ytdl_stage_seconds', result['elapsed'], stage='postprocess', operation=operation)
+        metrics.observe('ytdl_stage_seconds', result['wait'], stage='postprocess_wait')
+        self.logger.info("Dönüştürme tamamlandı (%s): %s (kuyrukta %.2f s, işlem %.2f s, CPU %.2f s)",
+                         operation, result['filepath'], result['wait'], result['elapsed'], result['cpu'])
+        self.publish('postprocess', key=key, filename=os.path.basename(result['filepath']), operation=operation,
+                     wait=result['wait'], elapsed=result['elapsed'], cpu=result['cpu'], duration=duration,
+                     pending=self.scheduler.postprocess_depth())
+        self.complete_job(key, result['filepath'], title)
+
+    def progress_hook(self, key):
+        received = {}
+        on_disk = {}
+
+        def hook(d):
+            # Aktarılan bayt sayacı: dosya başına son değerden fark
+            downloaded = d.get('downloaded_bytes') or 0
+            filename = d.get('filename', '')
+            if downloaded > received.get(filename, 0):
+                metrics.inc('ytdl_downloaded_bytes_total', downloaded - received.get(filename, 0))
+                received[filename] = downloaded
+            # Diskte kaplanan alan (önceden ayrılmış dosyada baştan tam boyut); disk ayırmasından düşülür
+            allocated = max(d.get('allocated_bytes') or 0, downloaded)
+            if allocated > on_disk.get(filename, 0):
+                on_disk[filename] = allocated
+                self.disk.written(key, sum(on_disk.values()))
+            if d['status'] == 'downloading':
+                self.publish('download_progress', key=key,
+                             filename=os.path.basename(d.get('filename', '')),
+                             downloaded=d.get('downloaded_bytes', 0),
+                             total=d.get('total_bytes') or d.get('total_bytes_estimate', 0))
+        return hook
+
+    def on_transfer_stopped(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+        if job is None:
+            return
+        control = job['control']
+        self.disk.release(key)
+        if control.cancelled.is_set():
+            self.discard_job(key)
+        elif control.paused.is_set():
+            self.journal.update(key, status='paused', partial_files=sorted(control.partial_files))
+            self.publish('job', key=key, state='paused')
+            self.status("İndirme duraklatıldı", 0, 100)
+            self.notify_idle()
+
+    def end_job(self, key):
+        with self.lock:
+            job = self.jobs.pop(key, None)
+            if job is not None:
+                self.finishing.add(key)
+                if self.flights.get(job['flight']) == key:
+                    del self.flights[job['flight']]
+            timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        self.disk.release(key)
+        return job
+
+    def complete_job(self, key, filepath=None, title=None):
+        self.end_job(key)
+        record = self.journal.get(key)
+        self.journal.remove(key)
+        size = os.path.getsize(filepath) if filepath and os.path.isfile(filepath) else None
+        if size is not None:
+            metrics.observe('ytdl_download_size_bytes', size, SIZE_BUCKETS)
+            self.report_writes(os.path.dirname(os.path.abspath(filepath)))
+        if self.history is not None and record and size is not None:
+            try:
+                entry = self.history.add(canonical_id(record['url']),
+                                         history_format(record['format_id'], record.get('output')),
+                                         filepath, title, size)
+                self.publish('history', entry=entry)
+            except Exception as e:
+                self.logger.error("History write failed: %s", e)
+        self.logger.info("Download finished")
+        self.publish('job', key=key, state='completed', filepath=filepath)
+        self.status("İndirme tamamlandı", 100, 100)
+        self.notify_idle(key)
+
+    def report_writes(self, directory):
+        # Hedef klasörün şimdiye kadarki yazma hızı (parçalı indiricinin diske yazdığı bloklar)
+        stats = write_stats.report(directory)[directory]
+        if stats['bytes_per_second']:
+            self.logger.info("Write throughput for %s: %.1f MB/s (%s bytes)",
+                             directory, stats['bytes_per_second'] / 1024 ** 2, stats['bytes'])
+            self.publish('storage', directory=directory, **stats)
+
+    def fail_job(self, key, error, stage='download'):
+        metrics.inc('ytdl_errors_total', stage=stage)
+        self.end_job(key)
+        self.journal.update(key, status='failed', error=error)
+        self.logger.error("Download error: %s", error)
+        self.publish('job', key=key, state='failed', error=error)
+        self.status(f"İndirme hatası: {error}", 0, 100)
+        self.notify_idle(key)
+
+    def discard_job(self, key):
+        job = self.end_job(key)
+        record = self.journal.get(key) or {}
+        partial_files = set(record.get('partial_files', []))
+        if job is not None:
+            partial_files |= job['control'].partial_files
+        # Parçalı indirmelerin ilerleme dosyası da .part ile birlikte silinir
+        partial_files |= {path + STATE_SUFFIX for path in partial_files}
+        for path in partial_files:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                self.logger.error("Could not remove partial file %s: %s", path, e)
+        self.journal.remove(key)
+        self.publish('job', key=key, state='cancelled')
+        self.status("İndirme iptal edildi", 0, 100)
+        self.notify_idle(key)
+
+    def pause_job(self, key):
+        # İş duraklatıldıysa (ya da duraklatılacaksa) True; dönüştürmedeki iş duraklatılamaz, sonuna kadar sürer
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None:
+                return False
+            if job.get('postprocessing'):
+                self.logger.info("Dönüştürme sürüyor, iş duraklatılmadı: %s", key)
+                return False
+            job['control'].paused.set()
+            # Henüz başlamamışsa (ya da kuyruk dışında bekliyorsa) çıkar; çalışıyorsa kanca durduracak
+            removed = self.scheduler.remove(job['job_id']) or job.get('parked')
+        if removed:
+            self.journal.update(key, status='paused')
+            self.publish('job', key=key, state='paused')
+            self.notify_idle()
+        return True
+
+    def resume_job(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and self.scheduler.is_running(job['job_id']):
+                # Duraklatma isteği henüz işlenmediyse bayrağı kaldırmak yeterli
+                job['control'].paused.clear()
+                return
+        record = self.journal.get(key)
+        if record is None or record.get('status') != 'paused':
+            return
+        self.logger.info("Resuming job %s from partial data", key)
+        self.submit_job(key)
+
+    def cancel_job(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                job['control'].cancelled.set()
+                if job.get('postprocessing'):
+                    # Süreç havuzu dosyaya yazarken iş kaldırılmaz; sırada bekliyorsa dönüştürme hiç başlamaz,
+                    # her iki durumda on_postprocessed işi kaldırır
+                    future = job.get('future')
+                    if future is not None:
+                        future.cancel()
+                    return
+                if not self.scheduler.remove(job['job_id']) and self.scheduler.is_running(job['job_id']):
+                    return
+        self.discard_job(key)
+
+    def active_jobs(self):
+        return [record['key'] for record in self.journal.pending()]
+
+    def restore_jobs(self):
+        # Önceki oturumdan kalan işleri yeniden kuyruğa al (duraklatılmışlar duraklatılmış kalır)
+        restored = 0
+        for record in self.journal.pending():
+            if record['status'] == 'paused':
+                continue
+            self.submit_job(record['key'])
+            restored += 1
+        if restored:
+            self.logger.info("Restored %s unfinished downloads from journal", restored)
+        return restored
+
+    def notify_idle(self, finished=None):
+        with self.idle:
+            self.finishing.discard(finished)
+            self.idle.notify_all()
+
+    def wait(self, timeout=None):
+        # Kuyrukta, aktarımda ya da dönüştürmede iş kalmayana kadar bekle (duraklatılmışlar sayılmaz)
+        def busy():
+            return self.finishing or any(job.get('postprocessing') or not job['control'].paused.is_set()
+                                         for job in self.jobs.values())
+        with self.idle:
+            return self.idle.wait_for(lambda: not busy(), timeout)
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            timers, self.timers = list(self.timers.values()), {}
+        for timer in timers:
+            timer.cancel()
+        self.metadata_lane.shutdown(wait)
+        self.resolve_lane.shutdown(wait)
+        self.scheduler.shutdown(wait)
+        self.ydl_pool.close()
+        if self.http_client is not None:
+            network.stop_shared_client()
+            self.http_client = None
+        if self.history is not None:
+            self.history.close()
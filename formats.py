@@ -0,0 +1,115 @@
+BEST_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best"
+
+# Kodek adlarının yt-dlp'deki farklı yazımları tek bir aileye indirgenir
+CODEC_FAMILIES = (
+    ('avc', 'avc1'), ('h264', 'avc1'),
+    ('vp09', 'vp9'), ('vp9', 'vp9'), ('vp8', 'vp8'),
+    ('av01', 'av1'),
+    ('hev', 'hevc'), ('hvc', 'hevc'), ('h265', 'hevc'),
+    ('mp4a', 'aac'), ('aac', 'aac'), ('opus', 'opus'), ('vorbis', 'vorbis'), ('mp3', 'mp3'),
+)
+
+# Merdiven satırları: video (yükseklik, kodek, uzantı, format_id, bit hızı, boyut, sesli mi)
+#                   ses   (kodek, uzantı, format_id, bit hızı, boyut)
+HEIGHT, CODEC, EXT, FORMAT_ID, BITRATE, SIZE, MUXED = range(7)
+A_CODEC, A_EXT, A_FORMAT_ID, A_BITRATE, A_SIZE = range(5)
+
+
+def codec_family(codec):
+    if not codec or codec == 'none':
+        return None
+    codec = codec.lower()
+    for prefix, family in CODEC_FAMILIES:
+        if codec.startswith(prefix):
+            return family
+    return codec.split('.')[0]
+
+
+def codec_prefixes(family):
+    # Ailenin yt-dlp vcodec değerlerindeki yazımları (vp9 -> vp09.00..., vp9; av1 -> av01...)
+    return [prefix for prefix, name in CODEC_FAMILIES if name == family] or [family]
+
+
+def build_ladder(formats):
+    # Tek geçiş: her (yükseklik, kodek, sesli) ve (ses kodeği, bit hızı) için en yüksek bit hızlı format kalır
+    video = {}
+    audio = {}
+    for f in formats or []:
+        vcodec = codec_family(f.get('vcodec'))
+        acodec = codec_family(f.get('acodec'))
+        size = f.get('filesize') or f.get('filesize_approx') or 0
+        if vcodec:
+            height = f.get('height') or 0
+            bitrate = f.get('vbr') or f.get('tbr') or 0
+            key = (height, vcodec, acodec is not None)
+            best = video.get(key)
+            if best is None or bitrate > best[BITRATE]:
+                video[key] = (height, vcodec, f.get('ext'), f.get('format_id', 'unknown'), bitrate, size,
+                              acodec is not None)
+        elif acodec:
+            bitrate = f.get('abr') or f.get('tbr') or 0
+            key = (acodec, bitrate)
+            if key not in audio:
+                audio[key] = (acodec, f.get('ext'), f.get('format_id', 'unknown'), bitrate, size)
+
+    return {
+        'video': sorted(video.values(), key=lambda row: (row[HEIGHT], row[BITRATE]), reverse=True),
+        'audio': sorted(audio.values(), key=lambda row: row[A_BITRATE], reverse=True),
+    }
+
+
+def video_options(ladder):
+    # Kalite listesi: çözünürlük başına en iyi sesli (birleşik) format; (etiket, format_id, yükseklik)
+    options = [("En İyi Kalite", BEST_FORMAT, None)]
+    seen = set()
+    for row in ladder['video']:
+        if row[MUXED] and row[HEIGHT] not in seen:
+            seen.add(row[HEIGHT])
+            options.append((f"{row[HEIGHT]}p ({row[BITRATE] / 1000:.1f}Mbps)", row[FORMAT_ID], row[HEIGHT]))
+    return options
+
+
+def audio_options(ladder):
+    return [(f"{row[A_BITRATE]}kbps", row[A_FORMAT_ID]) for row in ladder['audio']]
+
+
+def best_video(ladder, max_height=None, ext=None, codec=None):
+    # Merdiven yükseklik ve bit hızına göre sıralı: koşulu sağlayan ilk satır en iyisidir
+    for row in ladder['video']:
+        if max_height and row[HEIGHT] > max_height:
+            continue
+        if ext and row[EXT] != ext:
+            continue
+        if codec and row[CODEC] != codec:
+            continue
+        return row
+    return None
+
+
+def format_spec(ladder, max_height=None, ext=None, codec=None):
+    # Kodek bir tercihtir: o kodekte uygun format yoksa aynı çözünürlük sınırıyla diğer kodeklere düşülür
+    row = None
+    if ladder:
+        row = best_video(ladder, max_height, ext, codec) or best_video(ladder, max_height, ext)
+    if row is not None:
+        if row[MUXED]:
+            return row[FORMAT_ID]
+        audio_ext = 'm4a' if row[EXT] == 'mp4' else 'webm'
+        return f"{row[FORMAT_ID]}+bestaudio[ext={audio_ext}]/{row[FORMAT_ID]}+bestaudio"
+
+    # Format listesi henüz alınmamışsa aynı koşulları yt-dlp ifadesi olarak ver: önce kodeğin her yazımıyla,
+    # sonra kodeksiz; çözünürlük sınırı sadece en sondaki "best" seçeneğinde kalkar
+    filters = ''.join(filter(None, (
+        f"[height<={max_height}]" if max_height else '',
+        f"[ext={ext}]" if ext else '',
+    )))
+    if not filters and not codec:
+        return BEST_FORMAT
+    variants = [f"{filters}[vcodec^={prefix}]" for prefix in codec_prefixes(codec)] if codec else []
+    spec = '/'.join(f"bestvideo{variant}+bestaudio/best{variant}" for variant in variants + [filters])
+    return spec + '/best' if filters else spec
+
+
+def select_formats(videos, max_height=None, ext=None, codec=None):
+    # Toplu sorgu, ör. seçili tüm satırlar için "en iyi ≤1080p mp4": {video id: format ifadesi}
+    return {video['id']: format_spec(video.get('format_ladder'), max_height, ext, codec) for video in videos}
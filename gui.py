@@ -1,36 +1,101 @@
 import os
 import time
 import logging
+import threading
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-                             QComboBox, QLabel, QProgressBar, QListWidget, QApplication,
-                             QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem,
-                             QAbstractItemView, QHeaderView, QFileDialog)
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QObject, QThreadPool, QRunnable
+                             QComboBox, QLabel, QProgressBar, QListWidget, QListWidgetItem, QApplication,
+                             QGroupBox, QMessageBox, QTableView, QAbstractItemView,
+                             QHeaderView, QFileDialog, QCheckBox, QSpinBox, QDoubleSpinBox)
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QObject
 from PyQt6.QtGui import QIcon
-from PyQt6.QtNetwork import QNetworkAccessManager
-from downloader import YouTubeDownloader
+import startup
+from utils import canonical_id
+from video_model import VideoTableModel
+from thumbnails import ThumbnailLoader, VISIBLE_DELAY, visible_rows
+from planner import PlanRule, BatchPlan, Throughput
+from metrics import metrics
+
+# Format seçenekleri ve karşılık gelen çıktı türü (postprocess.OUTPUTS)
+FORMAT_OPTIONS = [("Video", "video"), ("Ses (orijinal)", "native"), ("Ses (MP3)", "mp3")]
+
+# Kalite ve kodek seçenekleri her girdiye kendi format listesinden uygulanan kuralın parçalarıdır
+# (ilk videonun format kimlikleri diğer girdilerde bulunmayabilir)
+VIDEO_HEIGHTS = (2160, 1440, 1080, 720, 480, 360, 240, 144)
+AUDIO_BITRATES = (160, 128, 96, 70, 48)
+VIDEO_CODECS = [("Fark etmez", None), ("H.264 (avc1)", "avc1"), ("VP9", "vp9"), ("AV1", "av1")]
+AUDIO_CODECS = [("Fark etmez", None), ("AAC", "aac"), ("Opus", "opus")]
+# Kural ya da seçim değiştikten bu kadar sonra plan yeniden hesaplanır (ms)
+PLAN_DELAY = 200
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ICON_DIR = os.path.join(BASE_DIR, 'resources', 'icons')
 
+# İndirme motorunun varsayılanları (motor yüklenmeden önce ayar kutularında gösterilir)
+DEFAULT_CONCURRENCY = 3
+DEFAULT_SEGMENTS = 4
+
+
+class BackendLoader(QObject):
+    # yt_dlp ve indirme motoru pencere çizildikten sonra arka planda içe aktarılır, kurulur ve
+    # ısıtılır; hazır motor arayüz iş parçacığına sinyalle teslim edilir
+    loaded = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def start(self, **engine_options):
+        threading.Thread(target=self.run, kwargs=engine_options, name='backend-loader', daemon=True).start()
+
+    def run(self, **engine_options):
+        try:
+            import downloader
+            engine = downloader.DownloadEngine(**engine_options)
+            engine.ydl_pool.warm(engine.ydl_opts)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(downloader, engine)
+
 
 class YouTubeDownloaderGUI(QWidget):
-    def __init__(self):
+    # İndirme motoru bağlanıp bilgi almaya hazır olunca yayınlanır
+    ready = pyqtSignal()
+
+    def __init__(self, queue=None, queue_token=None):
         super().__init__()
-        # Temel logger ayarları
-        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
 
-        # YouTubeDownloader sınıfının örneğini oluştur
-        self.downloader = YouTubeDownloader()
-        self.downloader.progress_signal.connect(self.update_progress)
-        self.downloader.download_progress_signal.connect(self.update_download_progress)
-
-        # Ağ yöneticisi oluştur (gelecekteki kullanım için)
-        self.network_manager = QNetworkAccessManager()
+        # Motor ilk çizimden sonra yüklenir; o zamana kadar istenen işlemler sıraya alınır
+        self.downloader = None
+        # queue verilirse indirmeler paylaşılan kuyruktaki işçilere gönderilir (bilgi alma yine bu süreçte)
+        self.queue_target = queue
+        self.queue_token = queue_token
+        self.remote_queue = None
+        self.pending_actions = []
+        self.painted = False
+        self.backend_loader = BackendLoader(self)
+        self.backend_loader.loaded.connect(self.on_backend_loaded)
+        self.backend_loader.failed.connect(self.on_backend_failed)
 
         # Playlist yükleme iptal bayrağı
         self.cancel_playlist_loading = False
+        self.loading_info = False
+
+        # Video kayıtları: video kimliğine göre dizinlenmiş tablo modeli; önizlemeler görünür satırlar için
+        # kaydırma durunca yüklenir
+        self.thumbnails = ThumbnailLoader(self)
+        self.video_model = VideoTableModel(self, thumbnails=self.thumbnails)
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(VISIBLE_DELAY)
+        self.thumbnail_timer.timeout.connect(self.request_visible_thumbnails)
+
+        # İndirme planı: seçili girdilerin kurala göre formatı, toplam boyutu ve tahmini süresi
+        self.plan = None
+        self.plan_cache = {}
+        self.throughput = Throughput()
+        self.plan_timer = QTimer(self)
+        self.plan_timer.setSingleShot(True)
+        self.plan_timer.setInterval(PLAN_DELAY)
+        self.plan_timer.timeout.connect(self.start_plan)
 
         # Arayüzü başlat
         self.initUI()
@@ -38,15 +103,72 @@ class YouTubeDownloaderGUI(QWidget):
         # İlerleme çubuğunu ayarla
         self.progress_bar.setRange(0, 100)
 
-        # Geçici veri saklama listesi
-        self.temp_video_info = []
-
         # Şu anki worker'ı saklamak için değişken
         self.current_worker = None
-
-        # Thread havuzu oluştur
-        self.thread_pool = QThreadPool()
-        self.logger.debug(f"Multithreading with maximum {self.thread_pool.maxThreadCount()} threads")
+        self.status_label.setText("Hazırlanıyor...")
+        startup.mark('window_created')
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            startup.mark('first_paint')
+            # Pencere ekrana geldi; ağır modüller şimdi arka planda yüklenir
+            QTimer.singleShot(0, lambda: self.backend_loader.start(
+                max_concurrent_downloads=self.concurrency_spin.value(), segments=self.segments_spin.value(),
+                global_rate_limit=self.rate_limit_spin.value() * 1024 or None))
+
+    def on_backend_loaded(self, module, engine):
+        self.downloader = module.YouTubeDownloader(engine=engine)
+        self.downloader.progress_signal.connect(self.update_progress)
+        self.downloader.progress_batch_signal.connect(self.update_download_progress)
+        self.downloader.entry_resolved_signal.connect(self.on_entry_resolved)
+        self.downloader.entry_failed_signal.connect(self.on_entry_failed)
+        self.downloader.queue_stats_signal.connect(self.update_queue_label)
+        # Arşivden atlanan işlerin durumu download_video dönmeden yayınlanır; satır işe bağlandıktan sonra işlensin
+        self.downloader.job_state_signal.connect(self.on_job_state_changed, Qt.ConnectionType.QueuedConnection)
+        self.downloader.postprocess_signal.connect(self.on_postprocessed)
+        self.downloader.history_signal.connect(self.on_history_added)
+        # Motor yüklenirken değiştirilen ayarlar
+        self.downloader.scheduler.set_max_concurrent(self.concurrency_spin.value())
+        self.downloader.scheduler.set_global_rate_limit(self.rate_limit_spin.value() * 1024)
+        if self.queue_target:
+            self.remote_queue = module.RemoteQueue(self.queue_target, self.queue_token)
+            self.remote_queue.progress_batch_signal.connect(self.update_download_progress)
+            self.remote_queue.job_state_signal.connect(self.on_job_state_changed, Qt.ConnectionType.QueuedConnection)
+            self.remote_queue.queue_status_signal.connect(self.update_remote_queue_label)
+
+        self.status_label.setText("Hazır")
+        # Önceki oturumdan yarım kalan indirmeleri sürdür
+        restored = self.downloader.restore_jobs()
+        if restored:
+            self.status_label.setText(f"{restored} yarım kalan indirme kaldığı yerden sürdürülüyor")
+        self.load_history_page()
+        startup.mark('ready')
+        self.logger.info("Backend ready in %.3f s after first paint",
+                         startup.marks['ready'] - startup.marks.get('first_paint', 0))
+
+        actions, self.pending_actions = self.pending_actions, []
+        for action in actions:
+            action()
+        self.ready.emit()
+
+    def on_backend_failed(self, error):
+        self.logger.error("Backend failed to load: %s", error)
+        self.status_label.setText(f"İndirme motoru yüklenemedi: {error}")
+
+    def job_manager(self):
+        # İndirme işlerini yürüten taraf: paylaşılan kuyruk ya da bu süreçteki motor
+        return self.remote_queue or self.downloader
+
+    def when_ready(self, action):
+        # Motor hazır değilse işlem hazır olunca çalıştırılır
+        if self.downloader is not None:
+            return True
+        if action not in self.pending_actions:
+            self.pending_actions.append(action)
+        self.status_label.setText("İndirme motoru hazırlanıyor, işlem hazır olunca başlayacak...")
+        return False
 
     def initUI(self):
         self.setWindowTitle('YouTube Video İndirici')
@@ -61,7 +183,11 @@ class YouTubeDownloaderGUI(QWidget):
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("YouTube video veya playlist URL'sini girin")
         self.fetch_btn = QPushButton(QIcon(os.path.join(ICON_DIR, "info_icon.png")), "Bilgi Al")
+        # İşaretliyse önbellek atlanır ve bilgiler yeniden alınır
+        self.refresh_checkbox = QCheckBox("Yenile")
+        self.refresh_checkbox.setToolTip("Önbelleği atla ve bilgileri YouTube'dan yeniden al")
         url_layout.addWidget(self.url_input)
+        url_layout.addWidget(self.refresh_checkbox)
         url_layout.addWidget(self.fetch_btn)
         main_layout.addLayout(url_layout)
 
@@ -72,11 +198,15 @@ class YouTubeDownloaderGUI(QWidget):
         info_group = QGroupBox("Video/Playlist Bilgisi")
         info_layout = QVBoxLayout(info_group)
 
-        self.video_table = QTableWidget()
-        self.video_table.setColumnCount(4)
-        self.video_table.setHorizontalHeaderLabels(["Seç", "Başlık", "Süre", "Durum"])
+        # Görünüm sadece ekrandaki satırları çizer; sabit satır yüksekliği içerik ölçümünü önler
+        self.video_table = QTableView()
+        self.video_table.setModel(self.video_model)
         self.video_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.video_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.video_table.setWordWrap(False)
+        self.video_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.video_table.verticalHeader().setDefaultSectionSize(self.thumbnails.size.height() + 4)
+        self.video_table.setIconSize(self.thumbnails.size)
         self.video_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         info_layout.addWidget(self.video_table)
 
@@ -92,16 +222,44 @@ class YouTubeDownloaderGUI(QWidget):
         format_layout = QHBoxLayout()
         format_layout.addWidget(QLabel("Format:"))
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["Video (MP4)", "Ses (MP3)"])
+        self.add_format_items()
         format_layout.addWidget(self.format_combo)
         options_layout.addLayout(format_layout)
 
+        # Playlist girdilerinin kalite bilgisi: sadece seçilenler için mi, hepsi için mi alınsın
+        resolve_layout = QHBoxLayout()
+        resolve_layout.addWidget(QLabel("Kalite Bilgisi:"))
+        self.resolve_mode_combo = QComboBox()
+        self.resolve_mode_combo.addItem("Seçilenler için", "lazy")
+        self.resolve_mode_combo.addItem("Tümü için", "eager")
+        resolve_layout.addWidget(self.resolve_mode_combo)
+        options_layout.addLayout(resolve_layout)
+
         quality_layout = QHBoxLayout()
         quality_layout.addWidget(QLabel("Kalite:"))
         self.quality_combo = QComboBox()
         quality_layout.addWidget(self.quality_combo)
         options_layout.addLayout(quality_layout)
 
+        codec_layout = QHBoxLayout()
+        codec_layout.addWidget(QLabel("Kodek Tercihi:"))
+        self.codec_combo = QComboBox()
+        self.codec_combo.setToolTip("Aynı çözünürlükte önce bu kodek seçilir; yoksa diğerleri kullanılır")
+        codec_layout.addWidget(self.codec_combo)
+        options_layout.addLayout(codec_layout)
+
+        size_layout = QHBoxLayout()
+        size_layout.addWidget(QLabel("En Fazla Boyut:"))
+        self.max_size_spin = QDoubleSpinBox()
+        self.max_size_spin.setRange(0, 1000)
+        self.max_size_spin.setDecimals(1)
+        self.max_size_spin.setSingleStep(0.5)
+        self.max_size_spin.setSuffix(" GB")
+        self.max_size_spin.setSpecialValueText("Sınırsız")
+        self.max_size_spin.setToolTip("Daha büyük formatlar seçilmez; en küçüğü de sığmayan video indirilmez")
+        size_layout.addWidget(self.max_size_spin)
+        options_layout.addLayout(size_layout)
+
         file_path_layout = QHBoxLayout()
         self.file_path_input = QLineEdit()
         self.file_path_input.setPlaceholderText("İndirme konumu")
@@ -110,10 +268,41 @@ class YouTubeDownloaderGUI(QWidget):
         file_path_layout.addWidget(self.file_path_btn)
         options_layout.addLayout(file_path_layout)
 
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("Eş Zamanlı İndirme:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 16)
+        self.concurrency_spin.setValue(DEFAULT_CONCURRENCY)
+        concurrency_layout.addWidget(self.concurrency_spin)
+        options_layout.addLayout(concurrency_layout)
+
+        segments_layout = QHBoxLayout()
+        segments_layout.addWidget(QLabel("Bağlantı Sayısı:"))
+        self.segments_spin = QSpinBox()
+        self.segments_spin.setRange(1, 16)
+        self.segments_spin.setValue(DEFAULT_SEGMENTS)
+        self.segments_spin.setToolTip("Her dosya için eş zamanlı bağlantı (parça) sayısı")
+        segments_layout.addWidget(self.segments_spin)
+        options_layout.addLayout(segments_layout)
+
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("Hız Sınırı:"))
+        self.rate_limit_spin = QSpinBox()
+        self.rate_limit_spin.setRange(0, 1000000)
+        self.rate_limit_spin.setSingleStep(256)
+        self.rate_limit_spin.setSuffix(" KB/s")
+        self.rate_limit_spin.setSpecialValueText("Sınırsız")
+        rate_layout.addWidget(self.rate_limit_spin)
+        options_layout.addLayout(rate_layout)
+
         self.download_btn = QPushButton(QIcon(os.path.join(ICON_DIR, "download_icon.png")), "İndir")
         self.download_btn.setObjectName("download_btn")
         options_layout.addWidget(self.download_btn)
 
+        self.plan_label = QLabel("Plan: -")
+        self.plan_label.setWordWrap(True)
+        options_layout.addWidget(self.plan_label)
+
         speed_time_layout = QVBoxLayout()
         self.speed_label = QLabel("İndirme Hızı: -")
         self.time_label = QLabel("Tahmini Süre: -")
@@ -130,8 +319,10 @@ class YouTubeDownloaderGUI(QWidget):
         progress_layout = QVBoxLayout(progress_group)
         self.status_label = QLabel("Hazır")
         self.progress_bar = QProgressBar()
+        self.queue_label = QLabel("Kuyrukta: 0 | İndirilen: 0")
         progress_layout.addWidget(self.progress_bar)
         progress_layout.addWidget(self.status_label)
+        progress_layout.addWidget(self.queue_label)
 
         # İndirme kontrol butonları
         control_layout = QHBoxLayout()
@@ -155,6 +346,11 @@ class YouTubeDownloaderGUI(QWidget):
         history_layout.addWidget(self.history_list)
         main_layout.addWidget(history_group)
 
+        # Geçmiş sayfa sayfa yüklenir; liste sonuna yaklaşınca bir sonraki sayfa gelir
+        self.history_last = None
+        self.history_done = False
+        self.history_list.verticalScrollBar().valueChanged.connect(self.on_history_scrolled)
+
         # Telif hakkı metni
         copyright_label = QLabel("YouTube Video İndirici - 2024 - bigfiggings")
         copyright_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -162,6 +358,7 @@ class YouTubeDownloaderGUI(QWidget):
         main_layout.addWidget(copyright_label)
 
         self.setLayout(main_layout)
+        self.update_quality_options()
         self.setup_connections()
         self.progress_bar.setVisible(True)
 
@@ -169,9 +366,26 @@ class YouTubeDownloaderGUI(QWidget):
         self.fetch_btn.clicked.connect(self.fetch_info)
         self.file_path_btn.clicked.connect(self.select_directory)
         self.format_combo.currentIndexChanged.connect(self.update_quality_options)
-        self.video_table.itemChanged.connect(self.update_video_selection)
+        self.video_model.check_changed.connect(self.update_video_selection)
+        self.video_model.rowsInserted.connect(lambda *args: self.update_video_count_label())
+        # Plan kural ya da seçim değişince (kısa bir gecikmeyle, arka arkaya değişiklikler birleşerek) yenilenir
+        for signal in (self.video_model.rowsInserted, self.video_model.modelReset, self.video_model.check_changed,
+                       self.quality_combo.currentIndexChanged, self.codec_combo.currentIndexChanged,
+                       self.max_size_spin.valueChanged, self.rate_limit_spin.valueChanged):
+            signal.connect(lambda *args: self.plan_timer.start())
+        self.video_table.selectionModel().selectionChanged.connect(self.resolve_selected_entries)
+        # Kaydırma sürerken zamanlayıcı yeniden başlar; önizlemeler sadece durulan ekran için istenir
+        for signal in (self.video_table.verticalScrollBar().valueChanged, self.video_model.rowsInserted,
+                       self.video_model.modelReset):
+            signal.connect(lambda *args: self.thumbnail_timer.start())
         self.download_btn.clicked.connect(self.start_download)
-        # Yeni bağlantılar eklenebilir (örneğin, duraklat, devam et, iptal et butonları için)
+        self.pause_btn.clicked.connect(self.pause_downloads)
+        self.resume_btn.clicked.connect(self.resume_downloads)
+        self.cancel_btn.clicked.connect(self.cancel_downloads)
+        self.concurrency_spin.valueChanged.connect(
+            lambda value: self.downloader and self.downloader.scheduler.set_max_concurrent(value))
+        self.rate_limit_spin.valueChanged.connect(
+            lambda value: self.downloader and self.downloader.scheduler.set_global_rate_limit(value * 1024))
 
     def adjust_table_columns(self):
         self.video_table.setColumnWidth(0, 30)  # Checkbox sütunu
@@ -188,6 +402,12 @@ class YouTubeDownloaderGUI(QWidget):
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.adjust_table_columns()
+        self.thumbnail_timer.start()
+
+    @metrics.timed('gui_dispatch')
+    def request_visible_thumbnails(self):
+        rows = visible_rows(self.video_table)
+        self.thumbnails.request(self.video_model.thumbnail_items(*rows) if rows else [])
 
     def fetch_info(self):
         url = self.url_input.text().strip()
@@ -199,18 +419,27 @@ class YouTubeDownloaderGUI(QWidget):
             QMessageBox.warning(self, "Hata",
                                 "Geçersiz YouTube URL'si. Lütfen geçerli bir YouTube video veya playlist URL'si girin.")
             return
+        if not self.when_ready(self.fetch_info):
+            return
 
         self.progress_bar.setValue(0)
         self.status_label.setText("Bilgiler alınıyor...")
-        self.video_table.setRowCount(0)
-        self.temp_video_info.clear()
+        self.cancel_playlist_loading = False
+        self.video_model.clear()
+        self.downloader.cancel_pending_resolves()
 
+        refresh = self.refresh_checkbox.isChecked()
+        previous = self.current_worker if self.loading_info else None
         if 'list=' in url:
-            worker = self.downloader.get_playlist_info(url)
+            worker = self.downloader.get_playlist_info(url, refresh)
         else:
-            worker = self.downloader.get_video_info(url)
+            worker = self.downloader.get_video_info(url, refresh)
+        if previous is not None:
+            # Önceki istek temizlenen tabloya yazmasın; aynı URL ise görev yeni istekle sürer
+            previous.cancel()
 
         self.current_worker = worker
+        self.loading_info = True
         worker.signals.progress.connect(self.update_progress)
         worker.signals.error.connect(self.show_error)
         worker.signals.finished.connect(self.on_worker_finish)
@@ -223,103 +452,199 @@ class YouTubeDownloaderGUI(QWidget):
         if directory:
             self.file_path_input.setText(directory)
 
+    @metrics.timed('gui_dispatch')
     def update_progress(self, status, current, total, video_info):
         self.status_label.setText(status)
-        self.progress_bar.setValue(int((current / total) * 100))
+        if total:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(min(100, int((current / total) * 100)))
+        else:
+            # Toplamı bilinmeyen playlist: görülen girdi sayısı durum metninde, çubuk meşgul göstergesi
+            self.progress_bar.setRange(0, 0)
 
         if video_info and isinstance(video_info, dict):
             self.process_video_info(video_info)
         else:
-            self.logger.warning(f"Geçersiz video bilgisi alındı: {video_info}")
+            self.logger.warning("Geçersiz video bilgisi alındı: %s", video_info)
 
-        self.update_format_options()
+        # Playlist girdileri için kalite listesi ilk satır çözümlendiğinde ve sonda güncellenir
+        if not (video_info and ('playlist_index' in video_info or 'playlist_entries' in video_info)):
+            self.update_format_options()
 
     def process_video_info(self, video_info):
         if not video_info or 'error' in video_info:
             QMessageBox.warning(self, "Hata", "Video bilgileri alınamadı.")
             return
 
-        self.temp_video_info.clear()
-        self.temp_video_info.append(video_info)
+        # Playlist özet bilgisi: satırlar zaten tek tek eklendi
+        if 'playlist_videos' in video_info:
+            return
+
+        # Playlist girdileri sayfalar okundukça gruplar halinde gelir
+        if 'playlist_entries' in video_info:
+            if not self.cancel_playlist_loading:
+                for entry in video_info['playlist_entries']:
+                    self.add_playlist_entry(entry)
+            return
+
+        if 'playlist_index' in video_info:
+            if not self.cancel_playlist_loading:
+                self.add_playlist_entry(video_info)
+            return
+
         self.add_video_to_table(video_info)
-        self.video_count_label.setText(f"Toplam video sayısı: {len(self.temp_video_info)}")
         self.status_label.setText("Video bilgileri alındı. İndirilmeye hazır.")
         self.progress_bar.setValue(100)
 
         self.update_format_options()
-        self.logger.debug(f"İşlenmiş video bilgileri: {video_info['title']}")
-
-    def add_video_to_table(self, video_info):
-        self.video_table.setRowCount(0)  # Mevcut satırları temizle
-        row_position = self.video_table.rowCount()
-        self.video_table.insertRow(row_position)
+        self.logger.debug("İşlenmiş video bilgileri: %s", video_info['title'])
 
-        # Checkbox
-        checkbox = QTableWidgetItem()
-        checkbox.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        checkbox.setCheckState(Qt.CheckState.Checked)
-        self.video_table.setItem(row_position, 0, checkbox)
+    def add_playlist_entry(self, video_info):
+        # Satırlar modelde biriktirilir ve toplu olarak eklenir
+        first = self.video_model.first_record() is None
+        video_id = self.video_model.queue_video(video_info)
 
-        # Title
-        self.video_table.setItem(row_position, 1, QTableWidgetItem(video_info.get('title', 'Bilinmeyen')))
+        # İlk satır her durumda çözümlenir ki kalite listesi dolsun
+        if self.resolve_mode_combo.currentData() == "eager" or first:
+            self.resolve_entry(video_id, priority=1 if first else 0)
 
-        # Duration
-        self.video_table.setItem(row_position, 2, QTableWidgetItem(video_info.get('duration_string', '00:00')))
-
-        # Status
-        self.video_table.setItem(row_position, 3, QTableWidgetItem("Hazır"))
+    def resolve_entry(self, video_id, priority=0):
+        video = self.video_model.record(video_id)
+        url = video.get('webpage_url') if video else None
+        if not url or video.get('resolved') or video.get('resolving'):
+            return
+        video['resolving'] = True
+        self.video_model.set_status(video_id, "Çözümleniyor")
+        self.downloader.resolve_entry(video_id, url, priority)
+
+    def resolve_selected_entries(self):
+        # Tembel modda sadece kullanıcının seçtiği satırların kalite bilgisi alınır
+        for index in self.video_table.selectionModel().selectedRows():
+            video = self.video_model.record_at(index.row())
+            if video:
+                self.resolve_entry(video['id'], priority=1)
+
+    @metrics.timed('gui_dispatch')
+    def on_entry_resolved(self, video_id, info):
+        video = self.video_model.record(video_id)
+        # Yeni bir bilgi alma işlemi başladıysa eski sonuçları yok say
+        if not video or canonical_id(video.get('webpage_url')) != canonical_id(info.get('webpage_url')):
+            return
 
-        self.logger.debug(f"Video tabloya eklendi: {video_info.get('title', 'Bilinmeyen')}")
+        fields = {key: info[key] for key in ('format_ladder', 'duration_string') if key in info}
+        self.video_model.update_video(video_id, (VideoTableModel.DURATION,), resolved=True, resolving=False, **fields)
+        self.video_model.set_status(video_id, "Hazır")
+        # Girdinin format merdiveni geldi; plan tahmin yerine gerçek boyutla yenilenir
+        self.plan_timer.start()
+
+    @metrics.timed('gui_dispatch')
+    def on_entry_failed(self, video_id, error):
+        if self.video_model.update_video(video_id, resolving=False):
+            self.video_model.set_status(video_id, "Hata")
+            self.logger.error("Playlist girdisi çözümlenemedi (%s): %s", video_id, error)
+
+    def add_video_to_table(self, video_info, clear=True):
+        if clear:
+            self.video_model.clear()  # Mevcut satırları temizle
+        self.video_model.add_videos([video_info])
+        self.logger.debug("Video tabloya eklendi: %s", video_info.get('title', 'Bilinmeyen'))
+
+    def add_format_items(self):
+        for label, output in FORMAT_OPTIONS:
+            self.format_combo.addItem(label, output)
+        self.format_combo.setItemData(1, "Ses yeniden kodlanmadan kaydedilir (m4a/opus)", Qt.ItemDataRole.ToolTipRole)
 
     def update_format_options(self):
+        output = self.format_combo.currentData()
+        self.format_combo.blockSignals(True)
         self.format_combo.clear()
-        self.format_combo.addItems(["Video", "Ses"])
+        self.add_format_items()
+        self.format_combo.setCurrentIndex(max(0, self.format_combo.findData(output)))
+        self.format_combo.blockSignals(False)
         self.update_quality_options()
 
     def update_quality_options(self):
+        # Seçenekler üst sınırdır; her girdi için sınırın altındaki en iyi format planlayıcıda seçilir
+        quality = self.quality_combo.currentData()
+        codec = self.codec_combo.currentData()
         self.quality_combo.clear()
-        selected_format = self.format_combo.currentText()
-
-        if self.temp_video_info:
-            video_info = self.temp_video_info[0]
-            video_formats, audio_formats = self.downloader.get_available_formats(video_info)
-
-            if selected_format == "Video":
-                for format_note, format_id in video_formats:
-                    self.quality_combo.addItem(format_note, format_id)
-            else:
-                for format_note, format_id in audio_formats:
-                    self.quality_combo.addItem(format_note, format_id)
-                # Ses için en iyi kalite seçeneğini ekleyelim
-                self.quality_combo.insertItem(0, "En İyi Ses Kalitesi", "bestaudio/best")
+        self.codec_combo.clear()
+        if self.format_combo.currentData() == "video":
+            self.quality_combo.addItem("En İyi Kalite", None)
+            for height in VIDEO_HEIGHTS:
+                self.quality_combo.addItem(f"En fazla {height}p", height)
+            codecs = VIDEO_CODECS
         else:
-            self.quality_combo.addItem("Kalite seçeneği bulunamadı")
-
-        self.logger.debug(
-            f"Kalite seçenekleri güncellendi. Seçenekler: {[self.quality_combo.itemText(i) for i in range(self.quality_combo.count())]}")
-
-    def update_video_selection(self, item):
-        if item.column() == 0:
-            row = item.row()
-            is_checked = item.checkState() == Qt.CheckState.Checked
-            if 0 <= row < len(self.temp_video_info):
-                self.temp_video_info[row]['selected'] = is_checked
-                self.update_video_status()
-            else:
-                self.logger.error(
-                    f"Hata: Geçersiz satır indeksi {row}. temp_video_info uzunluğu: {len(self.temp_video_info)}")
+            self.quality_combo.addItem("En İyi Ses Kalitesi", None)
+            for bitrate in AUDIO_BITRATES:
+                self.quality_combo.addItem(f"En fazla {bitrate} kbps", bitrate)
+            codecs = AUDIO_CODECS
+        for label, value in codecs:
+            self.codec_combo.addItem(label, value)
+        self.quality_combo.setCurrentIndex(max(0, self.quality_combo.findData(quality)))
+        self.codec_combo.setCurrentIndex(max(0, self.codec_combo.findData(codec)))
+
+        self.logger.debug("Kalite seçenekleri güncellendi: %d seçenek", self.quality_combo.count())
+
+    def plan_rule(self):
+        output = self.format_combo.currentData()
+        quality = self.quality_combo.currentData()
+        max_size = int(self.max_size_spin.value() * 1024 ** 3) or None
+        if output == "video":
+            return PlanRule(output, max_height=quality, codec=self.codec_combo.currentData(), max_size=max_size)
+        return PlanRule(output, max_abr=quality, codec=self.codec_combo.currentData(), max_size=max_size)
+
+    def selected_records(self):
+        return [video for video in self.video_model.all_records() if video.get('selected', True)]
+
+    def start_plan(self):
+        # Önceki plan yarıdaysa bırakılır; yeni plan olay döngüsü turları arasında parça parça hesaplanır
+        self.plan = BatchPlan(self.selected_records(), self.plan_rule(), self.plan_cache)
+        self.plan_step(self.plan)
+
+    @metrics.timed('gui_dispatch')
+    def plan_step(self, plan):
+        if plan is not self.plan:
+            return
+        if plan.step():
+            self.show_plan(plan.summary())
+        else:
+            self.plan_label.setText(f"Planlanıyor... {plan.index}/{len(plan.records)}")
+            QTimer.singleShot(0, lambda: self.plan_step(plan))
+
+    def plan_text(self, summary):
+        if not summary['count']:
+            return "Plan: -"
+        text = f"Plan: {summary['count'] - summary['over_limit']} video | Toplam: {self.format_size(summary['bytes'])}"
+        if summary['estimated']:
+            text += f" ({summary['estimated']} video süreden tahmini)"
+        if summary['unknown']:
+            text += f" + {summary['unknown']} video boyutu bilinmiyor"
+        eta = self.throughput.eta(summary['bytes'], self.rate_limit_spin.value() * 1024)
+        text += f" | Tahmini Süre: {self.format_time(eta) if eta is not None else '-'}"
+        if summary['over_limit']:
+            text += f" | {summary['over_limit']} video boyut sınırını aşıyor, indirilmeyecek"
+        return text
+
+    def show_plan(self, summary):
+        self.plan_label.setText(self.plan_text(summary))
+
+    def update_video_selection(self, video_id, is_checked):
+        self.update_video_status()
+        if is_checked:
+            self.resolve_entry(video_id, priority=1)
 
     def update_video_status(self):
-        selected_count = sum(1 for video in self.temp_video_info if video.get('selected', False))
-        total_duration = sum(self.get_duration_seconds(video.get('duration', '00:00'))
-                             for video in self.temp_video_info if video.get('selected', False))
+        selected = [video for video in self.video_model.all_records() if video.get('selected', True)]
+        selected_count = len(selected)
+        total_duration = sum(self.get_duration_seconds(video.get('duration', '00:00')) for video in selected)
 
         status_text = f"Seçili video sayısı: {selected_count} | "
         status_text += f"Seçili video süresi: {self.format_duration(total_duration)}"
         self.video_count_label.setText(status_text)
 
     def update_video_count_label(self):
-        count = len(self.temp_video_info)
+        count = len(self.video_model.all_records())
         self.video_count_label.setText(f"Toplam video sayısı: {count}")
 
     def get_duration_seconds(self, duration_str):
@@ -339,14 +664,18 @@ class YouTubeDownloaderGUI(QWidget):
             return f"{minutes:02d}:{seconds:02d}"
 
     def on_worker_finish(self):
+        self.loading_info = False
         self.status_label.setText("Bilgi alma işlemi tamamlandı.")
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(100)
         self.update_format_options()
         self.update_video_count_label()
         self.logger.debug("Worker tamamlandı. Format ve kalite seçenekleri güncellendi.")
 
     def start_download(self):
-        if not self.temp_video_info:
+        if not self.when_ready(self.start_download):
+            return
+        if not self.video_model.all_records():
             QMessageBox.warning(self, "Hata", "Lütfen önce bir video veya playlist seçin.")
             return
 
@@ -355,53 +684,167 @@ class YouTubeDownloaderGUI(QWidget):
             QMessageBox.warning(self, "Hata", "Lütfen bir indirme konumu seçin.")
             return
 
-        selected_format = self.format_combo.currentText()
-        selected_quality = self.quality_combo.currentData()
-
-        selected_videos = [video for video in self.temp_video_info if video.get('selected', True)]
+        selected_videos = self.selected_records()
 
         if not selected_videos:
             QMessageBox.warning(self, "Hata", "Lütfen en az bir video seçin.")
             return
 
-        for index, video in enumerate(selected_videos):
+        # Kural her video için kendi format merdiveninden çözülür (ör. ≤1080p, avc1 tercih, en fazla 2 GB);
+        # arayüzde gösterilen planla aynı önbellek kullanıldığından sadece değişen girdiler yeniden hesaplanır
+        plan = BatchPlan(selected_videos, self.plan_rule(), self.plan_cache).finish()
+        self.plan = plan
+        self.show_plan(plan.summary())
+
+        started = 0
+        for video in selected_videos:
             url = video.get('webpage_url')
             if not url:
-                self.logger.error(f"Video URL'si bulunamadı: {video.get('title')}")
+                self.logger.error("Video URL'si bulunamadı: %s", video.get('title'))
                 continue
 
-            if "Video" in selected_format:
-                format_id = selected_quality
-            else:
-                format_id = 'bestaudio/best'
-
-            self.downloader.download_video(url, format_id, output_path)
-
-            # Tabloyu güncelle
-            for row in range(self.video_table.rowCount()):
-                if self.video_table.item(row, 1).text() == video.get('title'):
-                    self.video_table.item(row, 3).setText("İndiriliyor")
-                    self.video_table.item(row, 3).setBackground(Qt.GlobalColor.yellow)
-                    break
-
-        self.logger.debug(f"İndirme başlatıldı: {len(selected_videos)} video")
-
-    def get_format_id(self, video_info, quality):
-        for format in video_info.get('formats', []):
-            if f"{format.get('height')}p" in quality and format.get('vcodec') != 'none':
-                return format['format_id']
-        return 'bestvideo+bestaudio/best'
+            entry = plan.entries[video['id']]
+            if not entry['fits']:
+                self.video_model.set_status(video['id'], "Boyut Sınırını Aşıyor", Qt.GlobalColor.lightGray)
+                continue
 
-    def update_download_progress(self, filename, downloaded, total):
-        progress = (downloaded / total) * 100 if total > 0 else 0
-        self.progress_bar.setValue(int(progress))
-        self.status_label.setText(f"İndiriliyor: {filename} - %{progress:.1f}")
+            # İş anahtarı kayda bağlanır; durum güncellemeleri satırı doğrudan bulur
+            key = self.job_manager().download_video(url, entry['format'], output_path,
+                                                    segments=self.segments_spin.value(),
+                                                    output=self.format_combo.currentData())
+            self.video_model.set_job(video['id'], key)
+            self.video_model.set_status(video['id'], "İndiriliyor", Qt.GlobalColor.yellow)
+            started += 1
+
+        self.status_label.setText(f"{started} indirme başlatıldı. {self.plan_text(plan.summary())}")
+        self.logger.debug("İndirme başlatıldı: %s video", started)
+
+    def selected_job_keys(self):
+        # Tabloda seçili satır yoksa işlem tüm aktif indirmelere uygulanır
+        rows = sorted({index.row() for index in self.video_table.selectionModel().selectedRows()})
+        videos = [self.video_model.record_at(row) for row in rows]
+        # Satırlar aynı işi paylaşabilir; her iş bir kez
+        keys = list(dict.fromkeys(video.get('job_key') for video in videos if video and video.get('job_key')))
+        if self.downloader is None:
+            return keys
+        return keys or self.job_manager().active_jobs()
+
+    def set_job_status(self, keys, status, color=None):
+        for key in keys:
+            self.video_model.set_job_status(key, status, color)
+
+    def pause_downloads(self):
+        keys = self.selected_job_keys()
+        for key in keys:
+            self.job_manager().pause_job(key)
+        self.set_job_status(keys, "Duraklatıldı")
+        self.status_label.setText(f"{len(keys)} indirme duraklatıldı")
+
+    def resume_downloads(self):
+        keys = self.selected_job_keys()
+        for key in keys:
+            self.job_manager().resume_job(key)
+        self.set_job_status(keys, "İndiriliyor")
+        self.status_label.setText(f"{len(keys)} indirme sürdürülüyor")
+
+    def cancel_downloads(self):
+        # Playlist yükleniyorsa önce onu durdur
+        if self.loading_info and self.current_worker is not None:
+            # Bilgi alma sadece motor yüklüyken başlar; engine burada zaten içe aktarılmıştır
+            from engine import PlaylistInfoTask
+            if isinstance(self.current_worker.task, PlaylistInfoTask):
+                self.cancel_playlist_loading = True
+                self.current_worker.cancel()
+                self.status_label.setText("Playlist yükleme iptal ediliyor...")
+                return
+
+        keys = self.selected_job_keys()
+        for key in keys:
+            self.job_manager().cancel_job(key)
+        self.set_job_status(keys, "İptal Edildi")
+        self.status_label.setText(f"{len(keys)} indirme iptal edildi")
+
+    @metrics.timed('gui_dispatch')
+    def on_job_state_changed(self, key, state):
+        labels = {
+            'queued': "Kuyrukta",
+            'running': "İndiriliyor",
+            'postprocessing': "Dönüştürülüyor",
+            'paused': "Duraklatıldı",
+            'deferred': "Disk Alanı Bekleniyor",
+            'retrying': "Yeniden Denenecek",
+            'completed': "Tamamlandı",
+            'skipped': "Zaten İndirildi",
+            'failed': "Hata",
+            'cancelled': "İptal Edildi",
+        }
+        if state in labels:
+            self.update_download_status(key, labels[state])
+        if state == 'completed':
+            # Plan süre tahmini bir sonraki oturumda da ölçülen hızı kullansın
+            self.throughput.save()
+
+    def history_item(self, entry):
+        completed = time.strftime('%d.%m.%Y %H:%M', time.localtime(entry['completed']))
+        output = entry['format'].split(':', 1)[0]
+        item = QListWidgetItem(f"{entry['title'] or os.path.basename(entry['filepath'])} - {output} - {completed}")
+        item.setToolTip(entry['filepath'])
+        return item
+
+    def load_history_page(self, limit=100):
+        if self.history_done or self.downloader is None:
+            return
+        entries = self.downloader.history_page(self.history_last, limit)
+        for entry in entries:
+            self.history_list.addItem(self.history_item(entry))
+        if entries:
+            self.history_last = entries[-1]
+        self.history_done = len(entries) < limit
+
+    def on_history_scrolled(self, value):
+        if value >= self.history_list.verticalScrollBar().maximum() - 5:
+            self.load_history_page()
+
+    @metrics.timed('gui_dispatch')
+    def on_history_added(self, entry):
+        self.history_list.insertItem(0, self.history_item(entry))
+
+    @metrics.timed('gui_dispatch')
+    def on_postprocessed(self, filename, wait, elapsed):
+        self.status_label.setText(f"Dönüştürüldü: {filename} (kuyrukta {wait:.1f} s, işlem {elapsed:.1f} s)")
+
+    @metrics.timed('gui_dispatch')
+    def update_queue_label(self, queued, running):
+        self.queue_label.setText(f"Kuyrukta: {queued} | İndirilen: {running}")
+
+    @metrics.timed('gui_dispatch')
+    def update_remote_queue_label(self, status):
+        if status is None:
+            self.queue_label.setText("Kuyruğa ulaşılamıyor, yeniden deneniyor...")
+            return
+        self.queue_label.setText(f"Kuyrukta: {status['queued']} | İndirilen: {status['leased']} "
+                                 f"({status['workers']} işçi) | Biten: {status['completed']} | "
+                                 f"Hatalı: {status['failed']}")
+
+    @metrics.timed('gui_dispatch')
+    def update_download_progress(self, batch):
+        # Birleştirilmiş ilerleme: tick başına bir kez, tüm işler için
+        total = batch['total']
+        self.progress_bar.setValue(int(total['percent']))
+        if total['active'] == 1 and len(batch['jobs']) == 1:
+            job = next(iter(batch['jobs'].values()))
+            self.status_label.setText(f"İndiriliyor: {job['filename']} - %{job['percent']:.1f}")
+        else:
+            self.status_label.setText(f"İndiriliyor: {total['active']} dosya - %{total['percent']:.1f}")
 
-        speed = downloaded / (time.time() - self.download_start_time) if hasattr(self, 'download_start_time') else 0
-        remaining_time = (total - downloaded) / speed if speed > 0 else 0
+        if total['active']:
+            self.throughput.sample(total['speed'])
+        eta = total['eta']
+        self.speed_label.setText(f"İndirme Hızı: {self.format_size(total['speed'])}/s")
+        self.time_label.setText(f"Tahmini Süre: {self.format_time(eta) if eta is not None else '-'}")
 
-        self.speed_label.setText(f"İndirme Hızı: {self.format_size(speed)}/s")
-        self.time_label.setText(f"Tahmini Süre: {self.format_time(remaining_time)}")
+        for key, job in batch['jobs'].items():
+            self.set_job_status([key], f"%{job['percent']:.0f}")
 
     @staticmethod
     def format_size(size):
@@ -422,19 +865,7 @@ class YouTubeDownloaderGUI(QWidget):
         else:
             return f"{seconds}s"
 
-    def update_download_status(self, filename, status):
-        for row in range(self.video_table.rowCount()):
-            if self.video_table.item(row, 1).text() in filename:
-                self.video_table.item(row, 3).setText(status)
-                if status == "Tamamlandı":
-                    self.video_table.item(row, 3).setBackground(Qt.GlobalColor.green)
-                elif status == "Hata":
-                    self.video_table.item(row, 3).setBackground(Qt.GlobalColor.red)
-
-    def on_download_finished(self, filename):
-        self.logger.info(f"İndirme tamamlandı: {filename}")
-        self.progress_signal.emit("İndirme tamamlandı", 100, 100, {"filename": filename, "status": "Tamamlandı"})
-
-    def on_download_error(self, error, filename):
-        self.logger.error(f"İndirme hatası: {error}, Dosya: {filename}")
-        self.progress_signal.emit(f"İndirme hatası: {error}", 0, 100, {"filename": filename, "status": "Hata"})
\ No newline at end of file
+    def update_download_status(self, key, status):
+        colors = {"Tamamlandı": Qt.GlobalColor.green, "Zaten İndirildi": Qt.GlobalColor.green,
+                  "Hata": Qt.GlobalColor.red}
+        self.set_job_status([key], status, colors.get(status))
@@ -0,0 +1,81 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from utils import app_data_dir
+
+
+def history_format(format_id, output):
+    # Aynı format ifadesi farklı çıktı türleriyle (ör. mp3 / orijinal ses) ayrı dosyalar üretir
+    return f"{output}:{format_id}"
+
+
+class DownloadHistory:
+    # Tamamlanan indirmeler (video kimliği + format) SQLite'ta tutulur; anahtarlar başlangıçta
+    # bellekteki bir kümeye yüklenir, böylece "daha önce indirildi mi?" sorusu O(1) cevaplanır.
+    def __init__(self, path=None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.path.join(app_data_dir(), 'history.sqlite3')
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                title TEXT,
+                filepath TEXT NOT NULL,
+                size INTEGER,
+                completed REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS downloads_key ON downloads(video_id, format)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS downloads_completed ON downloads(completed, id)")
+        self.conn.commit()
+
+        start = time.perf_counter()
+        self.keys = set(self.conn.execute("SELECT video_id, format FROM downloads"))
+        self.logger.info("Loaded %s history keys in %.3f s", len(self.keys), time.perf_counter() - start)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, video_id, fmt, filepath, title=None, size=None, now=None):
+        now = now or time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO downloads (video_id, format, title, filepath, size, completed) VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, fmt, title, filepath, size, now))
+            self.conn.commit()
+            self.keys.add((video_id, fmt))
+        return {'id': cursor.lastrowid, 'video_id': video_id, 'format': fmt, 'title': title,
+                'filepath': filepath, 'size': size, 'completed': now}
+
+    def find(self, video_id, fmt):
+        # Bu anahtar için diskte hâlâ duran en yeni dosya
+        if (video_id, fmt) not in self.keys:
+            return None
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT filepath FROM downloads WHERE video_id = ? AND format = ? ORDER BY completed DESC",
+                (video_id, fmt)).fetchall()
+        return next((path for path, in rows if os.path.isfile(path)), None)
+
+    def page(self, before=None, limit=100):
+        # En yeniden eskiye, sayfa sayfa; before önceki sayfanın son kaydıdır (OFFSET taraması yok)
+        query = "SELECT id, video_id, format, title, filepath, size, completed FROM downloads "
+        params = ()
+        if before is not None:
+            query += "WHERE (completed, id) < (?, ?) "
+            params = (before['completed'], before['id'])
+        with self.lock:
+            rows = self.conn.execute(query + "ORDER BY completed DESC, id DESC LIMIT ?", params + (limit,)).fetchall()
+        return [dict(zip(('id', 'video_id', 'format', 'title', 'filepath', 'size', 'completed'), row))
+                for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,618 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import socket
+import signal
+import sqlite3
+import logging
+import argparse
+import functools
+import threading
+import urllib.request
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from engine import DownloadEngine
+from cli import parse_rate, read_jobs, EXIT_OK, EXIT_FAILED, EXIT_USAGE
+from postprocess import default_output
+from storage import MIN_FREE
+from metrics import metrics
+from utils import app_data_dir, canonical_id, start_queue_logging
+
+# İş durumları; ilk üçü henüz bitmemiş işlerdir
+QUEUED, LEASED, PAUSED, COMPLETED, FAILED, CANCELLED = 'queued', 'leased', 'paused', 'completed', 'failed', 'cancelled'
+ACTIVE_STATES = (QUEUED, LEASED, PAUSED)
+# Kira süresi (s): işçi bu süre içinde nabız göndermezse (süreç öldü, makine koptu) iş başka işçiye verilir
+LEASE = 30.0
+# Bir iş en fazla bu kadar kez kiralanır; sürekli işçi düşüren iş sonsuza kadar dolaşmasın
+MAX_ATTEMPTS = 3
+# İşçi ilerlemeyi (ve nabzı) en geç bu aralıkla yazar; arayüz kuyruğu POLL_INTERVAL ile okur
+PROGRESS_INTERVAL = 2.0
+POLL_INTERVAL = 1.0
+DEFAULT_PORT = 8765
+# HTTP üzerinden çağrılabilen kuyruk yöntemleri (POST /rpc/<yöntem>, gövde: anahtar kelime argümanları)
+RPC_METHODS = ('submit', 'submit_many', 'claim', 'heartbeat', 'complete', 'fail', 'release', 'pause', 'resume',
+               'cancel', 'jobs', 'status')
+
+
+class JobQueue:
+    # SQLite'ta tutulan paylaşılan indirme kuyruğu. Aynı makinedeki süreçler dosyayı doğrudan açabilir
+    # (WAL kipi, kiralama tek bir yazma işleminde yapılır); diğer makineler QueueServer üzerinden erişir.
+    # İşler kiralanarak alınır ve işçi nabız gönderdikçe kira uzar. Kirası dolan iş yeniden dağıtılır;
+    # aynı klasöre yazan işçi yarım dosyadan sürdürür.
+    def __init__(self, path=None, max_attempts=MAX_ATTEMPTS):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.path.join(app_data_dir(), 'queue.sqlite3')
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                format_id TEXT NOT NULL,
+                output TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                segments INTEGER,
+                force INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                stage TEXT,
+                downloaded INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                speed REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                filepath TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs(state, priority, created)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_flight ON jobs(video_id, format_id, output, output_path)")
+
+    @contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE: yazma kilidi baştan alınır, iki süreç aynı işi kiralayamaz
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    @staticmethod
+    def row(row):
+        job = dict(row)
+        job['force'] = bool(job['force'])
+        return job
+
+    def submit(self, url, format_id, output_path, output='video', priority=0, segments=None, force=False):
+        return self.submit_many([{'url': url, 'format_id': format_id, 'output_path': output_path, 'output': output,
+                                  'priority': priority, 'segments': segments, 'force': force}])[0]
+
+    def submit_many(self, jobs):
+        # Aynı video aynı formatta aynı klasöre zaten kuyrukta/iniyorsa yeni iş açılmaz, mevcut iş döner
+        result = []
+        now = time.time()
+        with self.transaction() as conn:
+            for job in jobs:
+                key = (canonical_id(job['url']), job['format_id'], job.get('output') or 'video', job['output_path'])
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE video_id = ? AND format_id = ? AND output = ? AND output_path = ? "
+                    "AND state IN (?, ?, ?)", key + ACTIVE_STATES).fetchone()
+                if row is not None:
+                    metrics.inc('ytdl_deduplicated_total', kind='queue')
+                    result.append(self.row(row))
+                    continue
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, video_id, url, format_id, output, output_path, priority, segments, force, "
+                    "state, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, key[0], job['url'], key[1], key[2], key[3], job.get('priority') or 0,
+                     job.get('segments'), int(bool(job.get('force'))), QUEUED, now, now))
+                result.append(self.row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()))
+        return result
+
+    def claim(self, worker, lease=LEASE):
+        # En yüksek öncelikli en eski bekleyen iş ya da kirası dolmuş (işçisi ölmüş) iş kiralanır
+        now = time.time()
+        with self.transaction() as conn:
+            expired = conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE state = ? AND lease_until < ? "
+                "AND attempts >= ?", (FAILED, "İşçi yanıt vermedi", now, LEASED, now, self.max_attempts)).rowcount
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE state = ? OR (state = ? AND lease_until < ?) "
+                "ORDER BY priority DESC, created LIMIT 1", (QUEUED, LEASED, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1, stage = NULL, "
+                "updated = ? WHERE id = ?", (LEASED, worker, now + lease, now, row['id']))
+            job = self.row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+        if expired:
+            self.logger.warning("%s job(s) failed after %s lost leases", expired, self.max_attempts)
+        if row['state'] == LEASED:
+            metrics.inc('ytdl_queue_redelivered_total')
+            self.logger.warning("Lease of %s by %s expired, redelivered to %s", row['id'], row['worker'], worker)
+        return job
+
+    def heartbeat(self, job_id, worker, lease=LEASE, downloaded=None, total=None, speed=None, stage=None):
+        # İşin güncel durumu döner: LEASED sürdür; PAUSED/CANCELLED durdur; None iş artık bu işçide değil
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT state, worker FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row['worker'] != worker:
+                return None
+            if row['state'] == LEASED:
+                conn.execute(
+                    "UPDATE jobs SET lease_until = ?, downloaded = COALESCE(?, downloaded), "
+                    "total = COALESCE(?, total), speed = COALESCE(?, speed), stage = COALESCE(?, stage), "
+                    "updated = ? WHERE id = ?", (now + lease, downloaded, total, speed, stage, now, job_id))
+            return row['state']
+
+    def finish(self, job_id, worker, state, **fields):
+        # Sadece işi hâlâ kiralamış olan işçi bitirebilir (kirası dolup başkasına verilmişse yok sayılır).
+        # Duraklatma isteği işçiye ulaşmadan biten iş de bitmiş sayılır.
+        columns = ''.join(f', {name} = ?' for name in fields)
+        with self.transaction() as conn:
+            return conn.execute(
+                f"UPDATE jobs SET state = ?, lease_until = NULL, speed = 0, updated = ?{columns} "
+                "WHERE id = ? AND worker = ? AND state IN (?, ?)",
+                (state, time.time(), *fields.values(), job_id, worker, LEASED, PAUSED)).rowcount > 0
+
+    def complete(self, job_id, worker, filepath=None):
+        return self.finish(job_id, worker, COMPLETED, filepath=filepath, stage=None)
+
+    def fail(self, job_id, worker, error=None):
+        return self.finish(job_id, worker, FAILED, error=error, stage=None)
+
+    def release(self, job_id, worker):
+        # İşçi kapanırken işi geri verir; deneme sayılmaz, başka işçi hemen alabilir
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, attempts = MAX(0, attempts - 1), "
+                "speed = 0, stage = NULL, updated = ? WHERE id = ? AND worker = ? AND state = ?",
+                (QUEUED, time.time(), job_id, worker, LEASED)).rowcount > 0
+
+    def set_state(self, job_id, state, states, clear_worker=False):
+        worker = ", worker = NULL, lease_until = NULL" if clear_worker else ""
+        with self.transaction() as conn:
+            return conn.execute(
+                f"UPDATE jobs SET state = ?, speed = 0, updated = ?{worker} WHERE id = ? "
+                f"AND state IN ({', '.join('?' * len(states))})",
+                (state, time.time(), job_id, *states)).rowcount > 0
+
+    def pause(self, job_id):
+        # Kiralanmış iş bir sonraki nabızda işçisinde duraklatılır
+        return self.set_state(job_id, PAUSED, (QUEUED, LEASED))
+
+    def resume(self, job_id):
+        return self.set_state(job_id, QUEUED, (PAUSED,), clear_worker=True)
+
+    def cancel(self, job_id):
+        return self.set_state(job_id, CANCELLED, ACTIVE_STATES)
+
+    def jobs(self, ids=None, limit=1000):
+        with self.lock:
+            if ids is None:
+                rows = self.conn.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = []
+                # SQLite değişken sınırı aşılmasın
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    rows += self.conn.execute(f"SELECT * FROM jobs WHERE id IN ({', '.join('?' * len(chunk))})",
+                                              chunk).fetchall()
+        return [self.row(row) for row in rows]
+
+    def status(self):
+        # Tüm kuyruğun özeti: durum başına iş sayısı, canlı işçiler ve süren indirmelerin toplam ilerlemesi
+        now = time.time()
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+            active = self.conn.execute(
+                "SELECT COUNT(DISTINCT worker), COALESCE(SUM(downloaded), 0), COALESCE(SUM(total), 0), "
+                "COALESCE(SUM(speed), 0) FROM jobs WHERE state = ? AND lease_until >= ?", (LEASED, now)).fetchone()
+        status = {state: counts.get(state, 0) for state in (QUEUED, LEASED, PAUSED, COMPLETED, FAILED, CANCELLED)}
+        status.update(workers=active[0], downloaded=active[1], total=active[2], speed=active[3])
+        return status
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class QueueHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def authorized(self):
+        # Sabit süreli karşılaştırma: yanıt süresinden belirtecin öneki tahmin edilemesin
+        token = self.server.token
+        return not token or hmac.compare_digest(self.headers.get('X-Queue-Token', '').encode(), token.encode())
+
+    def do_GET(self):
+        if not self.authorized():
+            self.send_error(403)
+        elif self.path == '/status':
+            self.reply(200, {'result': self.server.queue.status()})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        method = self.path[len('/rpc/'):] if self.path.startswith('/rpc/') else None
+        if method not in RPC_METHODS:
+            self.send_error(404)
+            return
+        if not self.authorized():
+            self.send_error(403)
+            return
+        try:
+            kwargs = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            result = getattr(self.server.queue, method)(**kwargs)
+        except (TypeError, ValueError, KeyError) as e:
+            self.reply(400, {'error': str(e)})
+            return
+        except sqlite3.Error as e:
+            # Veritabanı kilitli/erişilemez: geçici hata, istemci yeniden dener
+            logging.getLogger(__name__).warning("Queue request %s failed: %s", method, e)
+            self.reply(503, {'error': str(e)})
+            return
+        self.reply(200, {'result': result})
+
+    def reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class QueueServer:
+    # Kuyruğu diğer makinelere açar. Varsayılan olarak sadece yerel adreste dinler; dışarı açılacaksa
+    # token verilmeli (istekler X-Queue-Token başlığı taşır)
+    def __init__(self, queue, port=DEFAULT_PORT, host='127.0.0.1', token=None):
+        self.server = ThreadingHTTPServer((host, port), QueueHandler)
+        self.server.daemon_threads = True
+        self.server.queue = queue
+        self.server.token = token
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='queue-server', daemon=True)
+        self.thread.start()
+        logging.getLogger(__name__).info("Queue endpoint: http://%s:%s (%s)", host, self.port, queue.path)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class QueueClient:
+    # QueueServer'daki kuyruğa JobQueue ile aynı yöntemlerle erişir; yöntemler anahtar kelime
+    # argümanlarıyla çağrılır. Bağlantı hataları OSError olarak yükselir.
+    def __init__(self, url, token=None, timeout=10):
+        self.url = url.rstrip('/')
+        self.headers = {'Content-Type': 'application/json'}
+        if token:
+            self.headers['X-Queue-Token'] = token
+        self.timeout = timeout
+
+    def call(self, method, **kwargs):
+        request = urllib.request.Request(f'{self.url}/rpc/{method}', json.dumps(kwargs).encode('utf-8'),
+                                         self.headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)['result']
+
+    def __getattr__(self, name):
+        if name in RPC_METHODS:
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    def close(self):
+        pass
+
+
+def open_queue(target, token=None):
+    # http(s):// adresi uzak kuyruk, diğer her şey yerel SQLite dosyasıdır
+    if target.startswith(('http://', 'https://')):
+        return QueueClient(target, token)
+    return JobQueue(target)
+
+
+class QueueWorker:
+    # Kuyruktan iş kiralayıp bu süreçteki DownloadEngine ile indirir; aynı anda en fazla capacity iş.
+    # Her nabızda ilerleme kuyruğa yazılır. Kirası kaybedilen (başka işçiye verilmiş) ya da duraklatılan iş
+    # motorda duraklatılır (yarım dosya kalır), iptal edilen iş iptal edilir. Kuyruğa yapılan bildirimler
+    # motor iş parçacıklarını bekletmesin diye bu döngüden gönderilir.
+    def __init__(self, queue, engine, worker_id=None, output_path=None, capacity=None, lease=LEASE):
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue
+        self.engine = engine
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.output_path = output_path
+        self.capacity = capacity or engine.scheduler.max_concurrent
+        self.lease = lease
+        self.lock = threading.Lock()
+        # Kuyruk iş kimliği -> ilerleme; motor iş anahtarı -> kuyruk iş kimlikleri
+        self.active = {}
+        self.keys = {}
+        # Motor, iş anahtarını döndürmeden önce bitmiş olabilir (ör. geçmişten atlanan iş)
+        self.early = {}
+        self.outbox = []
+        self.stopping = threading.Event()
+        self.wake = threading.Event()
+        engine.subscribe(self.on_event)
+
+    def on_event(self, event, data):
+        if event == 'download_progress':
+            with self.lock:
+                for job_id in self.keys.get(data['key'], ()):
+                    self.active[job_id].update(downloaded=data['downloaded'], total=data['total'])
+        elif event == 'job':
+            self.on_job_state(data)
+
+    def on_job_state(self, data):
+        key, state = data['key'], data['state']
+        with self.lock:
+            job_ids = self.keys.get(key)
+            if job_ids is None:
+                if state in ('completed', 'skipped', 'failed'):
+                    self.early[key] = data
+                return
+            if state in ('completed', 'skipped'):
+                report = ('complete', {'filepath': data.get('filepath')})
+            elif state == 'failed':
+                report = ('fail', {'error': data.get('error')})
+            elif state in ('paused', 'cancelled'):
+                # Kuyruk dışından durduruldu (ör. kapanış); iş başka işçiye bırakılır
+                report = ('release', {})
+            else:
+                # İşçi kapasitesi kadar iş aldığından motor kuyruğunda bekleme kısa sürer; 'queued' aşama sayılmaz
+                if state != 'queued':
+                    for job_id in job_ids:
+                        self.active[job_id]['stage'] = state
+                return
+            del self.keys[key]
+            for job_id in job_ids:
+                self.active.pop(job_id, None)
+                self.outbox.append((report[0], dict(report[1], job_id=job_id, worker=self.worker_id)))
+        self.wake.set()
+
+    def start_job(self, job):
+        output_path = self.output_path or job['output_path']
+        try:
+            os.makedirs(output_path, exist_ok=True)
+            key = self.engine.download(job['url'], job['format_id'], output_path, job['priority'],
+                                       segments=job['segments'], output=job['output'], force=job['force'])
+        except Exception as e:
+            self.logger.error("Job %s could not be started: %s", job['id'], e)
+            with self.lock:
+                self.outbox.append(('fail', {'job_id': job['id'], 'worker': self.worker_id, 'error': str(e)}))
+            return
+        # İş daha önce bu işçide duraklatıldıysa motor aynı anahtarı döndürür; kaldığı yerden sürer
+        self.engine.resume_job(key)
+        self.logger.info("Claimed job %s (attempt %s): %s", job['id'], job['attempts'], job['url'])
+        with self.lock:
+            self.active[job['id']] = {'key': key, 'downloaded': job['downloaded'], 'total': job['total'],
+                                      'stage': None, 'sample': (time.monotonic(), job['downloaded'])}
+            self.keys.setdefault(key, []).append(job['id'])
+            early = self.early.pop(key, None)
+            # Geri kalanlar bu işçinin bıraktığı işlerin geç gelen olaylarıdır
+            self.early.clear()
+        if early is not None:
+            self.on_job_state(early)
+
+    def fill(self):
+        while len(self.active) < self.capacity and not self.stopping.is_set():
+            try:
+                job = self.queue.claim(worker=self.worker_id, lease=self.lease)
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("Queue unreachable: %s", e)
+                return
+            if job is None:
+                return
+            self.start_job(job)
+
+    def flush(self):
+        with self.lock:
+            outbox, self.outbox = self.outbox, []
+        for index, (method, kwargs) in enumerate(outbox):
+            try:
+                if not getattr(self.queue, method)(**kwargs):
+                    self.logger.warning("Queue rejected %s for job %s (lease lost)", method, kwargs['job_id'])
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("Queue unreachable, will retry: %s", e)
+                with self.lock:
+                    self.outbox[:0] = outbox[index:]
+                return
+
+    def heartbeat(self):
+        now = time.monotonic()
+        with self.lock:
+            items = [(job_id, dict(job)) for job_id, job in self.active.items()]
+        for job_id, job in items:
+            sample_time, sample_bytes = job['sample']
+            speed = max(0, job['downloaded'] - sample_bytes) / (now - sample_time) if now > sample_time else 0
+            try:
+                state = self.queue.heartbeat(job_id=job_id, worker=self.worker_id, lease=self.lease,
+                                             downloaded=job['downloaded'], total=job['total'], speed=speed,
+                                             stage=job['stage'])
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("Heartbeat failed: %s", e)
+                return
+            with self.lock:
+                if job_id in self.active:
+                    self.active[job_id]['sample'] = (now, job['downloaded'])
+            if state != LEASED:
+                self.drop(job_id, state)
+
+    def drop(self, job_id, state):
+        # İş artık bu işçide sürmeyecek: iptal edildiyse silinir, diğer durumlarda yarım dosya korunur
+        with self.lock:
+            job = self.active.pop(job_id, None)
+            if job is None:
+                return
+            job_ids = self.keys.get(job['key'], [])
+            if job_id in job_ids:
+                job_ids.remove(job_id)
+            if job_ids:
+                return
+            self.keys.pop(job['key'], None)
+        self.logger.info("Job %s stopped on this worker (%s)", job_id, state or 'lease lost')
+        if state == CANCELLED:
+            self.engine.cancel_job(job['key'])
+        else:
+            self.engine.pause_job(job['key'])
+
+    def run(self):
+        self.logger.info("Worker %s started (capacity %s)", self.worker_id, self.capacity)
+        next_beat = 0
+        while not self.stopping.is_set():
+            self.flush()
+            self.fill()
+            if time.monotonic() >= next_beat:
+                self.heartbeat()
+                next_beat = time.monotonic() + min(self.lease / 3, PROGRESS_INTERVAL)
+            self.wake.wait(POLL_INTERVAL)
+            self.wake.clear()
+        self.flush()
+
+    def stop(self):
+        self.stopping.set()
+        self.wake.set()
+
+    def shutdown(self):
+        # Süren işler duraklatılıp kuyruğa geri verilir; başka bir işçi (aynı klasörde) kaldığı yerden sürdürür.
+        # Dönüştürmedeki işler duraklatılamaz: bitmeleri beklenir, sonuçları kuyruğa bildirilir.
+        with self.lock:
+            active = dict(self.active)
+        for job_id, job in active.items():
+            # Duraklatma olayı bu işçide 'release' raporu üretmesin; iş kuyruğa burada geri verilir
+            with self.lock:
+                self.active.pop(job_id, None)
+                self.keys.pop(job['key'], None)
+            if not self.engine.pause_job(job['key']):
+                with self.lock:
+                    self.active[job_id] = job
+                    self.keys.setdefault(job['key'], []).append(job_id)
+                continue
+            try:
+                self.queue.release(job_id=job_id, worker=self.worker_id)
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("Job %s could not be released, lease will expire: %s", job_id, e)
+        while self.active and not self.engine.wait(timeout=self.lease / 3):
+            self.heartbeat()
+        self.flush()
+
+
+def serve(args):
+    queue = JobQueue(args.db)
+    server = QueueServer(queue, args.port, args.host, args.token)
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda *a: stopped.set())
+    signal.signal(signal.SIGTERM, lambda *a: stopped.set())
+    stopped.wait()
+    server.close()
+    queue.close()
+    return EXIT_OK
+
+
+def work(args):
+    engine = DownloadEngine(max_concurrent_downloads=args.jobs, global_rate_limit=args.rate_limit, use_cache=False,
+                            persist_journal=False, segments=args.segments, use_history=not args.no_history,
+                            min_free_space=args.min_free)
+    worker = QueueWorker(open_queue(args.queue, args.token), engine, args.worker_id, args.output, lease=args.lease)
+    signal.signal(signal.SIGINT, lambda *a: worker.stop())
+    signal.signal(signal.SIGTERM, lambda *a: worker.stop())
+    worker.run()
+    worker.shutdown()
+    engine.shutdown()
+    return EXIT_OK
+
+
+def submit(args):
+    try:
+        jobs = read_jobs(args.url_file, args.format)
+    except OSError as e:
+        print(f"URL dosyası okunamadı: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    output_path = os.path.abspath(args.output)
+    submitted = open_queue(args.queue, args.token).submit_many(jobs=[
+        {'url': url, 'format_id': format_id, 'output_path': output_path, 'priority': args.priority,
+         'output': 'video' if default_output(format_id) == 'video' else args.audio_output}
+        for url, format_id in jobs])
+    for job in submitted:
+        print(json.dumps({'id': job['id'], 'url': job['url'], 'state': job['state']}, ensure_ascii=False))
+    return EXIT_OK
+
+
+def status(args):
+    print(json.dumps(open_queue(args.queue, args.token).status(), ensure_ascii=False))
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='jobqueue.py', description="Paylaşılan indirme kuyruğu")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_serve = commands.add_parser('serve', help="Kuyruğu HTTP üzerinden diğer makinelere aç")
+    parser_serve.add_argument('--db', help="Kuyruk veritabanı (varsayılan: uygulama veri klasörü)")
+    parser_serve.add_argument('--host', default='127.0.0.1', help="Dinlenecek adres (dışarı açmak için 0.0.0.0)")
+    parser_serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser_serve.set_defaults(func=serve)
+
+    parser_work = commands.add_parser('work', help="Kuyruktan iş alıp indiren işçi süreci")
+    parser_work.add_argument('queue', help="Kuyruk adresi (http://makine:port) ya da yerel veritabanı dosyası")
+    parser_work.add_argument('-o', '--output', help="İndirme klasörü (varsayılan: işi ekleyenin verdiği klasör)")
+    parser_work.add_argument('-j', '--jobs', type=int, default=3, help="Bu işçide eş zamanlı indirme sayısı")
+    parser_work.add_argument('-s', '--segments', type=int, default=4, help="Dosya başına bağlantı sayısı")
+    parser_work.add_argument('--rate-limit', type=parse_rate, help="Bu işçinin toplam hız sınırı (ör. 2M)")
+    parser_work.add_argument('--min-free', type=parse_rate, default=MIN_FREE,
+                             help="Hedef diskte boş bırakılacak alan (ör. 1G)")
+    parser_work.add_argument('--lease', type=float, default=LEASE, help="Kira süresi (s); nabız en geç üçte birinde")
+    parser_work.add_argument('--worker-id', help="İşçi adı (varsayılan: makine-adı-pid)")
+    parser_work.add_argument('--no-history', action='store_true', help="İndirme geçmişini kullanma")
+    parser_work.set_defaults(func=work)
+
+    parser_submit = commands.add_parser('submit', help="URL listesini kuyruğa ekle")
+    parser_submit.add_argument('queue', help="Kuyruk adresi ya da yerel veritabanı dosyası")
+    parser_submit.add_argument('url_file', help="URL listesi dosyası (stdin için -)")
+    parser_submit.add_argument('-f', '--format', default='video', help="video, audio ya da yt-dlp format ifadesi")
+    parser_submit.add_argument('--audio-output', choices=['native', 'mp3', 'm4a', 'opus'], default='mp3')
+    parser_submit.add_argument('-o', '--output', default=os.getcwd(), help="İndirme klasörü")
+    parser_submit.add_argument('--priority', type=int, default=0)
+    parser_submit.set_defaults(func=submit)
+
+    parser_status = commands.add_parser('status', help="Kuyruk özetini JSON olarak yazdır")
+    parser_status.add_argument('queue', help="Kuyruk adresi ya da yerel veritabanı dosyası")
+    parser_status.set_defaults(func=status)
+
+    for command in (parser_serve, parser_work, parser_submit, parser_status):
+        command.add_argument('--token', help="Paylaşılan erişim anahtarı (X-Queue-Token)")
+        command.add_argument('-v', '--verbose', action='store_true', help="Ayrıntılı günlük (stderr)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    start_queue_logging([console], logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        return args.func(args)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Kuyruğa ulaşılamadı: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+
+if __name__ == '__main__':
+    sys.exit(main())
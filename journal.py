@@ -0,0 +1,66 @@
+import os
+import json
+import time
+import logging
+import threading
+from utils import app_data_dir
+
+
+class JobJournal:
+    # Yarım kalan indirmelerin kaydı; uygulama çökse bile kuyruk yeniden kurulabilsin
+    ACTIVE_STATES = ('queued', 'running', 'paused', 'deferred', 'retrying')
+
+    def __init__(self, path=None, persist=True):
+        self.logger = logging.getLogger(__name__)
+        self.persist = persist
+        self.path = path or (os.path.join(app_data_dir(), 'jobs.json') if persist else None)
+        self.lock = threading.Lock()
+        self.jobs = self.load()
+
+    def load(self):
+        if not self.persist or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error("İş günlüğü okunamadı: %s", e)
+            return {}
+
+    def save(self):
+        if not self.persist:
+            return
+        # Önce geçici dosyaya yaz, sonra atomik olarak yer değiştir
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def add(self, key, **record):
+        with self.lock:
+            self.jobs[key] = dict(record, key=key, status='queued', created=time.time())
+            self.save()
+
+    def update(self, key, **fields):
+        with self.lock:
+            if key not in self.jobs:
+                return
+            self.jobs[key].update(fields)
+            self.save()
+
+    def remove(self, key):
+        with self.lock:
+            if self.jobs.pop(key, None) is not None:
+                self.save()
+
+    def get(self, key):
+        with self.lock:
+            record = self.jobs.get(key)
+            return dict(record) if record else None
+
+    def pending(self):
+        with self.lock:
+            records = [dict(r) for r in self.jobs.values() if r.get('status') in self.ACTIVE_STATES]
+        return sorted(records, key=lambda r: r.get('created', 0))
@@ -1,9 +1,16 @@
+import startup  # Başlangıç ölçümü diğer tüm içe aktarmalardan önce başlar
 import logging
 import sys
+import json
+import argparse
 import traceback
 import os
 from PyQt6.QtWidgets import QApplication
 from gui import YouTubeDownloaderGUI
+from metrics import metrics, MetricsServer
+from utils import start_queue_logging
+
+startup.mark('imports')
 
 def excepthook(exc_type, exc_value, exc_tb):
     tb = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
@@ -14,17 +21,28 @@ def excepthook(exc_type, exc_value, exc_tb):
 sys.excepthook = excepthook
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        filename='youtube_downloader.log',
-        filemode='w'
-    )
+    # Kayıtlar kuyruğa atılır; dosyaya/konsola yazma arayüz ve indirme iş parçacıklarını bekletmez
+    log_file = logging.FileHandler('youtube_downloader.log', mode='w', encoding='utf-8')
+    log_file.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
     console = logging.StreamHandler()
     console.setLevel(logging.INFO)
     formatter = logging.Formatter('%(name)-12s: %(levelname)-8s %(message)s')
     console.setFormatter(formatter)
-    logging.getLogger('').addHandler(console)
+    start_queue_logging([log_file, console])
+
+def parse_args():
+    # Tanınmayan argümanlar Qt'ye bırakılır
+    parser = argparse.ArgumentParser(description="YouTube Video İndirici")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Metrikleri http://127.0.0.1:<port>/metrics adresinden yayınla")
+    parser.add_argument('--metrics-json', help="Kapanışta metriklerin JSON anlık görüntüsünü bu dosyaya yaz")
+    parser.add_argument('--startup-timing', action='store_true',
+                        help="İlk çizim ve hazır olma sürelerini JSON olarak yazdır ve çık")
+    parser.add_argument('--queue',
+                        help="İndirmeleri paylaşılan kuyruğa gönder (http://makine:port ya da kuyruk veritabanı); "
+                             "işçiler jobqueue.py work ile çalıştırılır")
+    parser.add_argument('--queue-token', help="Paylaşılan kuyruğun erişim anahtarı")
+    return parser.parse_known_args()
 
 def load_styles(app, ex):
     style_file = os.path.join(os.path.dirname(__file__), 'style.qss')
@@ -33,24 +51,38 @@ def load_styles(app, ex):
             style_sheet = f.read()
             app.setStyleSheet(style_sheet)  # Uygulamaya stil uygula
             ex.setStyleSheet(style_sheet)  # Ana pencereye de aynı stili uygula
-        logging.info(f"Styles loaded from {style_file}")
+        logging.info("Styles loaded from %s", style_file)
     else:
-        logging.warning(f"Style file {style_file} not found!")
+        logging.warning("Style file %s not found!", style_file)
 
 def main():
+    args, qt_args = parse_args()
     setup_logging()
     logging.info("Application starting...")
+    metrics_server = MetricsServer(args.metrics_port) if args.metrics_port is not None else None
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle("Fusion")
 
-    ex = YouTubeDownloaderGUI()
+    ex = YouTubeDownloaderGUI(queue=args.queue, queue_token=args.queue_token)
     load_styles(app, ex)
 
+    if args.startup_timing:
+        # Motor hazır olunca süreleri yazdırıp çık
+        def report():
+            print(json.dumps(startup.marks))
+            app.quit()
+        ex.ready.connect(report)
+        ex.backend_loader.failed.connect(lambda error: app.exit(1))
+
     ex.show()
 
     exit_code = app.exec()
     logging.info("Application closing...")
+    if metrics_server is not None:
+        metrics_server.close()
+    if args.metrics_json:
+        metrics.write_snapshot(args.metrics_json)
     sys.exit(exit_code)
 
 if __name__ == '__main__':
@@ -0,0 +1,200 @@
+import json
+import time
+import bisect
+import logging
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Aşama süreleri (saniye) ve dosya boyutları (bayt) için histogram kovaları
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+SIZE_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(0, 14, 2))
+
+HELP = {
+    'ytdl_stage_seconds': ('histogram', "Time spent per stage (extract_info, formats, transfer, postprocess, "
+                                        "gui_dispatch, pool_wait, enumerate)"),
+    'ytdl_download_size_bytes': ('histogram', "Size of completed downloads"),
+    'ytdl_downloaded_bytes_total': ('counter', "Bytes received by downloads"),
+    'ytdl_jobs_total': ('counter', "Download job state transitions"),
+    'ytdl_errors_total': ('counter', "Errors by stage"),
+    'ytdl_retries_total': ('counter', "Retried requests, by request kind and error class"),
+    'ytdl_retry_budget_exhausted_total': ('counter', "Retryable errors given up after the class budget ran out"),
+    'ytdl_breaker_transitions_total': ('counter', "Circuit breaker state changes, by host"),
+    'ytdl_breaker_rejections_total': ('counter', "Requests held back by an open circuit breaker, by host"),
+    'ytdl_write_bytes_total': ('counter', "Bytes written to disk by segmented downloads, by target directory"),
+    'ytdl_write_seconds_total': ('counter', "Time spent in disk writes, by target directory"),
+    'ytdl_deduplicated_total': ('counter', "Requests attached to an identical in-flight request"),
+    'ytdl_queue_redelivered_total': ('counter', "Shared queue jobs handed to another worker after a lease expired"),
+    'ytdl_thumbnail_requests_total': ('counter', "Thumbnail HTTP requests started for visible table rows"),
+    'ytdl_thumbnails_total': ('counter', "Thumbnails loaded, by source (disk, network) or failed"),
+    'ytdl_http_requests_total': ('counter', "HTTP requests sent through the shared pool, by connection reuse"),
+    'ytdl_dns_lookups_total': ('counter', "DNS cache lookups (hit, miss, shared in-flight query)"),
+}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    # Sayaçlar ve histogramlar (ad, etiketler) anahtarıyla bellekte tutulur; kayıt tek bir kilit
+    # altında birkaç toplama işleminden ibarettir, dışa aktarma sadece istendiğinde yapılır.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('ytdl_stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def timed(self, stage):
+        # Arayüz slotları gibi fonksiyonlar için span dekoratörü; etiket fonksiyon adıdır
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage, handler=func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (h.buckets, list(h.counts), h.sum, h.count))
+                                for key, h in self.histograms.items())
+        result = {'time': round(time.time(), 3), 'counters': {}, 'histograms': {}}
+        for (name, labels), value in counters:
+            result['counters'].setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            result['histograms'].setdefault(name, []).append({
+                'labels': dict(labels), 'count': count, 'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else None,
+                'buckets': dict(zip([str(b) for b in buckets] + ['+Inf'], counts)),
+            })
+        return result
+
+    def prometheus(self):
+        # Prometheus metin biçimi (sürüm 0.0.4)
+        def labels_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, list(h.cumulative()), h.sum, h.count) for key, h in self.histograms.items())
+
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, (kind, name))[1]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            describe(name, 'counter')
+            lines.append(f"{name}{labels_text(labels)} {value}")
+        for (name, labels), buckets, total, count in histograms:
+            describe(name, 'histogram')
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f"{name}_bucket{labels_text(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{labels_text(labels)} {total}")
+            lines.append(f"{name}_count{labels_text(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+# Uygulama genelinde tek kayıt defteri
+metrics = Metrics()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        registry = self.server.registry
+        if self.path == '/metrics':
+            body, content_type = registry.prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body, content_type = json.dumps(registry.snapshot(), ensure_ascii=False), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MetricsServer:
+    # Sadece yerel adreste dinler: /metrics (Prometheus) ve /metrics.json (anlık görüntü)
+    def __init__(self, port=9464, host='127.0.0.1', registry=metrics):
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.registry = registry
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True)
+        self.thread.start()
+        logging.getLogger(__name__).info("Metrics endpoint: http://%s:%s/metrics", host, self.port)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
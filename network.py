@@ -0,0 +1,667 @@
+import io
+import ssl
+import time
+import zlib
+import socket
+import asyncio
+import logging
+import threading
+import urllib.parse
+import urllib.request
+from collections import deque
+from email.message import Message
+from yt_dlp import YoutubeDL
+from yt_dlp.networking.common import RequestHandler, Response, Features
+from yt_dlp.networking.exceptions import (RequestError, TransportError, HTTPError, IncompleteRead, SSLError,
+                                          CertificateVerifyError, UnsupportedRequest)
+from yt_dlp.networking._helper import get_redirect_method, add_accept_encoding_header
+from metrics import metrics
+from retry import breakers, CircuitOpen, parse_retry_after
+
+# Paylaşılan bağlantı havuzunun varsayılanları
+MAX_CONNECTIONS = 256
+CONNECTIONS_PER_HOST = 16
+IDLE_TIMEOUT = 30
+DNS_TTL = 300
+# Havuz doluyken bir isteğin yer açılmasını bekleyebileceği en uzun süre (s)
+POOL_TIMEOUT = 120
+MAX_REDIRECTS = 10
+HEADER_LIMIT = 1024 * 1024
+# Okunmadan kapatılan yanıtın gövdesi bu kadar küçükse okunup atılır, bağlantı havuza döner
+DRAIN_LIMIT = 64 * 1024
+READ_SIZE = 64 * 1024
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class IOLoop:
+    # Ayrı bir iş parçacığında çalışan asyncio döngüsü; diğer iş parçacıkları eşyordam gönderip sonucunu bekler
+    def __init__(self, name='aio-http'):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro):
+        return self.submit(coro).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+
+class DNSCache:
+    # Çözümlenen adresler TTL süresince tutulur; aynı adı aynı anda soran istekler tek sorguda birleşir
+    def __init__(self, ttl=DNS_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.pending = {}
+
+    async def resolve(self, host, port):
+        key = (host, port)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            metrics.inc('ytdl_dns_lookups_total', result='hit')
+            return entry[1]
+        future = self.pending.get(key)
+        if future is None:
+            metrics.inc('ytdl_dns_lookups_total', result='miss')
+            loop = asyncio.get_running_loop()
+            future = self.pending[key] = asyncio.ensure_future(
+                loop.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+            future.add_done_callback(lambda f: self.store(key, f))
+        else:
+            metrics.inc('ytdl_dns_lookups_total', result='shared')
+        # Bekleyenlerden birinin zaman aşımı sorguyu diğerleri için iptal etmesin
+        return await asyncio.shield(future)
+
+    def store(self, key, future):
+        self.pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.entries[key] = (time.monotonic() + self.ttl, future.result())
+
+
+class Connection:
+    __slots__ = ('key', 'reader', 'writer', 'requests', 'idle_since')
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+        self.idle_since = None
+
+    def usable(self, idle_timeout):
+        return (not self.reader.at_eof() and not self.writer.is_closing()
+                and time.monotonic() - self.idle_since < idle_timeout)
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    # Anahtar: (şema, ana makine, port, TLS ayarları, kaynak adres). Kullanımdaki bağlantılar toplamda
+    # ve ana makine başına sınırlıdır; sınır doluysa istek yer açılana kadar bekler (geri basınç).
+    # Boştaki bağlantılar anahtar başına saklanır ve sonraki isteklerde yeniden kullanılır.
+    def __init__(self, dns, max_connections=MAX_CONNECTIONS, per_host=CONNECTIONS_PER_HOST,
+                 idle_timeout=IDLE_TIMEOUT):
+        self.dns = dns
+        self.per_host = per_host
+        self.idle_timeout = idle_timeout
+        self.slots = asyncio.Semaphore(max_connections)
+        self.host_slots = {}
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.ssl_contexts = {}
+        self.opened = 0
+        self.reused = 0
+        self.active = 0
+
+    def ssl_context(self, settings, factory):
+        # Aynı TLS ayarlarını kullanan tüm YoutubeDL örnekleri tek bağlam (ve tek bağlantı kümesi) paylaşır
+        with self.lock:
+            context = self.ssl_contexts.get(settings)
+            if context is None:
+                context = self.ssl_contexts[settings] = factory()
+            return context
+
+    async def acquire(self, key, ssl_context, timeout):
+        host_slots = self.host_slots.get(key[1])
+        if host_slots is None:
+            host_slots = self.host_slots[key[1]] = asyncio.Semaphore(self.per_host)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(host_slots.acquire(), POOL_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise TransportError(f'Bağlantı havuzunda {key[1]} için yer açılmadı')
+        try:
+            await asyncio.wait_for(self.slots.acquire(), POOL_TIMEOUT)
+        except BaseException as e:
+            host_slots.release()
+            if isinstance(e, asyncio.TimeoutError):
+                raise TransportError('Bağlantı havuzunda yer açılmadı')
+            raise
+        metrics.observe('ytdl_stage_seconds', time.perf_counter() - start, stage='pool_wait')
+
+        self.active += 1
+        try:
+            connection = self.take_idle(key)
+            if connection is None:
+                connection = await asyncio.wait_for(self.connect(key, ssl_context), timeout)
+            else:
+                self.reused += 1
+        except BaseException:
+            self.release_slot(key)
+            raise
+        return connection
+
+    def take_idle(self, key):
+        idle = self.idle.get(key)
+        while idle:
+            # En son kullanılan bağlantı önce (sunucunun kapatmış olma ihtimali en düşük)
+            connection = idle.pop()
+            if connection.usable(self.idle_timeout):
+                return connection
+            connection.close()
+        return None
+
+    async def connect(self, key, ssl_context):
+        scheme, host, port, _, source_address = key
+        error = None
+        for family, _, _, _, address in await self.dns.resolve(host, port):
+            try:
+                reader, writer = await asyncio.open_connection(
+                    address[0], address[1], family=family, ssl=ssl_context,
+                    server_hostname=host if ssl_context is not None else None,
+                    local_addr=(source_address, 0) if source_address else None, limit=HEADER_LIMIT)
+                break
+            except OSError as e:
+                error = e
+        else:
+            raise error or OSError(f'{host} için adres bulunamadı')
+        self.opened += 1
+        return Connection(key, reader, writer)
+
+    def release(self, connection, reusable):
+        if reusable and not connection.writer.is_closing():
+            connection.idle_since = time.monotonic()
+            idle = self.idle.setdefault(connection.key, deque())
+            idle.append(connection)
+            while len(idle) > self.per_host:
+                idle.popleft().close()
+        else:
+            connection.close()
+        self.release_slot(connection.key)
+
+    def release_slot(self, key):
+        self.active -= 1
+        self.host_slots[key[1]].release()
+        self.slots.release()
+
+    def sweep(self):
+        # Süresi dolan boştaki bağlantıları kapat
+        for key in list(self.idle):
+            idle = self.idle[key]
+            for connection in [c for c in idle if not c.usable(self.idle_timeout)]:
+                idle.remove(connection)
+                connection.close()
+            if not idle:
+                del self.idle[key]
+
+    def close(self):
+        for idle in self.idle.values():
+            for connection in idle:
+                connection.close()
+        self.idle.clear()
+
+    def stats(self):
+        return {'opened': self.opened, 'reused': self.reused, 'active': self.active,
+                'idle': sum(len(idle) for idle in self.idle.values()), 'dns_entries': len(self.dns.entries)}
+
+
+def parse_head(data):
+    lines = data.decode('latin-1').split('\r\n')
+    version, _, rest = lines[0].partition(' ')
+    status, _, reason = rest.partition(' ')
+    headers = Message()
+    name = None
+    for line in lines[1:]:
+        if not line:
+            continue
+        if line[0] in ' \t' and name is not None:
+            # Eski tarz çok satırlı başlık değeri
+            headers.replace_header(name, headers.get_all(name)[-1] + ' ' + line.strip())
+            continue
+        name, _, value = line.partition(':')
+        headers.add_header(name.strip(), value.strip())
+    if not version.startswith('HTTP/') or not status.isdigit():
+        raise TransportError(f'Geçersiz HTTP yanıtı: {lines[0][:100]!r}')
+    return version, int(status), reason, headers
+
+
+class CookieResponse:
+    # http.cookiejar yanıttan sadece info().get_all() bekler
+    def __init__(self, headers):
+        self.headers = headers
+
+    def info(self):
+        return self.headers
+
+
+class PooledResponse:
+    # Gövde döngü iş parçacığında, istenen kadar okunur; gövde bitince bağlantı havuza döner
+    def __init__(self, pool, connection, url, method, version, status, reason, headers, timeout):
+        self.pool = pool
+        self.connection = connection
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.timeout = timeout
+        self.buffer = bytearray()
+        self.received = 0
+        self.chunked = False
+        self.chunk_left = 0
+        self.complete = False
+        self.flushed = False
+        self.loop = asyncio.get_running_loop()
+
+        connection_header = (headers.get('Connection') or '').lower()
+        self.keep_alive = ('close' not in connection_header if version == 'HTTP/1.1'
+                           else 'keep-alive' in connection_header)
+        length = headers.get('Content-Length')
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            self.remaining = 0
+        elif 'chunked' in (headers.get('Transfer-Encoding') or '').lower():
+            self.chunked = True
+            self.remaining = None
+        elif length is not None and length.strip().isdigit():
+            self.remaining = int(length)
+        else:
+            # Uzunluk yok: gövde bağlantı kapanınca biter, bağlantı yeniden kullanılamaz
+            self.remaining = None
+            self.keep_alive = False
+
+        encoding = (headers.get('Content-Encoding') or '').strip().lower()
+        self.decoder = None
+        if encoding in SUPPORTED_ENCODINGS and self.remaining != 0:
+            self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+            # Kodu çözülmüş gövdenin uzunluğu farklıdır
+            del headers['Content-Length']
+        if self.remaining == 0:
+            self.release(True)
+
+    def release(self, reusable):
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            self.pool.release(connection, reusable and self.keep_alive)
+        self.complete = True
+
+    def detach(self):
+        # Okunan kadarı tamponda kalır, kalan gövde okunmaz; bağlantı kapatılır ve yer hemen geri verilir
+        if self.connection is not None:
+            self.release(False)
+
+    def __del__(self):
+        # Okunmadan ve kapatılmadan bırakılan yanıt ana makinenin yerini çöp toplayıcıya kadar tutmasın
+        connection, self.connection = self.connection, None
+        if connection is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.pool.release, connection, False)
+
+    async def read(self, amt=None):
+        if amt is None or amt < 0:
+            parts = [self.take(len(self.buffer))]
+            while (block := await self.fill(READ_SIZE)) is not None:
+                parts.append(block)
+            return b''.join(parts)
+        while not self.buffer:
+            block = await self.fill(amt)
+            if block is None:
+                return b''
+            if block and len(block) <= amt:
+                return block
+            self.buffer += block
+        return self.take(amt)
+
+    def take(self, amt):
+        data = bytes(self.buffer[:amt])
+        del self.buffer[:amt]
+        return data
+
+    async def fill(self, amt):
+        # Bir parça gövde döndürür (kod çözücü veri biriktiriyorsa boş olabilir); gövde bitince None
+        if self.complete:
+            if self.flushed:
+                return None
+            self.flushed = True
+            return (self.decoder.flush() if self.decoder else b'') or None
+        try:
+            raw = await asyncio.wait_for(self.read_raw(amt), self.timeout)
+        except BaseException:
+            self.release(False)
+            raise
+        if not raw:
+            self.release(True)
+            return await self.fill(amt)
+        return self.decoder.decompress(raw) if self.decoder else raw
+
+    async def read_raw(self, amt):
+        reader = self.connection.reader
+        if self.chunked:
+            if self.chunk_left == 0:
+                line = await reader.readline()
+                try:
+                    size = int(line.split(b';', 1)[0].strip(), 16)
+                except ValueError:
+                    raise TransportError(f'Geçersiz parça uzunluğu: {line[:20]!r}')
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''
+                self.chunk_left = size
+            data = await reader.read(min(amt, self.chunk_left))
+            if not data:
+                raise IncompleteRead(self.received, self.chunk_left)
+            self.chunk_left -= len(data)
+            if self.chunk_left == 0:
+                await reader.readexactly(2)
+        elif self.remaining is None:
+            data = await reader.read(amt)
+        else:
+            data = await reader.read(min(amt, self.remaining))
+            if not data:
+                raise IncompleteRead(self.received, self.remaining)
+            self.remaining -= len(data)
+            if self.remaining == 0:
+                self.received += len(data)
+                self.release(True)
+                return data
+        self.received += len(data)
+        return data
+
+    async def preload(self, limit=DRAIN_LIMIT):
+        # Hata yanıtlarının küçük gövdesi hemen okunur; yanıt nesnesi geç kapatılsa da bağlantı havuza döner
+        while len(self.buffer) <= limit and (block := await self.fill(READ_SIZE)) is not None:
+            self.buffer += block
+
+    async def aclose(self):
+        if self.connection is None:
+            return
+        if not self.chunked and self.remaining is not None and self.remaining <= DRAIN_LIMIT:
+            try:
+                while self.connection is not None and await asyncio.wait_for(self.read_raw(READ_SIZE), self.timeout):
+                    pass
+            except Exception:
+                self.release(False)
+                return
+            if self.connection is not None:
+                self.release(True)
+            return
+        self.release(False)
+
+
+class HTTPClient:
+    # Tüm indirme ve bilgi alma iş parçacıkları için tek asyncio döngüsü, tek bağlantı havuzu ve DNS önbelleği
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host=CONNECTIONS_PER_HOST, idle_timeout=IDLE_TIMEOUT,
+                 dns_ttl=DNS_TTL):
+        self.logger = logging.getLogger(__name__)
+        self.io = IOLoop()
+        self.dns = DNSCache(dns_ttl)
+        self.pool = ConnectionPool(self.dns, max_connections, per_host, idle_timeout)
+        self.io.loop.call_soon_threadsafe(self.schedule_sweep)
+        self.logger.info("Pooled HTTP client started (max %s connections, %s per host)", max_connections, per_host)
+
+    def schedule_sweep(self):
+        self.pool.sweep()
+        self.io.loop.call_later(self.pool.idle_timeout, self.schedule_sweep)
+
+    def call(self, coro):
+        # İş parçacığı tarafı: sonucu bekler, ağ hatalarını yt-dlp hata türlerine çevirir
+        try:
+            return self.io.call(coro)
+        except RequestError:
+            raise
+        except ssl.SSLCertVerificationError as e:
+            raise CertificateVerifyError(cause=e) from e
+        except ssl.SSLError as e:
+            raise SSLError(cause=e) from e
+        except (OSError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError) as e:
+            raise TransportError(cause=e) from e
+
+    async def fetch(self, method, url, headers, data, timeout, tls, ssl_context, source_address, cookiejar):
+        # Yönlendirmeler izlenir; son yanıt ve yönlendirme sınırının aşılıp aşılmadığı döner
+        for _ in range(MAX_REDIRECTS):
+            response = await self.exchange(method, url, headers, data, timeout, tls, ssl_context, source_address,
+                                           cookiejar)
+            location = response.headers.get('Location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                if not 200 <= response.status < 300:
+                    # Hata yanıtının nesnesi (HTTPError) uzun süre tutulabilir; bağlantı ona bağlı kalmaz
+                    await response.preload()
+                    response.detach()
+                return response, False
+            await response.aclose()
+            new_method = get_redirect_method(method, response.status)
+            if new_method != method:
+                data = None
+                headers = {k: v for k, v in headers.items() if k.lower() not in ('content-type', 'content-length')}
+            method, url = new_method, urllib.parse.urljoin(url, location)
+        response = await self.exchange(method, url, headers, data, timeout, tls, ssl_context, source_address,
+                                       cookiejar)
+        await response.preload()
+        response.detach()
+        return response, True
+
+    async def exchange(self, method, url, headers, data, timeout, tls, ssl_context, source_address, cookiejar):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+        cookie_request = urllib.request.Request(url, headers=headers, method=method)
+        cookiejar.add_cookie_header(cookie_request)
+        names = {name.lower() for name in headers}
+        lines = [f'{method} {target} HTTP/1.1']
+        if 'host' not in names:
+            lines.append(f'Host: {parts.netloc.rpartition("@")[2]}')
+        lines += [f'{name}: {value}' for name, value in headers.items() if name.lower() != 'content-length']
+        cookie = cookie_request.unredirected_hdrs.get('Cookie')
+        if cookie and 'cookie' not in names:
+            lines.append(f'Cookie: {cookie}')
+        if data is not None:
+            lines.append(f'Content-Length: {len(data)}')
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (data or b'')
+
+        key = (scheme, parts.hostname, port, tls if scheme == 'https' else None, source_address)
+        # Devre kesici açıksa istek hiç gönderilmez; yanıt durumu ve ağ hataları kesiciye bildirilir
+        wait = breakers.blocked_for(parts.hostname)
+        if wait:
+            raise CircuitOpen(parts.hostname, wait)
+        try:
+            response_head = await self.send(key, message, ssl_context if scheme == 'https' else None, timeout,
+                                            parts.hostname)
+        except (OSError, EOFError):
+            breakers.failure(parts.hostname)
+            raise
+        except BaseException:
+            # İptal vb. makinenin durumu hakkında bilgi vermez; deneme isteği hakkı geri verilir
+            breakers.abandon(parts.hostname)
+            raise
+        connection, reused, version, status, reason, response_headers = response_head
+        breakers.record(parts.hostname, status, parse_retry_after(response_headers.get('Retry-After')))
+
+        connection.requests += 1
+        metrics.inc('ytdl_http_requests_total', connection='reused' if reused else 'new')
+        cookiejar.extract_cookies(CookieResponse(response_headers), cookie_request)
+        return PooledResponse(self.pool, connection, url, method, version, status, reason, response_headers, timeout)
+
+    async def send(self, key, message, ssl_context, timeout, hostname):
+        for attempt in range(2):
+            connection = await self.pool.acquire(key, ssl_context, timeout)
+            reused = connection.requests > 0
+            try:
+                connection.writer.write(message)
+                await asyncio.wait_for(connection.writer.drain(), timeout)
+                while True:
+                    head = await asyncio.wait_for(connection.reader.readuntil(b'\r\n\r\n'), timeout)
+                    version, status, reason, response_headers = parse_head(head)
+                    # Ara yanıtlar (100 Continue vb.) atlanır
+                    if not 100 <= status < 200 or status == 101:
+                        break
+            except (OSError, EOFError) as e:
+                self.pool.release(connection, False)
+                if reused and attempt == 0 and not isinstance(e, asyncio.TimeoutError):
+                    # Havuzdaki bağlantıyı sunucu bu arada kapatmış olabilir; yeni bağlantıyla bir kez daha dene
+                    self.logger.debug("Pooled connection to %s failed (%s), reconnecting", hostname, e)
+                    continue
+                raise
+            except BaseException:
+                self.pool.release(connection, False)
+                raise
+            return connection, reused, version, status, reason, response_headers
+
+    def stats(self):
+        return self.io.call(self.async_stats())
+
+    async def async_stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.io.loop.call_soon_threadsafe(self.pool.close)
+        self.io.close()
+
+
+class PooledStream(io.RawIOBase):
+    # yt-dlp'nin beklediği senkron dosya arayüzü; her okuma döngüdeki yanıttan yapılır
+    def __init__(self, client, response):
+        super().__init__()
+        self.client = client
+        self.response = response
+
+    def readable(self):
+        return True
+
+    def read(self, amt=None):
+        if self.closed:
+            return b''
+        data = self.client.call(self.response.read(amt))
+        if not data and amt != 0:
+            self.close()
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def close(self):
+        if not self.closed:
+            if threading.current_thread() is self.client.io.thread:
+                # Çöp toplayıcı döngü iş parçacığında kapatıyorsa beklemeden sıraya al
+                self.client.io.loop.create_task(self.response.aclose())
+            elif self.client.io.loop.is_running():
+                try:
+                    self.client.call(self.response.aclose())
+                except RequestError:
+                    pass
+        super().close()
+
+
+class PooledResponseAdapter(Response):
+    def read(self, amt=None):
+        try:
+            data = self.fp.read(amt)
+        except RequestError:
+            raise
+        except Exception as e:
+            raise TransportError(cause=e) from e
+        if self.fp.closed:
+            self.close()
+        return data
+
+
+# Paylaşılan istemci; DownloadEngine başlatır, son kullanan kapatır
+_client = None
+_users = 0
+_client_lock = threading.Lock()
+
+
+def start_shared_client(**options):
+    global _client, _users
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient(**options)
+        _users += 1
+        return _client
+
+
+def stop_shared_client():
+    global _client, _users
+    with _client_lock:
+        _users = max(0, _users - 1)
+        if _users or _client is None:
+            return
+        client, _client = _client, None
+    client.close()
+
+
+def shared_client():
+    return _client
+
+
+class PooledRH(RequestHandler):
+    # yt-dlp istekleri paylaşılan istemciden gönderilir: motorun YoutubeDL örnekleri, bilgi alma işleri ve
+    # parçalı indirmeler aynı kalıcı bağlantıları ve DNS önbelleğini kullanır. İstemci çalışmıyorsa ya da
+    # vekil sunucu tanımlıysa istek yt-dlp'nin kendi işleyicilerine bırakılır. İşleyici yt-dlp'ye genel
+    # olarak kaydedilmez, sadece PooledYoutubeDL örneklerinde bulunur.
+    _SUPPORTED_URL_SCHEMES = ('http', 'https')
+    _SUPPORTED_PROXY_SCHEMES = ()
+    _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
+    RH_NAME = 'pooled'
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        for name in ('cookiejar', 'timeout', 'legacy_ssl', 'keep_header_casing'):
+            extensions.pop(name, None)
+
+    def _validate(self, request):
+        if _client is None:
+            raise UnsupportedRequest('Pooled HTTP client is not running')
+        super()._validate(request)
+
+    def _prepare_headers(self, request, headers):
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+
+    def _send(self, request):
+        client = _client
+        if client is None:
+            raise UnsupportedRequest('Pooled HTTP client is not running')
+        legacy = request.extensions.get('legacy_ssl')
+        legacy = self.legacy_ssl_support if legacy is None else legacy
+        tls = (self.verify, legacy, self.prefer_system_certs, tuple(sorted(self._client_cert.items())))
+        ssl_context = client.pool.ssl_context(tls, lambda: self._make_sslcontext(legacy_ssl_support=legacy))
+
+        data = request.data
+        if data is not None and not isinstance(data, bytes):
+            data = data.read() if hasattr(data, 'read') else b''.join(data)
+
+        response, redirect_loop = client.call(client.fetch(
+            request.method, request.url, self._get_headers(request), data, self._calculate_timeout(request),
+            tls, ssl_context, self.source_address, self._get_cookiejar(request)))
+        result = PooledResponseAdapter(PooledStream(client, response), response.url, response.headers,
+                                       response.status, response.reason)
+        if not 200 <= result.status < 300:
+            raise HTTPError(result, redirect_loop=redirect_loop)
+        return result
+
+
+def pooled_preference(rh, request):
+    return 500 if isinstance(rh, PooledRH) else 0
+
+
+class PooledYoutubeDL(YoutubeDL):
+    # Paylaşılan istemciyi kullanan YoutubeDL; süreçteki diğer örnekler yt-dlp'nin kendi işleyicileriyle kalır
+    def build_request_director(self, handlers, preferences=None):
+        return super().build_request_director([*handlers, PooledRH], {*(preferences or ()), pooled_preference})
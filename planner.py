@@ -0,0 +1,231 @@
+import os
+import json
+import logging
+from formats import (format_spec, HEIGHT, CODEC, EXT, FORMAT_ID, BITRATE, SIZE, MUXED,
+                     A_CODEC, A_EXT, A_FORMAT_ID, A_BITRATE, A_SIZE)
+from utils import app_data_dir
+
+# Arayüz her olay döngüsü turunda en fazla bu kadar satır planlar
+PLAN_BATCH = 500
+
+
+def duration_seconds(value):
+    # Süre sayı ya da "SS:DD:ss" / "DD:ss" metni olabilir; bilinmiyorsa 0
+    if isinstance(value, (int, float)):
+        return value
+    seconds = 0
+    try:
+        for part in (value or '').split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return 0
+    return seconds
+
+
+def stream_size(size, bitrate, duration):
+    # filesize / filesize_approx (merdivende SIZE), yoksa bit hızı (kbps) x süre; ikisi de yoksa None
+    if size:
+        return size
+    if bitrate and duration:
+        return int(bitrate * 1000 / 8 * duration)
+    return None
+
+
+class PlanRule:
+    # Her girdinin kendi format merdiveninden çözülen kural, ör. "≤1080p, avc1 tercih, en fazla 2 GB".
+    # output: postprocess.OUTPUTS'tan biri; max_height görüntü, max_abr ses için üst sınırdır. codec bir
+    # tercihtir (aynı çözünürlükte önce o kodek seçilir), max_size ise sınırdır (aşan format seçilmez).
+    __slots__ = ('output', 'max_height', 'max_abr', 'codec', 'max_size')
+
+    def __init__(self, output='video', max_height=None, max_abr=None, codec=None, max_size=None):
+        self.output = output
+        self.max_height = max_height
+        self.max_abr = max_abr
+        self.codec = codec
+        self.max_size = max_size
+
+    def key(self):
+        return (self.output, self.max_height, self.max_abr, self.codec, self.max_size)
+
+    def fits(self, size):
+        # Boyutu bilinmeyen format sınırı aşıyor sayılmaz
+        return not self.max_size or size is None or size <= self.max_size
+
+
+def choose(candidates, rule):
+    # candidates: (tercih sırası, format ifadesi, boyut, satır); kurala sığan ilk aday, hiçbiri sığmıyorsa
+    # en küçüğü (sığmadığı işaretlenerek) seçilir
+    candidates.sort(key=lambda candidate: candidate[0])
+    for _, spec, size, row in candidates:
+        if rule.fits(size):
+            return spec, size, row, True
+    known = [candidate for candidate in candidates if candidate[2] is not None]
+    if not known:
+        return None
+    _, spec, size, row = min(known, key=lambda candidate: candidate[2])
+    return spec, size, row, False
+
+
+def plan_video(ladder, duration, rule):
+    # Çözünürlük en yüksekten aşağı; aynı çözünürlükte tercih edilen kodek, sonra bit hızı.
+    # Ayrı görüntü akışına kapsayıcısına uyan en iyi ses akışı eklenir (mp4 -> m4a, diğerleri -> webm).
+    audio = ladder['audio']
+    candidates = []
+    for row in ladder['video']:
+        if rule.max_height and row[HEIGHT] > rule.max_height:
+            continue
+        size = stream_size(row[SIZE], row[BITRATE], duration)
+        spec = row[FORMAT_ID]
+        if not row[MUXED]:
+            audio_ext = 'm4a' if row[EXT] == 'mp4' else 'webm'
+            companion = next((a for a in audio if a[A_EXT] == audio_ext), audio[0] if audio else None)
+            if companion is None:
+                continue
+            audio_size = stream_size(companion[A_SIZE], companion[A_BITRATE], duration)
+            size = size + audio_size if size is not None and audio_size is not None else None
+            spec = f"{row[FORMAT_ID]}+{companion[A_FORMAT_ID]}/{row[FORMAT_ID]}+bestaudio"
+        candidates.append(((-row[HEIGHT], row[CODEC] != rule.codec, -row[BITRATE]), spec, size, row))
+    chosen = choose(candidates, rule)
+    if chosen is None:
+        return None
+    spec, size, row, fits = chosen
+    return {'format': spec, 'size': size, 'fits': fits, 'height': row[HEIGHT], 'codec': row[CODEC]}
+
+
+def plan_audio(ladder, duration, rule):
+    candidates = []
+    for row in ladder['audio']:
+        if rule.max_abr and row[A_BITRATE] > rule.max_abr:
+            continue
+        size = stream_size(row[A_SIZE], row[A_BITRATE], duration)
+        candidates.append(((row[A_CODEC] != rule.codec, -row[A_BITRATE]), f"{row[A_FORMAT_ID]}/bestaudio/best",
+                           size, row))
+    chosen = choose(candidates, rule)
+    if chosen is None:
+        return None
+    spec, size, row, fits = chosen
+    return {'format': spec, 'size': size, 'fits': fits, 'abr': row[A_BITRATE], 'codec': row[A_CODEC]}
+
+
+def fallback_spec(rule):
+    # Format listesi henüz alınmamış girdi: kural yt-dlp ifadesi olarak verilir, boyut bilinmez
+    if rule.output == 'video':
+        return format_spec(None, rule.max_height, None, rule.codec)
+    if rule.max_abr:
+        return f"bestaudio[abr<={rule.max_abr}]/bestaudio/best"
+    return 'bestaudio/best'
+
+
+def plan_entry(record, rule):
+    # Tek girdinin planı: format ifadesi, beklenen bayt (None: bilinmiyor), kurala sığıp sığmadığı
+    duration = duration_seconds(record.get('duration') or record.get('duration_string'))
+    ladder = record.get('format_ladder')
+    entry = None
+    if ladder:
+        entry = (plan_video if rule.output == 'video' else plan_audio)(ladder, duration, rule)
+    if entry is None:
+        entry = {'format': fallback_spec(rule), 'size': None, 'fits': True, 'resolved': False}
+    entry['duration'] = duration
+    return entry
+
+
+class BatchPlan:
+    # Seçili girdilerin planı parça parça (step) hesaplanır ki binlerce satırda arayüz donmasın.
+    # Girdi planları cache'te (video kimliği -> (kural, merdiven, plan)) tutulur; kural ve merdiven
+    # değişmedikçe (ör. sadece seçim değiştiyse) yeniden hesaplanmaz.
+    def __init__(self, records, rule, cache):
+        self.records = records
+        self.rule = rule
+        self.cache = cache
+        self.index = 0
+        self.entries = {}
+
+    def done(self):
+        return self.index >= len(self.records)
+
+    def step(self, count=PLAN_BATCH):
+        rule_key = self.rule.key()
+        for record in self.records[self.index:self.index + count]:
+            ladder = record.get('format_ladder')
+            cached = self.cache.get(record['id'])
+            if cached is not None and cached[0] == rule_key and cached[1] is ladder:
+                entry = cached[2]
+            else:
+                entry = plan_entry(record, self.rule)
+                self.cache[record['id']] = (rule_key, ladder, entry)
+            self.entries[record['id']] = entry
+        self.index = min(len(self.records), self.index + count)
+        return self.done()
+
+    def finish(self):
+        while not self.step():
+            pass
+        return self
+
+    def summary(self):
+        # Boyutu bilinen girdilerin toplamı; boyutu bilinmeyenler (format listesi alınmamış playlist
+        # girdileri) bilinenlerin saniye başı bayt ortalaması x kendi süreleriyle tahmin edilir
+        known = estimated = unknown = over_limit = 0
+        known_seconds = 0
+        missing = []
+        for entry in self.entries.values():
+            if not entry['fits']:
+                over_limit += 1
+                continue
+            if entry['size'] is None:
+                missing.append(entry['duration'])
+                continue
+            known += entry['size']
+            known_seconds += entry['duration']
+        bytes_per_second = known / known_seconds if known_seconds else None
+        for duration in missing:
+            if bytes_per_second and duration:
+                estimated += int(bytes_per_second * duration)
+            else:
+                unknown += 1
+        return {
+            'count': len(self.entries),
+            'planned': self.index,
+            'total': len(self.records),
+            'bytes': known + estimated,
+            'known_bytes': known,
+            'estimated_bytes': estimated,
+            'estimated': len(missing) - unknown,
+            'unknown': unknown,
+            'over_limit': over_limit,
+        }
+
+
+class Throughput:
+    # Ölçülen toplam indirme hızı (bayt/sn), plan süresinin tahmini için. İlerleme özetlerindeki toplam
+    # hızla yavaşça güncellenir; oturumlar arasında saklanır, böylece aktarım başlamadan süre verilebilir.
+    def __init__(self, path=None, smoothing=0.05):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.path.join(app_data_dir(), 'throughput.json')
+        self.smoothing = smoothing
+        self.rate = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.rate = json.load(f).get('bytes_per_second')
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def sample(self, speed):
+        if speed and speed > 0:
+            self.rate = speed if self.rate is None else self.rate + self.smoothing * (speed - self.rate)
+
+    def save(self):
+        if self.rate is None:
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'bytes_per_second': round(self.rate)}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning("Throughput could not be saved: %s", e)
+
+    def eta(self, size, rate_limit=None):
+        # Hız sınırı verilmişse ölçülen hız onunla kırpılır; hiç ölçüm ve sınır yoksa None
+        rate = min(filter(None, (self.rate, rate_limit)), default=None)
+        return size / rate if rate and size else None
@@ -0,0 +1,103 @@
+import json
+import time
+import yt_dlp
+from formats import codec_family
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Çıktı türleri: video (mp4), native (ses akışı olduğu gibi) ya da mp3/m4a/opus (gerekirse dönüştürülür)
+OUTPUTS = ('video', 'mp3', 'native', 'm4a', 'opus')
+BASE_PP_OPTS = {'quiet': True, 'no_warnings': True}
+
+# mp4 kabının akış kopyalamayla (yeniden kodlamadan) taşıyabildiği kodekler
+MP4_VIDEO_CODECS = {'avc1', 'hevc', 'av1', 'vp9'}
+MP4_AUDIO_CODECS = {'aac', 'mp3', 'opus', 'ac3', 'eac3'}
+# Ses kodeğinin kopyalandığında yazılacağı kap
+AUDIO_CONTAINERS = {'aac': 'm4a', 'opus': 'opus', 'mp3': 'mp3', 'vorbis': 'ogg'}
+
+
+def default_output(format_id):
+    # Sadece ses seçen ifadeler (ör. "bestaudio/best"); video ifadeleri de "+bestaudio" içerir
+    selector = (format_id or '').strip().lower()
+    return 'mp3' if selector.startswith(('bestaudio', 'ba/', 'ba[')) or selector == 'ba' else 'video'
+
+
+def stream_codecs(info):
+    # Birleştirilmiş indirmelerde kodekler requested_formats içindeki akışlardan okunur
+    streams = info.get('requested_formats') or [info]
+    vcodec = next(filter(None, (codec_family(f.get('vcodec')) for f in streams)), None)
+    acodec = next(filter(None, (codec_family(f.get('acodec')) for f in streams)), None)
+    return vcodec, acodec
+
+
+def plan_postprocess(info, output='video'):
+    # En ucuz geçerli işlem seçilir: 'none' (dokunma), 'remux' (akış kopyalama), 'transcode'
+    ext = info.get('ext')
+    vcodec, acodec = stream_codecs(info)
+
+    if output == 'video':
+        if ext == 'mp4':
+            return 'none', []
+        if vcodec in MP4_VIDEO_CODECS and (acodec is None or acodec in MP4_AUDIO_CODECS):
+            return 'remux', [{'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}]
+        return 'transcode', [{'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'}]
+
+    target = AUDIO_CONTAINERS.get(acodec) if output == 'native' else output
+    if vcodec is None and target and ext == target:
+        return 'none', []
+    if output == 'native' or (target and AUDIO_CONTAINERS.get(acodec) == target):
+        # Ses akışı yeniden kodlanmadan uygun kaba alınır
+        return 'remux', [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'best'}]
+    pp = {'key': 'FFmpegExtractAudio', 'preferredcodec': target}
+    if target == 'mp3':
+        pp['preferredquality'] = '192'
+    return 'transcode', [pp]
+
+
+def postprocess_options(postprocessors):
+    return dict(BASE_PP_OPTS, postprocessors=postprocessors)
+
+
+def cpu_seconds():
+    # Bu sürecin ve beklenmiş alt süreçlerin (ffmpeg) toplam CPU süresi
+    total = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+# Aşağıdakiler dönüştürme süreçlerinde (ProcessPoolExecutor) çalışır; sadece seçilebilir
+# (picklable) argümanlar alır ve sonucu sade bir sözlük olarak döndürür.
+_ydl_instances = {}
+
+
+def _get_ydl(pp_opts):
+    # Her süreç aynı seçenekler için tek bir YoutubeDL örneğini yeniden kullanır
+    key = json.dumps(pp_opts, sort_keys=True)
+    ydl = _ydl_instances.get(key)
+    if ydl is None:
+        ydl = _ydl_instances[key] = yt_dlp.YoutubeDL(pp_opts)
+    return ydl
+
+
+def portable_info(info):
+    # İşçi süreçlere gönderilebilmesi için bilgi sözlüğünü sadeleştir (fonksiyon, üreteç vb. atılır)
+    info = dict(info)
+    info.pop('__postprocessors', None)
+    return yt_dlp.YoutubeDL.sanitize_info(info)
+
+
+def run_postprocessors(filepath, info, pp_opts, submitted):
+    started = time.time()
+    cpu_start = cpu_seconds()
+    info = _get_ydl(pp_opts).post_process(filepath, info)
+    return {
+        'filepath': info.get('filepath') or filepath,
+        'wait': max(0.0, started - submitted),
+        'elapsed': time.time() - started,
+        'cpu': cpu_seconds() - cpu_start,
+    }
@@ -0,0 +1,98 @@
+import math
+import time
+import threading
+
+
+class JobProgress:
+    __slots__ = ('key', 'filename', 'downloaded', 'total', 'speed', 'sample_time', 'sample_bytes', 'dirty')
+
+    def __init__(self, key):
+        self.key = key
+        self.filename = ''
+        self.downloaded = 0
+        self.total = 0
+        self.speed = None
+        self.sample_time = None
+        self.sample_bytes = 0
+        self.dirty = False
+
+
+class ProgressAggregator:
+    # İşçi iş parçacıkları her parçada update() çağırır (ucuz: sadece son değeri yazar);
+    # arayüz saniyede rate_hz kez tick() ile birleştirilmiş tek bir özet alır.
+    def __init__(self, rate_hz=10, smoothing=2.0, clock=time.monotonic):
+        self.interval = 1.0 / rate_hz
+        self.smoothing = smoothing
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.events = 0
+
+    def update(self, key, filename, downloaded, total):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None:
+                job = self.jobs[key] = JobProgress(key)
+            if filename != job.filename:
+                # Yeni dosya (ör. ses akışı) başladı; hız örneğini sıfırla
+                job.filename = filename
+                job.sample_time = None
+            job.downloaded = downloaded or 0
+            job.total = total or 0
+            job.dirty = True
+            self.events += 1
+
+    def finish(self, key):
+        with self.lock:
+            self.jobs.pop(key, None)
+
+    def tick(self):
+        now = self.clock()
+        with self.lock:
+            changed = {}
+            for job in self.jobs.values():
+                if job.sample_time is None:
+                    # Devam eden indirmede ilk örnek sadece başlangıç noktasıdır
+                    job.sample_time, job.sample_bytes = now, job.downloaded
+                elif job.dirty and now > job.sample_time:
+                    elapsed = now - job.sample_time
+                    instant = max(0, job.downloaded - job.sample_bytes) / elapsed
+                    # Zaman sabitli üstel yumuşatma: tick sıklığından bağımsız davranır
+                    weight = 1 - math.exp(-elapsed / self.smoothing)
+                    job.speed = instant if job.speed is None else job.speed + weight * (instant - job.speed)
+                    job.sample_time, job.sample_bytes = now, job.downloaded
+                if job.dirty:
+                    changed[job.key] = self.snapshot(job)
+                    job.dirty = False
+            if not changed:
+                return None
+            total_bytes = sum(job.total for job in self.jobs.values())
+            downloaded = sum(job.downloaded for job in self.jobs.values())
+            speed = sum(job.speed or 0 for job in self.jobs.values())
+            events, self.events = self.events, 0
+
+        remaining = max(0, total_bytes - downloaded)
+        return {
+            'jobs': changed,
+            'total': {
+                'active': len(self.jobs),
+                'downloaded': downloaded,
+                'total': total_bytes,
+                'percent': downloaded / total_bytes * 100 if total_bytes else 0,
+                'speed': speed,
+                'eta': remaining / speed if speed > 0 else None,
+                'events': events,
+            },
+        }
+
+    @staticmethod
+    def snapshot(job):
+        remaining = max(0, job.total - job.downloaded)
+        return {
+            'filename': job.filename,
+            'downloaded': job.downloaded,
+            'total': job.total,
+            'percent': job.downloaded / job.total * 100 if job.total else 0,
+            'speed': job.speed or 0,
+            'eta': remaining / job.speed if job.speed else None,
+        }
@@ -0,0 +1,209 @@
+import re
+import time
+import random
+import logging
+import threading
+import email.utils
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, ExtractorError, ContentTooShortError
+from metrics import metrics
+
+# Hata sınıfları: sunucu hız sınırı (429), sunucu hatası (5xx), ağ hatası (zaman aşımı, bağlantı),
+# devre kesici açık (istek hiç gönderilmedi) ve yeniden denenmeyen hatalar
+RATE_LIMITED, SERVER, NETWORK, CIRCUIT_OPEN, FATAL = 'rate_limited', 'server', 'network', 'circuit_open', 'fatal'
+# Her iş için hata sınıfı başına en fazla yeniden deneme
+RETRY_BUDGETS = {RATE_LIMITED: 4, SERVER: 3, NETWORK: 3, CIRCUIT_OPEN: 6}
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# Sunucunun istediği bekleme (Retry-After) bu süreyle sınırlanır
+MAX_RETRY_AFTER = 600
+
+# Devre kesici: bir ana makineden art arda bu kadar hata gelirse makine bekleme süresi boyunca kapatılır;
+# süre dolunca tek bir deneme isteği gönderilir, o da başarısızsa süre ikiye katlanır
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 10.0
+BREAKER_MAX_COOLDOWN = 300.0
+# Yarı açık makinede deneme isteği sürerken diğer istekler bu kadar bekletilir
+PROBE_WAIT = 1.0
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+# yt-dlp indiricisi vazgeçtiği hatayı asıl istisna olmadan, sadece mesaj olarak bildirir
+HTTP_ERROR_MESSAGE = re.compile(r'HTTP Error (\d{3})')
+
+
+class CircuitOpen(TransportError):
+    def __init__(self, host, retry_after):
+        super().__init__(f'{host} için devre kesici açık, {retry_after:.0f} sn sonra yeniden denenecek')
+        self.host = host
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    # Retry-After saniye ya da HTTP tarihi olabilir
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def status_class(status):
+    if status == 429:
+        return RATE_LIMITED
+    if 500 <= status < 600:
+        return SERVER
+    return None
+
+
+def classify(error):
+    # yt-dlp hataları asıl hatayı sarar (DownloadError.exc_info, ExtractorError.cause, __cause__);
+    # zincir boyunca ilk tanınan hata sınıfı ve varsa sunucunun istediği bekleme döner
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, CircuitOpen):
+            return CIRCUIT_OPEN, error.retry_after
+        if isinstance(error, HTTPError):
+            return (status_class(error.status) or FATAL,
+                    parse_retry_after(error.response.headers.get('Retry-After')))
+        if isinstance(error, (TransportError, ContentTooShortError, TimeoutError, ConnectionError)):
+            return NETWORK, None
+        if isinstance(error, DownloadError) and not (error.exc_info and error.exc_info[1]):
+            match = HTTP_ERROR_MESSAGE.search(str(error))
+            if match is None:
+                return FATAL, None
+            return status_class(int(match.group(1))) or FATAL, None
+        if isinstance(error, DownloadError):
+            error = error.exc_info[1]
+        elif isinstance(error, ExtractorError) and error.cause is not None:
+            error = error.cause
+        else:
+            error = error.__cause__ or error.__context__
+    return FATAL, None
+
+
+class RetryPolicy:
+    # Üstel geri çekilme + tam jitter: deneme n için bekleme [0, min(cap, base * 2^n)] aralığından rastgele
+    # seçilir (aynı anda hata alan işler aynı anda yeniden denemesin). Sunucu Retry-After verdiyse en az
+    # o kadar beklenir. Her hata sınıfının ayrı bütçesi vardır; bütçesi biten ya da kalıcı hata
+    # yeniden denenmez.
+    def __init__(self, budgets=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+        self.budgets = dict(RETRY_BUDGETS, **(budgets or {}))
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, min(retry_after, MAX_RETRY_AFTER))
+        return delay
+
+    def next_delay(self, error, attempts, kind):
+        # attempts: çağıranın tuttuğu sınıf -> deneme sayısı sözlüğü (yerinde güncellenir).
+        # Yeniden denenecekse (bekleme, sınıf), denenmeyecekse (None, sınıf) döner.
+        error_class, retry_after = classify(error)
+        used = attempts.get(error_class, 0)
+        if used >= self.budgets.get(error_class, 0):
+            if error_class != FATAL:
+                metrics.inc('ytdl_retry_budget_exhausted_total', kind=kind, error=error_class)
+            return None, error_class
+        attempts[error_class] = used + 1
+        metrics.inc('ytdl_retries_total', kind=kind, error=error_class)
+        return self.delay(used, retry_after), error_class
+
+
+class CircuitBreakers:
+    # Ana makine başına devre kesici. Paylaşılan HTTP istemcisi her istekten önce sorar ve sonucu bildirir;
+    # indirme işleri başlamadan önce sayfa adresinin makinesi kapalıysa kuyruk dışında bekler.
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.logger = logging.getLogger(__name__)
+
+    def transition(self, host, breaker, state):
+        breaker['state'] = state
+        metrics.inc('ytdl_breaker_transitions_total', host=host, state=state)
+        if state == OPEN:
+            self.logger.warning("Circuit opened for %s for %.0f s after %s failures",
+                                host, breaker['until'] - time.monotonic(), breaker['failures'])
+        else:
+            self.logger.info("Circuit %s for %s", state, host)
+
+    def blocked_for(self, host, probe=True):
+        # 0: istek gönderilebilir; > 0: makine kapalı, bu kadar saniye sonra yeniden sorulmalı.
+        # probe=False yarı açık makinede deneme isteği hakkını kullanmadan sadece bakar.
+        with self.lock:
+            breaker = self.hosts.get(host)
+            if breaker is None or breaker['state'] == CLOSED:
+                return 0
+            now = time.monotonic()
+            if breaker['state'] == OPEN:
+                if now < breaker['until']:
+                    wait = breaker['until'] - now
+                    metrics.inc('ytdl_breaker_rejections_total', host=host)
+                    return wait
+                if not probe:
+                    return 0
+                self.transition(host, breaker, HALF_OPEN)
+            if not probe:
+                return 0
+            if breaker['probing']:
+                metrics.inc('ytdl_breaker_rejections_total', host=host)
+                return PROBE_WAIT
+            breaker['probing'] = True
+            return 0
+
+    def success(self, host):
+        with self.lock:
+            breaker = self.hosts.get(host)
+            if breaker is None:
+                return
+            if breaker['state'] != CLOSED:
+                self.transition(host, breaker, CLOSED)
+            del self.hosts[host]
+
+    def failure(self, host, retry_after=None):
+        # 429/5xx ya da ağ hatası. Sunucu Retry-After ile beklemesini istediyse makine hemen kapatılır.
+        with self.lock:
+            breaker = self.hosts.setdefault(host, {'state': CLOSED, 'failures': 0, 'until': 0.0,
+                                                   'cooldown': self.cooldown, 'probing': False})
+            breaker['failures'] += 1
+            breaker['probing'] = False
+            if breaker['state'] == HALF_OPEN:
+                breaker['cooldown'] = min(self.max_cooldown, breaker['cooldown'] * 2)
+            elif breaker['state'] == OPEN or (breaker['failures'] < self.threshold and not retry_after):
+                return
+            breaker['until'] = time.monotonic() + max(breaker['cooldown'], min(retry_after or 0, MAX_RETRY_AFTER))
+            self.transition(host, breaker, OPEN)
+
+    def abandon(self, host):
+        with self.lock:
+            breaker = self.hosts.get(host)
+            if breaker is not None:
+                breaker['probing'] = False
+
+    def record(self, host, status=None, retry_after=None):
+        # HTTP yanıtı: 429/5xx hata, diğerleri (4xx dahil) makinenin ayakta olduğunu gösterir
+        if status is not None and status_class(status) is None:
+            self.success(host)
+        else:
+            self.failure(host, retry_after)
+
+    def states(self):
+        with self.lock:
+            return {host: breaker['state'] for host, breaker in self.hosts.items()}
+
+    def reset(self):
+        with self.lock:
+            self.hosts.clear()
+
+
+# Uygulama genelinde tek devre kesici kaydı ve varsayılan yeniden deneme politikası
+breakers = CircuitBreakers()
+retry_policy = RetryPolicy()
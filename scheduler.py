@@ -0,0 +1,202 @@
+import os
+import time
+import heapq
+import logging
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Kulvarların çalışma anında büyütülebileceği üst sınır
+MAX_LANE_THREADS = 32
+
+
+class TokenBucket:
+    def __init__(self, rate=None, burst=None):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate, burst=None):
+        # rate: bayt/saniye; None ya da 0 sınırsız demek
+        with self.lock:
+            self.rate = rate or None
+            self.capacity = burst or rate or 0
+            self.tokens = self.capacity
+            self.stamp = time.monotonic()
+
+    def consume(self, amount):
+        with self.lock:
+            if not self.rate:
+                return 0
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            # Borçlanmaya izin ver; borç kadar bekleyen çağıran hızı kendiliğinden düşürür
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class PriorityLane:
+    # Öncelik kuyruklu, eş zamanlılığı sınırlı iş kulvarı
+    def __init__(self, name, max_concurrent, on_stats=None):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.max_concurrent = max(1, min(max_concurrent, MAX_LANE_THREADS))
+        self.on_stats = on_stats
+        self.lock = threading.RLock()
+        self.queue = []
+        self.running = set()
+        self.counter = itertools.count()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_LANE_THREADS, thread_name_prefix=name)
+
+    def submit(self, fn, priority=0):
+        # Büyük öncelik önce çalışır; eşit öncelikte ekleme sırası korunur
+        with self.lock:
+            job_id = next(self.counter)
+            heapq.heappush(self.queue, (-priority, job_id, fn))
+        self.dispatch()
+        return job_id
+
+    def dispatch(self):
+        with self.lock:
+            while self.queue and len(self.running) < self.max_concurrent:
+                _, job_id, fn = heapq.heappop(self.queue)
+                self.running.add(job_id)
+                self.executor.submit(self.run, job_id, fn)
+            stats = (len(self.queue), len(self.running))
+        if self.on_stats:
+            self.on_stats(*stats)
+
+    def run(self, job_id, fn):
+        try:
+            fn()
+        except Exception as e:
+            self.logger.error("%s job %s failed: %s", self.name, job_id, e)
+        finally:
+            with self.lock:
+                self.running.discard(job_id)
+            self.dispatch()
+
+    def remove(self, job_id):
+        # Kuyrukta bekleyen işi çıkarır; iş zaten başladıysa False döner
+        with self.lock:
+            for i, item in enumerate(self.queue):
+                if item[1] == job_id:
+                    self.queue.pop(i)
+                    heapq.heapify(self.queue)
+                    break
+            else:
+                return False
+        self.dispatch()
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.queue.clear()
+        self.dispatch()
+
+    def is_running(self, job_id):
+        with self.lock:
+            return job_id in self.running
+
+    def set_max_concurrent(self, count):
+        with self.lock:
+            self.max_concurrent = max(1, min(count, MAX_LANE_THREADS))
+        self.dispatch()
+
+    def queue_depth(self):
+        with self.lock:
+            return len(self.queue)
+
+    def running_count(self):
+        with self.lock:
+            return len(self.running)
+
+    def shutdown(self, wait=True):
+        self.clear()
+        self.executor.shutdown(wait=wait)
+
+
+class DownloadScheduler:
+    def __init__(self, max_concurrent=3, global_rate_limit=None, postprocess_workers=None, on_stats=None):
+        self.logger = logging.getLogger(__name__)
+        self.bandwidth = TokenBucket(global_rate_limit)
+
+        # Uzun aktarımlar ve dönüştürme işleri ayrı kulvarlarda çalışır
+        self.downloads = PriorityLane('download', max_concurrent, on_stats)
+
+        # Dönüştürme (ffmpeg) ayrı süreçlerde, çekirdek sayısı kadar iş ile sınırlı çalışır;
+        # fazlası kuyrukta bekler. Qt ve iş parçacıklarıyla güvenli olması için 'spawn' kullanılır.
+        self.postprocess_workers = postprocess_workers or os.cpu_count() or 1
+        self.postprocess_lane = ProcessPoolExecutor(
+            max_workers=self.postprocess_workers, mp_context=multiprocessing.get_context('spawn'))
+        self.postprocess_lock = threading.Lock()
+        self.postprocess_pending = 0
+
+    @property
+    def max_concurrent(self):
+        return self.downloads.max_concurrent
+
+    def submit(self, fn, priority=0):
+        job_id = self.downloads.submit(fn, priority)
+        self.logger.info("Job %s queued (priority=%s, queue depth=%s)", job_id, priority, self.queue_depth())
+        return job_id
+
+    def remove(self, job_id):
+        return self.downloads.remove(job_id)
+
+    def is_running(self, job_id):
+        return self.downloads.is_running(job_id)
+
+    def run_postprocess(self, fn, *args):
+        # fn modül düzeyinde bir fonksiyon, argümanlar seçilebilir (picklable) olmalı
+        with self.postprocess_lock:
+            self.postprocess_pending += 1
+        future = self.postprocess_lane.submit(fn, *args)
+        future.add_done_callback(self.on_postprocess_done)
+        return future
+
+    def on_postprocess_done(self, future):
+        with self.postprocess_lock:
+            self.postprocess_pending -= 1
+
+    def postprocess_depth(self):
+        # Dönüştürme aşamasındaki (bekleyen + çalışan) iş sayısı
+        with self.postprocess_lock:
+            return self.postprocess_pending
+
+    def throttle_hook(self):
+        # Küresel hız sınırı: her iş aktardığı bayt kadar ortak kovadan jeton harcar
+        seen = {}
+
+        def hook(d):
+            if d.get('status') != 'downloading':
+                return
+            key = d.get('filename')
+            done = d.get('downloaded_bytes') or 0
+            # Devam eden indirmede önceden inmiş baytlar tekrar sayılmasın
+            delta = done - seen.get(key, done)
+            seen[key] = done
+            if delta > 0:
+                self.bandwidth.consume(delta)
+        return hook
+
+    def set_max_concurrent(self, count):
+        self.downloads.set_max_concurrent(count)
+
+    def set_global_rate_limit(self, rate):
+        self.bandwidth.set_rate(rate)
+
+    def queue_depth(self):
+        return self.downloads.queue_depth()
+
+    def running_count(self):
+        return self.downloads.running_count()
+
+    def shutdown(self, wait=True):
+        self.downloads.shutdown(wait)
+        self.postprocess_lane.shutdown(wait=wait)
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import RequestError
+from yt_dlp.utils import ContentTooShortError
+from retry import RetryPolicy, RATE_LIMITED, SERVER, NETWORK
+from storage import WRITE_BUFFER, write_stats
+
+# .part dosyasının yanında parça ilerlemesi tutulur; duraklatılan iş buradan sürer
+STATE_SUFFIX = '.segments'
+
+MIN_SEGMENT_SIZE = 1024 * 1024
+READ_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 0.25
+START, END, DONE = range(3)
+
+
+class SegmentedHttpFD(HttpFD):
+    # Dosya eş zamanlı HTTP Range istekleriyle parçalar halinde indirilir. Her parça, önceden
+    # ayrılmış .part dosyasındaki kendi konumuna doğrudan yazılır; birleştirme/kopyalama gerekmez.
+    # .part dosyası hedefin yanında (aynı dosya sisteminde) durur, bitişteki yeniden adlandırma atomiktir.
+    # yt-dlp'nin indirici kaydına eklenmez; EngineYoutubeDL.dl bağlantı sayısıyla birlikte doğrudan kurar.
+    def __init__(self, ydl, params, segments=1):
+        super().__init__(ydl, params)
+        self.segments = segments
+
+    @classmethod
+    def can_download(cls, info_dict, path=None):
+        return info_dict.get('protocol') in ('http', 'https') and not info_dict.get('to_stdout')
+
+    def real_download(self, filename, info_dict):
+        segments = self.segments
+        tmpfilename = self.temp_name(filename)
+        state_path = tmpfilename + STATE_SUFFIX
+        if segments > 1 and tmpfilename != filename and not self.params.get('test'):
+            headers = {'Accept-Encoding': 'identity', **(info_dict.get('http_headers') or {})}
+            total = self.probe_size(info_dict['url'], headers)
+            if total and total >= 2 * MIN_SEGMENT_SIZE:
+                return self.download_segments(filename, tmpfilename, info_dict, headers, total, segments)
+
+        # Tek bağlantı: önceki parçalı denemenin önceden ayrılmış .part dosyası sürdürülemez
+        if os.path.exists(state_path):
+            self.try_remove(tmpfilename)
+            self.try_remove(state_path)
+        return super().real_download(filename, info_dict)
+
+    def probe_size(self, url, headers):
+        # Sunucu Range destekliyorsa 206 ve "Content-Range: bytes 0-0/<boyut>" döner
+        try:
+            with self.ydl.urlopen(Request(url, None, dict(headers, Range='bytes=0-0'))) as response:
+                content_range = response.headers.get('Content-Range', '')
+                if response.status != 206 or '/' not in content_range:
+                    return None
+                total = content_range.rsplit('/', 1)[1]
+                return int(total) if total.isdigit() else None
+        except RequestError as e:
+            self.write_debug(f'Range probe failed, falling back to a single connection: {e}')
+            return None
+
+    @staticmethod
+    def plan_segments(total, count):
+        count = max(1, min(count, total // MIN_SEGMENT_SIZE))
+        size = -(-total // count)
+        return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+    def load_state(self, state_path, total):
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('total') == total:
+                return state['segments']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    @staticmethod
+    def save_state(state_path, total, segments):
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'total': total, 'segments': segments}, f)
+        os.replace(tmp_path, state_path)
+
+    @staticmethod
+    def preallocate(path, total):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if os.fstat(fd).st_size != total:
+                try:
+                    # Diskte yer baştan ayrılır; desteklenmiyorsa seyrek dosya yeterli
+                    os.posix_fallocate(fd, 0, total)
+                except (AttributeError, OSError):
+                    os.ftruncate(fd, total)
+        finally:
+            os.close(fd)
+
+    def download_segments(self, filename, tmpfilename, info_dict, headers, total, count):
+        state_path = tmpfilename + STATE_SUFFIX
+        segments = None
+        if self.params.get('continuedl', True) and os.path.exists(tmpfilename):
+            segments = self.load_state(state_path, total)
+        if segments is None:
+            segments = self.plan_segments(total, count)
+            if os.path.exists(tmpfilename):
+                self.try_remove(tmpfilename)
+        self.preallocate(tmpfilename, total)
+        self.save_state(state_path, total, segments)
+        self.report_destination(filename)
+
+        resumed = sum(segment[DONE] for segment in segments)
+        ctx = {
+            'url': info_dict['url'],
+            'headers': headers,
+            'path': tmpfilename,
+            'stop': threading.Event(),
+            # İlerleme kancaları (ör. bant genişliği kısıtlayıcısı) çalışırken parçalar bekler
+            'gate': threading.Event(),
+            'directory': os.path.dirname(os.path.abspath(filename)),
+        }
+        ctx['gate'].set()
+        pending = [segment for segment in segments if segment[START] + segment[DONE] <= segment[END]]
+        start_time = time.time()
+
+        def report():
+            downloaded = sum(segment[DONE] for segment in segments)
+            elapsed = time.time() - start_time
+            speed = (downloaded - resumed) / elapsed if elapsed > 0 else None
+            self._hook_progress({
+                'status': 'downloading',
+                'filename': filename,
+                'tmpfilename': tmpfilename,
+                'downloaded_bytes': downloaded,
+                'total_bytes': total,
+                # Dosya baştan tam boyutta ayrıldı; disk alanı denetimi bunu yazılmış sayar
+                'allocated_bytes': total,
+                'elapsed': elapsed,
+                'speed': speed,
+                'eta': (total - downloaded) / speed if speed else None,
+            }, info_dict)
+            return downloaded
+
+        with ThreadPoolExecutor(max(1, len(pending)), thread_name_prefix='segment') as pool:
+            futures = [pool.submit(self.fetch_segment, ctx, segment) for segment in pending]
+            try:
+                while True:
+                    done, running = wait(futures, timeout=PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()
+                    ctx['gate'].clear()
+                    try:
+                        downloaded = report()
+                        self.slow_down(start_time, None, downloaded - resumed)
+                    finally:
+                        ctx['gate'].set()
+                    if not running:
+                        break
+                    self.save_state(state_path, total, segments)
+            except BaseException:
+                # Duraklatma/iptal ya da hata: parçalar durdurulur, ilerleme kaydedilir
+                ctx['stop'].set()
+                ctx['gate'].set()
+                wait(futures)
+                self.save_state(state_path, total, segments)
+                raise
+
+        downloaded = sum(segment[DONE] for segment in segments)
+        if downloaded != total:
+            raise ContentTooShortError(downloaded, total)
+        self.try_remove(state_path)
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'status': 'finished',
+            'filename': filename,
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'elapsed': time.time() - start_time,
+        }, info_dict)
+        return True
+
+    def fetch_segment(self, ctx, segment):
+        retries = self.params.get('retries', 10)
+        # Geçici hatalar (ağ, 5xx, 429) kısa üstel geri çekilme + jitter ile yinelenir; kalıcı hatalar
+        # (404, disk yazma hatası) hemen yükseltilir. Veri okundukça deneme sayaçları sıfırlanır.
+        policy = RetryPolicy({NETWORK: retries, SERVER: retries, RATE_LIMITED: retries}, base=0.5, cap=10)
+        attempts = {}
+        # Okunan küçük bloklar biriktirilip WRITE_BUFFER boyutunda tek yazmayla diske gider (eş zamanlı
+        # yazıcılar dosyayı parçalamasın). segment[DONE] sadece diske yazılan baytları sayar; kayıtlı
+        # ilerleme her zaman dosyadaki veriyle tutarlıdır.
+        buffer = bytearray()
+        fd = os.open(ctx['path'], os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            while segment[START] + segment[DONE] <= segment[END] and not ctx['stop'].is_set():
+                offset = segment[START] + segment[DONE]
+                request = Request(ctx['url'], None, dict(ctx['headers'], Range=f'bytes={offset}-{segment[END]}'))
+                try:
+                    with self.ydl.urlopen(request) as response:
+                        if response.status != 206:
+                            raise RequestError(f'Range isteği reddedildi (HTTP {response.status})')
+                        while not ctx['stop'].is_set():
+                            ctx['gate'].wait()
+                            data = response.read(min(READ_SIZE, segment[END] - offset + 1))
+                            if not data:
+                                break
+                            buffer += data
+                            offset += len(data)
+                            attempts.clear()
+                            if len(buffer) >= WRITE_BUFFER:
+                                self.flush_segment(ctx, fd, segment, buffer)
+                        self.flush_segment(ctx, fd, segment, buffer)
+                        if offset <= segment[END] and not ctx['stop'].is_set():
+                            # Bağlantı parça bitmeden kapandı; kalan kısım yeniden istenir
+                            raise ContentTooShortError(segment[DONE], segment[END] - segment[START] + 1)
+                except (RequestError, OSError, ContentTooShortError) as e:
+                    # Hata öncesi okunan veri geçerli; yazılır ve istek kalan kısım için yinelenir
+                    self.flush_segment(ctx, fd, segment, buffer)
+                    delay, _ = policy.next_delay(e, attempts, 'segment')
+                    if delay is None or sum(attempts.values()) > retries:
+                        raise
+                    self.report_retry(e, sum(attempts.values()), retries, fatal=False)
+                    ctx['stop'].wait(delay)
+        finally:
+            try:
+                # Duraklatma/iptal: tampondaki veri de kaydedilsin, sürdürmede yeniden indirilmez
+                self.flush_segment(ctx, fd, segment, buffer)
+            finally:
+                os.close(fd)
+
+    def flush_segment(self, ctx, fd, segment, buffer):
+        if not buffer:
+            return
+        start = time.perf_counter()
+        self.write_at(fd, buffer, segment[START] + segment[DONE])
+        write_stats.add(ctx['directory'], len(buffer), time.perf_counter() - start)
+        segment[DONE] += len(buffer)
+        buffer.clear()
+
+    @staticmethod
+    def write_at(fd, data, offset):
+        # Her parçanın kendi dosya tanımlayıcısı var; pwrite yoksa (Windows) seek + write güvenli
+        view = memoryview(data)
+        while view:
+            if hasattr(os, 'pwrite'):
+                written = os.pwrite(fd, view, offset)
+            else:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+            view, offset = view[written:], offset + written
+
@@ -0,0 +1,10 @@
+import time
+
+# Başlangıç ölçümü: main.py'nin ilk satırından itibaren geçen süreler (saniye)
+STARTED = time.perf_counter()
+marks = {}
+
+
+def mark(name):
+    # Her aşama sadece ilk kez kaydedilir
+    marks.setdefault(name, round(time.perf_counter() - STARTED, 4))
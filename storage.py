@@ -0,0 +1,130 @@
+import os
+import shutil
+import logging
+import threading
+from metrics import metrics
+
+# Hedef dosya sisteminde her zaman boş bırakılacak alan
+MIN_FREE = 256 * 1024 * 1024
+# Parçalı indirmede her bağlantı veriyi bu boyutta bloklar halinde diske yazar
+WRITE_BUFFER = 1024 * 1024
+OK, DEFER, REFUSE = 'ok', 'defer', 'refuse'
+
+
+def estimate_size(info):
+    # Seçilen format(lar)ın boyutu: filesize, yoksa yaklaşık boyut, o da yoksa bit hızı x süre.
+    # Birleştirilecek görüntü + ses akışları toplanır; biri bilinmiyorsa tahmin yapılmaz (None)
+    total = 0
+    for fmt in info.get('requested_formats') or [info]:
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if not size and fmt.get('tbr') and info.get('duration'):
+            size = fmt['tbr'] * 1000 / 8 * info['duration']
+        if not size:
+            return None
+        total += size
+    return int(total)
+
+
+def existing_parent(path):
+    # Hedef klasör henüz yoksa (yt-dlp indirirken oluşturur) dosya sistemi var olan en yakın üst klasörden okunur
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+
+class DiskSpace:
+    # Kabul denetimi: iş yazmaya başlamadan önce tahmini boyutu hedef dosya sistemindeki boş alanla
+    # karşılaştırılır. Kabul edilmiş ama henüz diske yazılmamış baytlar (ayrılan - yazılan) dosya
+    # sistemi başına ayrılmış sayılır. İş tek başına sığmıyorsa reddedilir; ancak diğer işlerin
+    # ayırdığı alanla sığmıyorsa o işlerden biri bitene kadar ertelenir. Ertelenen iş park edildikten
+    # sonra wait ile kaydolur; dosya sistemi başına serbest bırakma sayacı (generations) sayesinde kabul
+    # kararı ile kayıt arasında kalkan bir ayırma kaçırılmaz.
+    def __init__(self, min_free=MIN_FREE):
+        self.min_free = min_free
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.waiting = {}
+        self.deferred = {}
+        self.generations = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def outstanding(job):
+        return max(0, job['reserved'] - job['written'])
+
+    def admit(self, key, path, size, partial=0):
+        # partial: sürdürülen işin diskte zaten duran (.part, önceden ayrılmış) baytları; yeniden sayılmaz
+        path = existing_parent(path)
+        device = os.stat(path).st_dev
+        free = shutil.disk_usage(path).free - self.min_free
+        needed = max(0, size - partial)
+        with self.lock:
+            others = sum(self.outstanding(other) for other_key, other in self.jobs.items()
+                         if other['device'] == device and other_key != key)
+            if needed > free:
+                decision = REFUSE
+            elif needed + others > free:
+                decision = DEFER
+                self.deferred[key] = (device, self.generations.get(device, 0))
+            else:
+                decision = OK
+                self.jobs[key] = {'device': device, 'reserved': size, 'written': partial}
+        self.logger.debug("Disk admission for %s: %s (needed %s, free %s, reserved by others %s)",
+                          key, decision, needed, free, others)
+        return decision, needed, free
+
+    def wait(self, key, on_space):
+        # Ertelenen iş beklemeye geçti: aynı dosya sistemindeki bir ayırma kalkınca on_space bir kez çağrılır.
+        # Kabul kararından bu yana bir ayırma zaten kalktıysa beklemeden hemen çağrılır.
+        with self.lock:
+            device, generation = self.deferred.pop(key, (None, None))
+            ready = device is None or self.generations.get(device, 0) != generation
+            if not ready:
+                self.waiting.setdefault(device, []).append(on_space)
+        if ready:
+            on_space()
+
+    def written(self, key, count):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and count > job['written']:
+                job['written'] = count
+
+    def release(self, key):
+        # İş bitti (ya da durdu): ayırma kalkar, aynı dosya sisteminde bekleyen işler yeniden denenir
+        with self.lock:
+            job = self.jobs.pop(key, None)
+            if job is None:
+                return
+            self.generations[job['device']] = self.generations.get(job['device'], 0) + 1
+            waiting = self.waiting.pop(job['device'], [])
+        for callback in waiting:
+            callback()
+
+
+class WriteStats:
+    # Hedef klasör başına diske yazılan bayt ve yazmada geçen süre (yazma hızı = bayt / süre)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.directories = {}
+
+    def add(self, directory, count, seconds):
+        with self.lock:
+            stats = self.directories.setdefault(directory, [0, 0.0])
+            stats[0] += count
+            stats[1] += seconds
+        metrics.inc('ytdl_write_bytes_total', count, directory=directory)
+        metrics.inc('ytdl_write_seconds_total', seconds, directory=directory)
+
+    def report(self, directory=None):
+        with self.lock:
+            items = dict(self.directories) if directory is None else {
+                directory: self.directories.get(directory, [0, 0.0])}
+            return {path: {'bytes': count, 'seconds': round(seconds, 3),
+                           'bytes_per_second': int(count / seconds) if seconds else None}
+                    for path, (count, seconds) in items.items()}
+
+
+# Uygulama genelinde tek yazma istatistiği
+write_stats = WriteStats()
@@ -0,0 +1,58 @@
+import json
+import pytest
+from cache import MetadataCache, formats_expire_time, slim_formats
+
+NOW = 1_000_000.0
+
+
+def fmt(format_id, expire=None):
+    url = f'https://example.invalid/{format_id}' + (f'?id=1&expire={expire:.0f}' if expire else '')
+    return {'format_id': format_id, 'url': url, 'height': 720, 'http_headers': {'User-Agent': 'x'}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MetadataCache(str(tmp_path / 'cache.sqlite3'), info_ttl=1000, formats_ttl=500)
+
+
+def test_formats_expire_from_url():
+    # En erken biten URL'den 5 dakika önce
+    assert formats_expire_time([fmt('a', NOW + 3600), fmt('b', NOW + 1200)], 5000, NOW) == NOW + 900
+    assert formats_expire_time([fmt('a')], 5000, NOW) == NOW + 5000
+    assert formats_expire_time([fmt('a', NOW + 9000)], 5000, NOW) == NOW + 5000
+    assert formats_expire_time([{'url': 'https://example.invalid/?expire=soon'}], 5000, NOW) == NOW + 5000
+
+
+def test_get_reports_stale_formats_then_expires(cache):
+    cache.put('v', {'id': 'v', 'title': 'Video', 'formats': [fmt('a', NOW + 600)]}, now=NOW)
+    info, stale = cache.get('v', now=NOW + 100)
+    assert not stale and info['title'] == 'Video'
+    # Sadece gereken alanlar saklanır
+    assert info['formats'] == slim_formats([fmt('a', NOW + 600)]) and 'http_headers' not in info['formats'][0]
+    # Format URL'leri eskidi, bilgi hâlâ geçerli
+    assert cache.get('v', now=NOW + 400)[1]
+    assert cache.update_formats('v', [fmt('a', NOW + 2000)], {'format_ladder': [1]}, now=NOW + 400)
+    info, stale = cache.get('v', now=NOW + 800)
+    assert not stale and info['format_ladder'] == [1]
+    # Bilgi süresi doldu: kayıt silinir
+    assert cache.get('v', now=NOW + 1000) is None
+    assert not cache.update_formats('v', [], {}, now=NOW + 1000)
+
+
+def test_ttl_without_formats(cache):
+    cache.put('p', {'id': 'p', 'playlist_videos': []}, ttl=50, now=NOW)
+    assert cache.get('p', now=NOW + 49) == ({'id': 'p', 'playlist_videos': []}, False)
+    assert cache.get('p', now=NOW + 50) is None
+
+
+def test_lru_eviction_by_size(tmp_path):
+    entry = {'id': 'x', 'title': 'a' * 100}
+    size = len(json.dumps(entry))
+    cache = MetadataCache(str(tmp_path / 'cache.sqlite3'), max_bytes=2 * size)
+    cache.put('a', entry, now=NOW)
+    cache.put('b', entry, now=NOW + 1)
+    # a kullanıldı; sınır aşılınca en uzun süredir kullanılmayan b çıkar
+    cache.get('a', now=NOW + 2)
+    cache.put('c', entry, now=NOW + 3)
+    assert cache.get('b', now=NOW + 4) is None
+    assert cache.get('a', now=NOW + 4) is not None and cache.get('c', now=NOW + 4) is not None
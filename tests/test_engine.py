@@ -0,0 +1,107 @@
+import itertools
+import threading
+from concurrent.futures import Future
+import pytest
+from yt_dlp.utils import OnDemandPagedList
+import engine
+from engine import DownloadEngine, JobControl, iter_entries, PLAYLIST_PAGE
+from history import history_format
+from utils import canonical_id
+
+
+@pytest.fixture
+def postprocessing(tmp_path, monkeypatch):
+    # Dönüştürme süreç havuzu yerine elle sonuçlandırılan bir Future; ffmpeg gerekmez
+    source = tmp_path / 'video.webm'
+    source.write_bytes(b'media')
+    core = DownloadEngine(use_cache=False, use_history=False, persist_journal=False, async_io=False)
+    futures = []
+
+    def run_postprocess(fn, *args):
+        futures.append(Future())
+        return futures[-1]
+
+    monkeypatch.setattr(engine, 'plan_postprocess', lambda info, output: ('remux', []))
+    monkeypatch.setattr(core.scheduler, 'run_postprocess', run_postprocess)
+    events = []
+    core.subscribe(lambda event, data: event == 'job' and events.append(data['state']))
+    core.journal.add('k', url='https://example.invalid/v', format_id='best', output_path=str(tmp_path))
+    core.jobs['k'] = {'control': JobControl(), 'job_id': None, 'flight': 'f'}
+    core.run_postprocess('k', {'filepath': str(source), 'title': 'video'}, 'video')
+    yield core, futures[0], events, source
+    core.shutdown()
+
+
+def test_postprocessing_job_is_not_paused(postprocessing):
+    core, future, events, source = postprocessing
+    assert core.pause_job('k') is False
+    assert not core.wait(timeout=0.05)
+
+    future.set_result({'filepath': str(source), 'wait': 0.0, 'elapsed': 0.0, 'cpu': 0.0})
+    assert core.wait(timeout=1)
+    assert events == ['postprocessing', 'completed']
+
+
+def test_cancel_waits_for_postprocessing(postprocessing):
+    core, future, events, source = postprocessing
+    future.set_running_or_notify_cancel()
+    core.cancel_job('k')
+    # Süreç dosyaya yazarken iş kaldırılmaz
+    assert 'k' in core.jobs and not core.wait(timeout=0.05)
+
+    future.set_result({'filepath': str(source), 'wait': 0.0, 'elapsed': 0.0, 'cpu': 0.0})
+    assert core.wait(timeout=1)
+    assert events == ['postprocessing', 'cancelled']
+    assert core.journal.get('k') is None
+
+
+def test_paged_playlist_is_read_lazily():
+    requested = []
+
+    def page(number):
+        requested.append(number)
+        return list(range(number * 30, min(250, number * 30 + 30)))
+
+    entries = iter_entries(OnDemandPagedList(page, 30))
+    # İlk dilim için sadece gereken sayfalar istenir
+    assert list(itertools.islice(entries, 10)) == list(range(10))
+    assert requested == list(range(-(-PLAYLIST_PAGE // 30)))
+    # Kısa dilim listenin sonudur
+    assert list(entries) == list(range(10, 250))
+    assert requested[-1] == 8
+
+
+def test_archived_download_is_linked_outside_engine_lock(tmp_path):
+    archive, target = tmp_path / 'archive', tmp_path / 'target'
+    archive.mkdir()
+    target.mkdir()
+    (archive / 'video.mp4').write_bytes(b'media')
+    core = DownloadEngine(use_cache=False, persist_journal=False, async_io=False,
+                          history_path=str(tmp_path / 'history.sqlite3'))
+    url = 'https://www.youtube.com/watch?v=aaaaaaaaaaa'
+    core.history.add(canonical_id(url), history_format('best', 'video'), str(archive / 'video.mp4'))
+    events = []
+
+    def on_event(event, data):
+        # Olay yayınlanırken başka iş parçacığı motor kilidini alabilmeli
+        if event != 'job':
+            return
+
+        def lock():
+            acquired = core.lock.acquire(timeout=1)
+            events.append((data['state'], acquired))
+            if acquired:
+                core.lock.release()
+        locker = threading.Thread(target=lock)
+        locker.start()
+        locker.join()
+
+    core.subscribe(on_event)
+    try:
+        core.download(url, 'best', str(target), output='video')
+        assert (target / 'video.mp4').read_bytes() == b'media'
+        core.download(url, 'best', str(target), output='video')
+        assert events == [('completed', True), ('skipped', True)]
+        assert core.wait(timeout=1) and not core.jobs
+    finally:
+        core.shutdown()
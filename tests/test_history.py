@@ -0,0 +1,51 @@
+import pytest
+from history import DownloadHistory, history_format
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = DownloadHistory(str(tmp_path / 'history.sqlite3'))
+    yield history
+    history.close()
+
+
+def test_find_returns_newest_file_still_on_disk(history, tmp_path):
+    fmt = history_format('best', 'video')
+    old, new = tmp_path / 'old.mp4', tmp_path / 'new.mp4'
+    old.write_bytes(b'old')
+    new.write_bytes(b'new')
+    history.add('youtube:a', fmt, str(old), 'A', 3, now=100)
+    history.add('youtube:a', fmt, str(new), 'A', 3, now=200)
+    assert ('youtube:a', fmt) in history and len(history) == 1
+    assert history.find('youtube:a', fmt) == str(new)
+    # Silinmiş dosya atlanır
+    new.unlink()
+    assert history.find('youtube:a', fmt) == str(old)
+    old.unlink()
+    assert history.find('youtube:a', fmt) is None
+    # Aynı format ifadesi farklı çıktı türüyle ayrı anahtardır
+    assert history.find('youtube:a', history_format('best', 'mp3')) is None
+
+
+def test_keys_survive_reopen(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    history = DownloadHistory(path)
+    history.add('youtube:a', 'video:best', str(tmp_path / 'a.mp4'))
+    history.close()
+    history = DownloadHistory(path)
+    assert ('youtube:a', 'video:best') in history
+    assert ('youtube:b', 'video:best') not in history
+    history.close()
+
+
+def test_page_walks_newest_first_with_keyset(history):
+    for i in range(5):
+        # Aynı zamanda biten kayıtlar kimlikle sıralanır
+        history.add(f'youtube:{i}', 'video:best', f'/tmp/{i}.mp4', now=100 + i // 2)
+    first = history.page(limit=2)
+    assert [entry['video_id'] for entry in first] == ['youtube:4', 'youtube:3']
+    second = history.page(before=first[-1], limit=2)
+    assert [entry['video_id'] for entry in second] == ['youtube:2', 'youtube:1']
+    third = history.page(before=second[-1], limit=2)
+    assert [entry['video_id'] for entry in third] == ['youtube:0']
+    assert history.page(before=third[-1]) == []
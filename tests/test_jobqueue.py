@@ -0,0 +1,91 @@
+import urllib.error
+import pytest
+from jobqueue import JobQueue, QueueServer, QueueClient, QUEUED, LEASED, PAUSED, COMPLETED, FAILED
+
+URL = 'https://www.youtube.com/watch?v=aaaaaaaaaaa'
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / 'queue.sqlite3'), max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def submit(queue, url=URL, **kwargs):
+    return queue.submit(url, 'best', '/downloads', **kwargs)
+
+
+def test_submit_deduplicates_active_jobs(queue):
+    first = submit(queue)
+    assert submit(queue, 'https://youtu.be/aaaaaaaaaaa')['id'] == first['id']
+    # Başka çıktı türü ayrı iştir
+    assert submit(queue, output='mp3')['id'] != first['id']
+
+
+def test_claim_order_and_finish_by_owner(queue):
+    low = submit(queue, 'https://youtu.be/bbbbbbbbbbb')
+    high = submit(queue, priority=5)
+    job = queue.claim('w1')
+    assert job['id'] == high['id'] and job['state'] == LEASED and job['attempts'] == 1
+    assert queue.claim('w2')['id'] == low['id']
+    assert queue.claim('w3') is None
+    # Sadece işi kiralamış işçi bitirebilir
+    assert not queue.complete(job_id=high['id'], worker='w2')
+    assert queue.complete(job_id=high['id'], worker='w1', filepath='/downloads/a.mp4')
+    assert queue.jobs([high['id']])[0]['state'] == COMPLETED
+    assert not queue.fail(job_id=high['id'], worker='w1', error='late')
+
+
+def test_expired_lease_is_redelivered_until_max_attempts(queue):
+    job = submit(queue)
+    # Nabız göndermeyen işçi: kira hemen dolar
+    assert queue.claim('w1', lease=-1)['id'] == job['id']
+    redelivered = queue.claim('w2', lease=-1)
+    assert redelivered['id'] == job['id'] and redelivered['worker'] == 'w2' and redelivered['attempts'] == 2
+    # Kirası başkasına geçen işçinin bildirimi ve nabzı yok sayılır
+    assert queue.heartbeat(job_id=job['id'], worker='w1') is None
+    assert not queue.complete(job_id=job['id'], worker='w1')
+    # Deneme hakkı bitti: üçüncü kez dağıtılmaz, başarısız sayılır
+    assert queue.claim('w3') is None
+    failed = queue.jobs([job['id']])[0]
+    assert failed['state'] == FAILED and failed['error']
+
+
+def test_heartbeat_extends_lease_and_reports_pause(queue):
+    job = submit(queue)
+    queue.claim('w1', lease=-1)
+    assert queue.heartbeat(job_id=job['id'], worker='w1', lease=60, downloaded=10, total=100) == LEASED
+    assert queue.claim('w2') is None
+    assert queue.pause(job['id'])
+    assert queue.heartbeat(job_id=job['id'], worker='w1') == PAUSED
+    # Duraklatma işçiye ulaşmadan biten iş yine de tamamlanır
+    assert queue.complete(job_id=job['id'], worker='w1')
+    assert queue.status()[COMPLETED] == 1
+
+
+def test_release_returns_job_without_using_an_attempt(queue):
+    job = submit(queue)
+    queue.claim('w1')
+    assert queue.release(job_id=job['id'], worker='w1')
+    released = queue.jobs([job['id']])[0]
+    assert released['state'] == QUEUED and released['attempts'] == 0 and released['worker'] is None
+    assert queue.claim('w2')['attempts'] == 1
+
+
+def test_server_checks_token_and_reports_database_errors(queue):
+    server = QueueServer(queue, port=0, token='secret')
+    url = f'http://127.0.0.1:{server.port}'
+    try:
+        assert QueueClient(url, 'secret').submit(url=URL, format_id='best', output_path='/d')['state'] == QUEUED
+        for token in ('wrong', None):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                QueueClient(url, token).status()
+            assert error.value.code == 403
+        # Veritabanı hatası sunucuyu düşürmez, istemci geçici hata (503) alır
+        queue.close()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            QueueClient(url, 'secret').claim(worker='w1')
+        assert error.value.code == 503
+    finally:
+        server.close()
@@ -0,0 +1,123 @@
+import gzip
+import threading
+import socketserver
+import pytest
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+import network
+from network import PooledYoutubeDL, parse_head
+from retry import breakers
+
+BODY = b'pooled response body ' * 200
+
+
+def chunked(data, size=1000):
+    parts = [b'%x;ext=1\r\n%s\r\n' % (len(data[i:i + size]), data[i:i + size]) for i in range(0, len(data), size)]
+    return b''.join(parts) + b'0\r\nX-Trailer: yes\r\n\r\n'
+
+
+RESPONSES = {
+    '/plain': b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(BODY), BODY),
+    '/chunked': b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n' + chunked(BODY),
+    '/gzip': b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: %d\r\n\r\n%s' % (
+        len(gzip.compress(BODY)), gzip.compress(BODY)),
+    '/gzip-chunked': b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nTransfer-Encoding: chunked\r\n\r\n'
+                     + chunked(gzip.compress(BODY), 100),
+    '/continue': b'HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok',
+    '/redirect': b'HTTP/1.1 302 Found\r\nLocation: /chunked\r\nContent-Length: 5\r\n\r\nmoved',
+    '/see-other': b'HTTP/1.1 303 See Other\r\nLocation: /echo-method\r\nContent-Length: 0\r\n\r\n',
+    '/loop': b'HTTP/1.1 301 Moved\r\nLocation: /loop\r\nContent-Length: 0\r\n\r\n',
+    '/missing': b'HTTP/1.1 404 Not Found\r\nContent-Length: 9\r\n\r\nnot found',
+    '/truncated': b'HTTP/1.1 200 OK\r\nContent-Length: 100\r\nConnection: close\r\n\r\nshort',
+}
+
+
+class Handler(socketserver.StreamRequestHandler):
+    # Aynı bağlantıda sırayla gelen istekleri yanıtlar (keep-alive)
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            method, path, _ = line.decode().split(' ')
+            length = 0
+            while (header := self.rfile.readline()) not in (b'\r\n', b''):
+                name, _, value = header.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            self.rfile.read(length)
+            if path == '/echo-method':
+                self.wfile.write(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(method), method.encode()))
+            else:
+                self.wfile.write(RESPONSES[path])
+            if path == '/truncated':
+                return
+
+
+@pytest.fixture
+def server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    network.start_shared_client()
+    breakers.reset()
+    with PooledYoutubeDL({'quiet': True}) as ydl:
+        yield ydl, f'http://127.0.0.1:{server.server_address[1]}', server
+    network.stop_shared_client()
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_head():
+    version, status, reason, headers = parse_head(
+        b'HTTP/1.1 206 Partial Content\r\nContent-Range: bytes 0-0/10\r\nX-Long: a\r\n\tb\r\n'
+        b'Set-Cookie: a=1\r\nSet-Cookie: b=2\r\n\r\n')
+    assert (version, status, reason) == ('HTTP/1.1', 206, 'Partial Content')
+    assert headers['Content-Range'] == 'bytes 0-0/10' and headers['X-Long'] == 'a b'
+    assert headers.get_all('Set-Cookie') == ['a=1', 'b=2']
+    with pytest.raises(TransportError):
+        parse_head(b'SSH-2.0-OpenSSH\r\n\r\n')
+
+
+@pytest.mark.parametrize('path', ['/plain', '/chunked', '/gzip', '/gzip-chunked'])
+def test_body_framing_and_encoding(server, path):
+    ydl, url, _ = server
+    with ydl.urlopen(url + path) as response:
+        assert response.read() == BODY
+    # Küçük parçalarla okuma da aynı gövdeyi verir
+    with ydl.urlopen(url + path) as response:
+        parts = []
+        while block := response.read(333):
+            parts.append(block)
+    assert b''.join(parts) == BODY
+
+
+def test_connection_is_reused_after_full_body(server):
+    ydl, url, srv = server
+    for path in ('/chunked', '/gzip', '/continue', '/plain', '/missing'):
+        try:
+            ydl.urlopen(url + path).read()
+        except HTTPError as e:
+            assert e.status == 404 and e.response.read() == b'not found'
+    assert srv.connections == 1
+    assert network.shared_client().stats()['reused'] == 4
+
+
+def test_redirects(server):
+    ydl, url, _ = server
+    with ydl.urlopen(url + '/redirect') as response:
+        assert response.url == url + '/chunked' and response.read() == BODY
+    # 303 sonrası istek GET olur, gövde gönderilmez
+    with ydl.urlopen(Request(url + '/see-other', data=b'payload')) as response:
+        assert response.read() == b'GET'
+    with pytest.raises(HTTPError) as error:
+        ydl.urlopen(url + '/loop')
+    assert error.value.status == 301 and error.value.redirect_loop
+
+
+def test_truncated_body(server):
+    ydl, url, _ = server
+    with pytest.raises(TransportError):
+        ydl.urlopen(url + '/truncated').read()
@@ -0,0 +1,57 @@
+import yt_dlp
+from formats import build_ladder, video_options, audio_options
+from planner import PlanRule, BatchPlan
+
+FORMATS = [
+    {'format_id': '137', 'vcodec': 'avc1.640028', 'acodec': 'none', 'height': 1080, 'ext': 'mp4',
+     'tbr': 4000, 'url': 'http://example.invalid/137'},
+    {'format_id': '401', 'vcodec': 'av01.0.12M.08', 'acodec': 'none', 'height': 2160, 'ext': 'mp4',
+     'tbr': 16000, 'url': 'http://example.invalid/401'},
+    {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 128, 'ext': 'm4a',
+     'tbr': 128, 'url': 'http://example.invalid/140'},
+    {'format_id': '18', 'vcodec': 'avc1.42001E', 'acodec': 'mp4a.40.2', 'height': 360, 'ext': 'mp4',
+     'tbr': 500, 'url': 'http://example.invalid/18'},
+]
+
+
+def select(spec, formats):
+    # yt-dlp formatları kötüden iyiye sıralı bekler
+    ydl = yt_dlp.YoutubeDL({'quiet': True})
+    formats = sorted(formats, key=lambda f: (f.get('height') or 0, f.get('tbr') or 0))
+    ctx = {'formats': formats, 'has_merged_format': True, 'incomplete_formats': False}
+    return [f['format_id'] for f in ydl.build_format_selector(spec)(ctx)]
+
+
+def test_unresolved_entry_keeps_height_limit_without_preferred_codec():
+    # Format listesi alınmamış girdi: VP9 yoksa çözünürlük sınırı korunarak diğer kodeklere düşülür
+    records = [{'id': 'a', 'duration_string': '10:00'}]
+    plan = BatchPlan(records, PlanRule('video', max_height=1080, codec='vp9'), {}).finish()
+    entry = plan.entries['a']
+    assert entry['size'] is None and entry['fits']
+    assert select(entry['format'], FORMATS) == ['137+140']
+
+
+def test_unresolved_entry_matches_yt_dlp_codec_names():
+    formats = FORMATS + [{'format_id': '248', 'vcodec': 'vp09.00.40.08', 'acodec': 'none', 'height': 1080,
+                          'ext': 'webm', 'tbr': 3000, 'url': 'http://example.invalid/248'}]
+    plan = BatchPlan([{'id': 'a'}], PlanRule('video', max_height=1080, codec='vp9'), {}).finish()
+    assert select(plan.entries['a']['format'], formats) == ['248+140']
+
+
+def test_resolved_entry_respects_size_limit():
+    records = [{'id': 'a', 'duration': 600, 'format_ladder': build_ladder(FORMATS)}]
+    # 1080p + ses ~305 MB, 360p birleşik ~37 MB
+    plan = BatchPlan(records, PlanRule('video', max_size=100 * 1024 ** 2), {}).finish()
+    assert plan.entries['a']['format'] == '18'
+    assert plan.summary()['over_limit'] == 0
+
+    plan = BatchPlan(records, PlanRule('video', max_size=1024 ** 2), {}).finish()
+    assert not plan.entries['a']['fits']
+    assert plan.summary()['over_limit'] == 1
+
+
+def test_quality_labels_use_megabits():
+    # yt-dlp bit hızları kbps
+    ladder = build_ladder(FORMATS)
+    assert video_options(ladder)[1:] == [("360p (0.5Mbps)", '18', 360)]
+    assert audio_options(ladder)[0] == ("128kbps", '140')
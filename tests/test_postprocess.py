@@ -0,0 +1,50 @@
+import pytest
+from postprocess import plan_postprocess, default_output
+
+
+def merged(ext, vcodec, acodec):
+    return {'ext': ext, 'requested_formats': [{'vcodec': vcodec, 'acodec': 'none'},
+                                              {'vcodec': 'none', 'acodec': acodec}]}
+
+
+def audio(ext, acodec):
+    return {'ext': ext, 'vcodec': 'none', 'acodec': acodec}
+
+
+@pytest.mark.parametrize('info, output, operation', [
+    # mp4 kabına akış kopyalamayla alınabilen kodekler yeniden kodlanmaz
+    ({'ext': 'mp4', 'vcodec': 'avc1.64001F', 'acodec': 'mp4a.40.2'}, 'video', 'none'),
+    (merged('webm', 'vp09.00.40.08', 'opus'), 'video', 'remux'),
+    (merged('mkv', 'avc1.640028', 'mp4a.40.2'), 'video', 'remux'),
+    (merged('mkv', 'av01.0.08M.08', 'opus'), 'video', 'remux'),
+    ({'ext': 'webm', 'vcodec': 'vp09.00.40.08', 'acodec': 'none'}, 'video', 'remux'),
+    (merged('webm', 'vp8', 'vorbis'), 'video', 'transcode'),
+    # İstenen kapta zaten duran ses dokunulmadan bırakılır, uygun kodek kaba alınır
+    (audio('m4a', 'mp4a.40.2'), 'm4a', 'none'),
+    (audio('mp3', 'mp3'), 'mp3', 'none'),
+    (audio('m4a', 'mp4a.40.2'), 'native', 'none'),
+    (audio('webm', 'opus'), 'native', 'remux'),
+    (audio('webm', 'opus'), 'opus', 'remux'),
+    (audio('mp4', 'mp4a.40.5'), 'm4a', 'remux'),
+    # Kodek uymuyorsa dönüştürülür
+    (audio('webm', 'opus'), 'm4a', 'transcode'),
+    (audio('m4a', 'mp4a.40.2'), 'mp3', 'transcode'),
+])
+def test_plan_picks_cheapest_operation(info, output, operation):
+    assert plan_postprocess(info, output)[0] == operation
+
+
+def test_plan_postprocessors():
+    assert plan_postprocess(merged('webm', 'vp9', 'opus'))[1] == [
+        {'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}]
+    assert plan_postprocess(audio('webm', 'opus'), 'native')[1] == [
+        {'key': 'FFmpegExtractAudio', 'preferredcodec': 'best'}]
+    assert plan_postprocess(audio('m4a', 'mp4a.40.2'), 'mp3')[1] == [
+        {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}]
+
+
+def test_default_output():
+    assert default_output('bestaudio/best') == 'mp3'
+    assert default_output('ba[ext=m4a]') == 'mp3'
+    assert default_output('bestvideo+bestaudio/best') == 'video'
+    assert default_output(None) == 'video'
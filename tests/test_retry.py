@@ -0,0 +1,116 @@
+import io
+import time
+import email.utils
+import pytest
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, ExtractorError
+import retry
+from retry import (RetryPolicy, CircuitBreakers, CircuitOpen, classify, parse_retry_after, PROBE_WAIT,
+                   RATE_LIMITED, SERVER, NETWORK, CIRCUIT_OPEN, FATAL, CLOSED, OPEN, HALF_OPEN, MAX_RETRY_AFTER)
+
+
+def http_error(status, **headers):
+    return HTTPError(Response(io.BytesIO(b''), 'https://example.invalid/v', headers, status=status))
+
+
+@pytest.mark.parametrize('error, expected', [
+    (http_error(429, **{'Retry-After': '7'}), (RATE_LIMITED, 7.0)),
+    (http_error(503), (SERVER, None)),
+    (http_error(404), (FATAL, None)),
+    (TransportError('reset'), (NETWORK, None)),
+    (TimeoutError(), (NETWORK, None)),
+    (CircuitOpen('example.invalid', 12), (CIRCUIT_OPEN, 12)),
+    # yt-dlp'nin sarmaladığı hatalar zincir boyunca çözülür
+    (DownloadError('ERROR: giving up', (HTTPError, http_error(502), None)), (SERVER, None)),
+    (ExtractorError('extract failed', cause=TransportError('timed out')), (NETWORK, None)),
+    # İndirici asıl istisnayı vermeden sadece mesajı bildirdiğinde durum kodu mesajdan okunur
+    (DownloadError('ERROR: unable to download video data: HTTP Error 429: Too Many Requests'), (RATE_LIMITED, None)),
+    (DownloadError('ERROR: Requested format is not available'), (FATAL, None)),
+    (ValueError('bad'), (FATAL, None)),
+])
+def test_classify(error, expected):
+    assert classify(error) == expected
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+    assert parse_retry_after(email.utils.formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+def test_backoff_is_capped_and_honours_retry_after(monkeypatch):
+    # Jitter'ın üst sınırı seçilir
+    monkeypatch.setattr(retry.random, 'uniform', lambda low, high: high)
+    policy = RetryPolicy(base=1.0, cap=10.0)
+    assert [policy.delay(attempt) for attempt in range(5)] == [1.0, 2.0, 4.0, 8.0, 10.0]
+    assert policy.delay(0, retry_after=30) == 30
+    assert policy.delay(0, retry_after=10 * MAX_RETRY_AFTER) == MAX_RETRY_AFTER
+    assert policy.delay(4, retry_after=3) == 10.0
+
+
+def test_budgets_are_per_error_class():
+    policy = RetryPolicy(budgets={SERVER: 2, NETWORK: 1})
+    attempts = {}
+    assert policy.next_delay(http_error(503), attempts, 'test')[1] == SERVER
+    assert policy.next_delay(http_error(500), attempts, 'test')[0] is not None
+    assert policy.next_delay(http_error(503), attempts, 'test') == (None, SERVER)
+    # Başka sınıfın bütçesi ayrı
+    delay, error_class = policy.next_delay(TransportError('reset'), attempts, 'test')
+    assert delay is not None and error_class == NETWORK
+    assert policy.next_delay(TransportError('reset'), attempts, 'test') == (None, NETWORK)
+    assert attempts == {SERVER: 2, NETWORK: 1}
+    # Kalıcı hata hiç denenmez
+    assert policy.next_delay(http_error(403), attempts, 'test') == (None, FATAL)
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breakers = CircuitBreakers(threshold=3, cooldown=0.05, max_cooldown=1)
+    for _ in range(2):
+        breakers.failure('a')
+    assert breakers.blocked_for('a') == 0 and breakers.states() == {'a': CLOSED}
+    breakers.failure('a')
+    assert breakers.states() == {'a': OPEN}
+    assert 0 < breakers.blocked_for('a') <= 0.05
+    # Başka makine etkilenmez
+    assert breakers.blocked_for('b') == 0
+
+    time.sleep(0.06)
+    assert breakers.blocked_for('a', probe=False) == 0
+    assert breakers.states() == {'a': OPEN}
+    # Süre dolunca tek deneme isteği geçer, diğerleri bekletilir
+    assert breakers.blocked_for('a') == 0
+    assert breakers.states() == {'a': HALF_OPEN}
+    assert breakers.blocked_for('a') == PROBE_WAIT
+    breakers.abandon('a')
+    assert breakers.blocked_for('a') == 0
+
+    # Deneme başarısız: süre ikiye katlanır
+    breakers.failure('a')
+    assert breakers.states() == {'a': OPEN}
+    assert 0.05 < breakers.blocked_for('a') <= 0.1
+    time.sleep(0.11)
+    assert breakers.blocked_for('a') == 0
+    breakers.success('a')
+    assert breakers.states() == {}
+
+
+def test_breaker_record_and_retry_after():
+    breakers = CircuitBreakers(threshold=2, cooldown=0.01)
+    breakers.record('a', status=503)
+    # 4xx makinenin ayakta olduğunu gösterir, hata sayacı sıfırlanır
+    breakers.record('a', status=404)
+    breakers.record('a', status=500)
+    assert breakers.states() == {'a': CLOSED}
+    # Retry-After ile gelen hata makineyi eşik beklenmeden, istenen süre kadar kapatır
+    breakers.record('b', status=429, retry_after=30)
+    assert breakers.states()['b'] == OPEN
+    assert 29 < breakers.blocked_for('b') <= 30
+    # Yanıtsız ağ hatası da hata sayılır
+    breakers.record('a')
+    assert breakers.states()['a'] == OPEN
+    breakers.reset()
+    assert breakers.states() == {}
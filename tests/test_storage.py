@@ -0,0 +1,69 @@
+import collections
+import pytest
+import storage
+from storage import DiskSpace, OK, DEFER, REFUSE, estimate_size, existing_parent
+
+MB = 1024 * 1024
+Usage = collections.namedtuple('Usage', 'total used free')
+
+
+@pytest.fixture
+def disk(monkeypatch):
+    # Hedef dosya sisteminde 100 MB boş alan, 10 MB'ı her zaman boş kalır
+    monkeypatch.setattr(storage.shutil, 'disk_usage', lambda path: Usage(1000 * MB, 900 * MB, 100 * MB))
+    return DiskSpace(min_free=10 * MB)
+
+
+def test_estimate_size():
+    assert estimate_size({'filesize': 100}) == 100
+    assert estimate_size({'requested_formats': [{'filesize': 100}, {'filesize_approx': 50}]}) == 150
+    # tbr kbps: 800 kbps x 10 s = 1 MB
+    assert estimate_size({'tbr': 800, 'duration': 10}) == 1000000
+    assert estimate_size({'requested_formats': [{'filesize': 100}, {'tbr': 128}]}) is None
+
+
+def test_existing_parent(tmp_path):
+    assert existing_parent(tmp_path / 'a' / 'b') == str(tmp_path)
+    assert existing_parent(tmp_path) == str(tmp_path)
+
+
+def test_admit_counts_outstanding_reservations(disk, tmp_path):
+    assert disk.admit('big', tmp_path, 200 * MB) == (REFUSE, 200 * MB, 90 * MB)
+    assert disk.admit('a', tmp_path, 60 * MB)[0] == OK
+    # a'nın henüz yazmadığı 60 MB ayrılmış sayılır
+    assert disk.admit('b', tmp_path / 'new', 40 * MB)[0] == DEFER
+    # Yazılan baytlar zaten boş alandan düşmüştür, ayırmadan düşülür
+    disk.written('a', 30 * MB)
+    assert disk.admit('b', tmp_path, 40 * MB)[0] == OK
+    # Sürdürülen işin diskteki baytları yeniden istenmez
+    assert disk.admit('c', tmp_path, 80 * MB, partial=50 * MB) == (DEFER, 30 * MB, 90 * MB)
+    assert disk.admit('c', tmp_path, 80 * MB, partial=60 * MB)[0] == OK
+    # Yeniden denenen işin kendi eski ayırması sayılmaz
+    assert disk.admit('a', tmp_path, 60 * MB, partial=30 * MB)[0] == OK
+
+
+def test_release_wakes_deferred_job(disk, tmp_path):
+    woken = []
+    disk.admit('a', tmp_path, 60 * MB)
+    assert disk.admit('b', tmp_path, 40 * MB)[0] == DEFER
+    disk.wait('b', lambda: woken.append('b'))
+    assert woken == []
+    # Yazma ilerlemesi bekleyeni uyandırmaz, sadece ayırmanın kalkması uyandırır
+    disk.written('a', 10 * MB)
+    assert woken == []
+    disk.release('a')
+    assert woken == ['b']
+    # Tekrar serbest bırakma bir şey yapmaz, bekleyen bir kez çağrılır
+    disk.release('a')
+    assert woken == ['b']
+    assert disk.admit('b', tmp_path, 40 * MB)[0] == OK
+
+
+def test_release_between_admit_and_wait_is_not_missed(disk, tmp_path):
+    woken = []
+    disk.admit('a', tmp_path, 60 * MB)
+    assert disk.admit('b', tmp_path, 40 * MB)[0] == DEFER
+    # Ertelenen iş park edilirken a biter
+    disk.release('a')
+    disk.wait('b', lambda: woken.append('b'))
+    assert woken == ['b']
@@ -0,0 +1,47 @@
+import os
+from engine import YoutubeDLPool
+
+BASE = {'quiet': True, 'no_warnings': True, 'noprogress': True, 'enable_file_urls': True}
+
+
+def download(pool, opts, source):
+    # Çıkarıcısız yerel dosya indirmesi: format seçimi, aktarım öncesi denetim ve ilerleme kancaları çalışır
+    info = {'id': 'v', 'title': 'video', 'extractor': 'test', 'extractor_key': 'Test', 'webpage_url': source,
+            'formats': [{'format_id': 'low', 'url': source, 'ext': 'mp4', 'height': 144},
+                        {'format_id': 'high', 'url': source, 'ext': 'mp4', 'height': 720}]}
+    with pool.checkout(opts) as ydl:
+        return ydl.process_ie_result(info, download=True)
+
+
+def test_checkouts_do_not_share_job_options(tmp_path):
+    source = tmp_path / 'source.bin'
+    source.write_bytes(os.urandom(4096))
+    first_dir, second_dir = tmp_path / 'a', tmp_path / 'b'
+    first_hooks, second_hooks, admitted = [], [], []
+    pool = YoutubeDLPool()
+
+    first = dict(BASE, format='low', outtmpl=str(first_dir / '%(title)s.%(format_id)s.%(ext)s'),
+                 progress_hooks=[first_hooks.append], before_download=admitted.append)
+    info = download(pool, first, source.as_uri())
+    assert info['format_id'] == 'low'
+    assert first_hooks and len(admitted) == 1
+
+    # Aynı imza: aynı örnek yeniden kullanılır, ama önceki işin kancaları ve formatı taşınmaz
+    seen = len(first_hooks)
+    second = dict(first, format='high', progress_hooks=[second_hooks.append], before_download=None)
+    info = download(pool, second, source.as_uri())
+    assert pool.stats()['reused'] == 1
+    assert info['format_id'] == 'high'
+    assert second_hooks and len(first_hooks) == seen and len(admitted) == 1
+
+    # Başka klasör: çıktı şablonu önceki işten gelmez
+    third = dict(second, outtmpl=str(second_dir / '%(title)s.%(format_id)s.%(ext)s'), progress_hooks=[])
+    download(pool, third, source.as_uri())
+    assert sorted(os.listdir(first_dir)) == ['video.high.mp4', 'video.low.mp4']
+    assert os.listdir(second_dir) == ['video.high.mp4']
+    assert len(first_hooks) == seen
+
+    # Havuza dönen örnekte iş alanları boştur
+    with pool.checkout(dict(BASE, outtmpl=first['outtmpl'])) as ydl:
+        assert ydl.job_hooks == [] and ydl.before_download is None and ydl.params['format'] is None
+    pool.close()
@@ -0,0 +1,261 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, QUrl, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from utils import app_data_dir
+from metrics import metrics
+
+# Tablodaki önizleme boyutu ve önbellek bütçeleri
+THUMBNAIL_SIZE = QSize(80, 45)
+MEMORY_BUDGET = 16 * 1024 * 1024
+DISK_BUDGET = 64 * 1024 * 1024
+# Aynı anda yüklenen (disk + ağ) önizleme sayısı
+MAX_LOADS = 6
+# Görünür satırlar kaydırma durduktan bu kadar sonra hesaplanır (ms)
+VISIBLE_DELAY = 100
+
+
+def visible_rows(view):
+    # Görünümde ekranda duran ilk ve son satır; boşsa None
+    first = view.rowAt(0)
+    if first < 0:
+        return None
+    last = view.rowAt(view.viewport().height() - 1)
+    return first, last if last >= 0 else view.model().rowCount() - 1
+
+
+class PixmapCache:
+    # Bellekteki önizlemeler (LRU): toplam piksel baytı bütçeyi aşınca en uzun süredir gösterilmeyen atılır
+    def __init__(self, max_bytes=MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.bytes = 0
+
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key):
+        pixmap = self.items.get(key)
+        if pixmap is not None:
+            self.items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.bytes -= self.cost(old)
+        self.items[key] = pixmap
+        self.bytes += self.cost(pixmap)
+        while self.bytes > self.max_bytes and len(self.items) > 1:
+            _, evicted = self.items.popitem(last=False)
+            self.bytes -= self.cost(evicted)
+
+    def clear(self):
+        self.items.clear()
+        self.bytes = 0
+
+
+class DiskCache:
+    # Video kimliği -> indirilen önizleme dosyası. Toplam boyut bütçeyi aşarsa en uzun süredir
+    # okunmayan dosyalar silinir (okuma dosyanın değişiklik zamanını günceller). İşçi iş
+    # parçacıklarından çağrılır.
+    def __init__(self, path, max_bytes=DISK_BUDGET):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Klasörün toplam boyutu ilk yazmada hesaplanır (açılışta klasör taranmaz)
+        self.total = None
+        os.makedirs(path, exist_ok=True)
+
+    def file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def read(self, key):
+        path = self.file(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write(self, key, data):
+        path = self.file(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Thumbnail cache write failed: %s", e)
+            return
+        with self.lock:
+            if self.total is None:
+                self.total = sum(size for _, size, _ in self.entries())
+            else:
+                self.total += len(data)
+            if self.total > self.max_bytes:
+                self.trim()
+
+    def entries(self):
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+    def trim(self):
+        # Bütçenin %90'ına inene kadar en eski dosyalar silinir (her yazmada yeniden taranmasın)
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self.total = total
+
+
+class ThumbnailSignals(QObject):
+    # anahtar, küçültülmüş görüntü (ya da None), kaynak ('disk' / 'network')
+    decoded = pyqtSignal(str, object, str)
+
+
+class DecodeTask(QRunnable):
+    # Disk önbelleğinden okuma, görüntüyü çözme, küçültme ve ağdan gelen veriyi diske yazma arayüz
+    # iş parçacığı dışında yapılır; QPixmap'e dönüştürme arayüzde kalır (QImage iş parçacığı
+    # güvenli, QPixmap değil)
+    def __init__(self, key, data, disk, size, signals):
+        super().__init__()
+        self.key = key
+        self.data = data
+        self.disk = disk
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        source = 'disk' if self.data is None else 'network'
+        data = self.disk.read(self.key) if self.data is None else self.data
+        image = QImage.fromData(data) if data else None
+        if image is not None and image.isNull():
+            image = None
+        if image is not None:
+            if source == 'network':
+                self.disk.write(self.key, data)
+            image = image.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        self.signals.decoded.emit(self.key, image, source)
+
+
+class ThumbnailLoader(QObject):
+    # Görünür satırların önizlemelerini sırayla yükler: bellek -> disk -> ağ. Her request() çağrısı
+    # öncekinin yerini alır; ekrandan çıkan satırların bekleyen istekleri düşer, süren ağ istekleri iptal
+    # edilir. Böylece uzun bir listeyi baştan sona kaydırmak sadece durulan ekranlar kadar istek üretir.
+    loaded = pyqtSignal(str)
+
+    def __init__(self, parent=None, size=THUMBNAIL_SIZE, cache_dir=None, memory_budget=MEMORY_BUDGET,
+                 disk_budget=DISK_BUDGET, max_loads=MAX_LOADS):
+        super().__init__(parent)
+        self.size = size
+        self.memory = PixmapCache(memory_budget)
+        self.disk = DiskCache(cache_dir or os.path.join(app_data_dir(), 'thumbnails'), disk_budget)
+        self.max_loads = max_loads
+        self.manager = None
+        # Görünür ama henüz başlamamış (anahtar -> adres), yüklenmekte olan ve ağdan beklenen önizlemeler
+        self.wanted = OrderedDict()
+        self.visible = set()
+        self.loading = {}
+        self.replies = {}
+        self.failed = set()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals(self)
+        self.signals.decoded.connect(self.on_decoded)
+        self.logger = logging.getLogger(__name__)
+
+    def network(self):
+        # Ağ yöneticisi ilk ağ isteğinde kurulur; açılışı yavaşlatmasın
+        if self.manager is None:
+            from PyQt6.QtNetwork import QNetworkAccessManager
+            self.manager = QNetworkAccessManager(self)
+        return self.manager
+
+    def pixmap(self, key):
+        return self.memory.get(key)
+
+    def request(self, items):
+        # items: görünür satırların (anahtar, adres) listesi, yukarıdan aşağıya
+        self.visible = {key for key, url in items if url}
+        for key in [key for key in self.replies if key not in self.visible]:
+            reply = self.replies.pop(key)
+            del self.loading[key]
+            reply.abort()
+        self.wanted = OrderedDict((key, url) for key, url in items if url and key not in self.memory
+                                  and key not in self.loading and key not in self.failed)
+        self.pump()
+
+    def pump(self):
+        while self.wanted and len(self.loading) < self.max_loads:
+            key, url = self.wanted.popitem(last=False)
+            self.loading[key] = url
+            self.pool.start(DecodeTask(key, None, self.disk, self.size, self.signals))
+
+    def fetch(self, key, url):
+        from PyQt6.QtNetwork import QNetworkRequest
+        metrics.inc('ytdl_thumbnail_requests_total')
+        reply = self.network().get(QNetworkRequest(QUrl(url)))
+        self.replies[key] = reply
+        reply.finished.connect(lambda: self.on_reply(key, reply))
+
+    def on_reply(self, key, reply):
+        reply.deleteLater()
+        if self.replies.get(key) is not reply:
+            # İptal edildi (satır ekrandan çıktı)
+            return
+        del self.replies[key]
+        if reply.error() != reply.NetworkError.NoError:
+            self.logger.debug("Thumbnail request failed for %s: %s", key, reply.errorString())
+            self.finish(key, None, 'network')
+            return
+        self.pool.start(DecodeTask(key, bytes(reply.readAll()), self.disk, self.size, self.signals))
+
+    def on_decoded(self, key, image, source):
+        if image is None and source == 'disk' and key in self.loading:
+            if key in self.visible:
+                self.fetch(key, self.loading[key])
+                return
+            # Diskte yok ve satır artık görünmüyor; ağa gidilmez
+            del self.loading[key]
+            self.pump()
+            return
+        self.finish(key, image, source)
+
+    def finish(self, key, image, source):
+        self.loading.pop(key, None)
+        if image is None:
+            self.failed.add(key)
+            metrics.inc('ytdl_thumbnails_total', source='failed')
+        else:
+            self.memory.put(key, QPixmap.fromImage(image))
+            metrics.inc('ytdl_thumbnails_total', source=source)
+            self.loaded.emit(key)
+        self.pump()
+
+    def idle(self):
+        return not self.loading and not self.wanted
+
+    def clear(self):
+        self.request([])
+        self.memory.clear()
+        self.failed.clear()
@@ -0,0 +1,83 @@
+import os
+import re
+import queue
+import atexit
+import logging
+import logging.handlers
+from urllib.parse import urlparse, parse_qs
+
+_VIDEO_ID_RE = re.compile(r'(?:youtu\.be/|/shorts/|/embed/|/live/|/v/)([0-9A-Za-z_-]{11})')
+# Tabloda gösterilen önizleme 80 piksel; yüksek DPI ekranlar için iki katı istenir
+THUMBNAIL_WIDTH = 160
+
+
+def app_data_dir():
+    # Önbellek, geçmiş vb. için kullanıcıya özel veri klasörü
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, 'youtube_downloader')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Varsayılan QueueHandler mesajı çağıran iş parçacığında biçimlendirir; burada kayıt olduğu gibi
+    # kuyruğa atılır, % biçimlendirmesi dinleyici iş parçacığında yapılır
+    def prepare(self, record):
+        return record
+
+
+def start_queue_logging(handlers, level=logging.DEBUG):
+    # Kök kaydediciye sadece kuyruk bağlanır; dosya/konsol yazımı ayrı bir iş parçacığındadır
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def video_id_from_url(url):
+    if not url:
+        return None
+    query = parse_qs(urlparse(url).query)
+    if 'v' in query and query['v'][0]:
+        return query['v'][0]
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def thumbnail_url(info, width=THUMBNAIL_WIDTH):
+    # Genişliği istenenden küçük olmayan en küçük önizleme; liste yoksa tek adres, o da yoksa
+    # YouTube video kimliğinden türetilen adres
+    thumbnails = [t for t in info.get('thumbnails') or () if t.get('url')]
+    if thumbnails:
+        wide = [t for t in thumbnails if (t.get('width') or 0) >= width]
+        best = min(wide, key=lambda t: t['width']) if wide else max(thumbnails, key=lambda t: t.get('width') or 0)
+        return best['url']
+    if info.get('thumbnail'):
+        return info['thumbnail']
+    video_id = video_id_from_url(info.get('webpage_url') or info.get('url'))
+    return f'https://i.ytimg.com/vi/{video_id}/mqdefault.jpg' if video_id else None
+
+
+def playlist_id_from_url(url):
+    if not url:
+        return None
+    query = parse_qs(urlparse(url).query)
+    return query['list'][0] if query.get('list') else None
+
+
+def canonical_id(url):
+    # Aynı içeriği gösteren farklı URL'ler aynı anahtara düşsün
+    if url and 'list=' in url:
+        playlist_id = playlist_id_from_url(url)
+        if playlist_id:
+            return f"playlist:{playlist_id}"
+    video_id = video_id_from_url(url)
+    if video_id:
+        return f"video:{video_id}"
+    return f"url:{url}"
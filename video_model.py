@@ -0,0 +1,235 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+from utils import canonical_id, thumbnail_url
+from formats import build_ladder
+
+
+class VideoRecord:
+    # Tablo satırı: sadece arayüzün ve zamanlayıcının kullandığı alanlar ile format merdiveni.
+    # Ham yt-dlp format listesi (imzalı URL'ler, başlıklar, fragmanlar) tutulmaz; indirme
+    # sırasında bilgi zaten yeniden alınır. Sözlük benzeri erişim (get, [], update) desteklenir.
+    __slots__ = ('id', 'title', 'duration', 'duration_string', 'webpage_url', 'playlist_index', 'thumbnail',
+                 'format_ladder', 'selected', 'status', 'status_color', 'job_key', 'resolved', 'resolving')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.selected = True
+        self.resolved = self.resolving = False
+        self.update(fields)
+
+    @classmethod
+    def from_info(cls, video_info):
+        record = cls(**video_info)
+        if record.format_ladder is None and video_info.get('formats'):
+            # Merdiveni olmayan eski önbellek kayıtları: bir kez kurulur, format listesi atılır
+            record.format_ladder = build_ladder(video_info['formats'])
+        return record
+
+    def update(self, fields=(), **more):
+        # Bilinmeyen anahtarlar (formats, http_headers vb.) atılır
+        for name, value in dict(fields, **more).items():
+            if name in self.__slots__:
+                setattr(self, name, value)
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None) if name in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __repr__(self):
+        return f"VideoRecord({self.id!r}, {self.title!r})"
+
+
+class VideoTableModel(QAbstractTableModel):
+    # Satırlar kararlı bir video kimliğiyle tutulur; kimlik -> satır sözlüğü O(1) erişim sağlar
+    COLUMNS = ["Seç", "Başlık", "Süre", "Durum"]
+    CHECK, TITLE, DURATION, STATUS = range(4)
+
+    check_changed = pyqtSignal(str, bool)
+
+    def __init__(self, parent=None, batch_interval=50, thumbnails=None):
+        super().__init__(parent)
+        self.records = []
+        self.rows = {}
+        self.pending = []
+        self.job_ids = {}
+        self.ids = {}
+        # Başlık hücresinde önizleme: sadece bellekte hazır olan gösterilir, yüklemeyi görünüm ister
+        self.thumbnails = thumbnails
+        if thumbnails is not None:
+            thumbnails.loaded.connect(self.thumbnail_loaded)
+
+        # Art arda gelen satırlar biriktirilip tek beginInsertRows ile eklenir
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(batch_interval)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.CHECK:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.TITLE:
+                return record.title or 'Bilinmeyen'
+            if column == self.DURATION:
+                return record.duration_string or record.duration or '00:00'
+            if column == self.STATUS:
+                return record.status or 'Hazır'
+        elif role == Qt.ItemDataRole.CheckStateRole and column == self.CHECK:
+            return Qt.CheckState.Checked if record.selected else Qt.CheckState.Unchecked
+        elif role == Qt.ItemDataRole.BackgroundRole and column == self.STATUS and record.status_color is not None:
+            return QColor(record.status_color)
+        elif role == Qt.ItemDataRole.DecorationRole and column == self.TITLE and self.thumbnails is not None:
+            return self.thumbnails.pixmap(self.thumbnail_key(record))
+        elif role == Qt.ItemDataRole.ToolTipRole and column == self.TITLE:
+            return record.title
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or index.column() != self.CHECK:
+            return False
+        record = self.records[index.row()]
+        record.selected = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.dataChanged.emit(index, index, [role])
+        self.check_changed.emit(record.id, record.selected)
+        return True
+
+    def make_id(self, video_info):
+        # Aynı video listede birden fazla kez geçebilir; kimliği tekilleştir
+        base = canonical_id(video_info.get('webpage_url')) if video_info.get('webpage_url') else 'video'
+        count = self.ids.get(base, 0)
+        self.ids[base] = count + 1
+        return base if count == 0 else f"{base}#{count}"
+
+    @staticmethod
+    def thumbnail_key(record):
+        # Aynı videonun tekrarlanan satırları (kimlik#n) aynı önizlemeyi paylaşır
+        return record.id.partition('#')[0]
+
+    def thumbnail_items(self, first, last):
+        return [(self.thumbnail_key(record), record.thumbnail or thumbnail_url(record))
+                for record in self.records[first:last + 1]]
+
+    def thumbnail_loaded(self, key):
+        for count in range(self.ids.get(key, 0)):
+            row = self.rows.get(key if count == 0 else f"{key}#{count}")
+            if row is not None:
+                index = self.index(row, self.TITLE)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def queue_video(self, video_info):
+        record = VideoRecord.from_info(video_info)
+        record.id = self.make_id(video_info)
+        self.pending.append(record)
+        self.rows[record.id] = None
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+        return record.id
+
+    def add_videos(self, videos):
+        for video_info in videos:
+            record = VideoRecord.from_info(video_info)
+            record.id = self.make_id(video_info)
+            self.pending.append(record)
+        self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(self.pending) - 1)
+        for offset, record in enumerate(self.pending):
+            self.records.append(record)
+            self.rows[record.id] = first + offset
+        self.pending = []
+        self.endInsertRows()
+
+    def clear(self):
+        self.flush_timer.stop()
+        self.beginResetModel()
+        self.records = []
+        self.rows = {}
+        self.pending = []
+        self.job_ids = {}
+        self.ids = {}
+        self.endResetModel()
+
+    def record(self, video_id):
+        row = self.rows.get(video_id)
+        if row is not None:
+            return self.records[row]
+        for record in self.pending:
+            if record.id == video_id:
+                return record
+        return None
+
+    def record_at(self, row):
+        return self.records[row] if 0 <= row < len(self.records) else None
+
+    def all_records(self):
+        return self.records + self.pending
+
+    def first_record(self):
+        records = self.records or self.pending
+        return records[0] if records else None
+
+    def update_video(self, video_id, columns=(), **fields):
+        record = self.record(video_id)
+        if record is None:
+            return None
+        record.update(fields)
+        row = self.rows.get(video_id)
+        # Sadece değişen hücreler için bildirim gönder
+        if row is not None:
+            for column in columns:
+                index = self.index(row, column)
+                self.dataChanged.emit(index, index)
+        return record
+
+    def set_status(self, video_id, status, color=None):
+        # Renk verilmezse hücrenin mevcut arka planı korunur
+        fields = {'status': status}
+        if color is not None:
+            fields['status_color'] = color
+        return self.update_video(video_id, (self.STATUS,), **fields)
+
+    def set_job(self, video_id, job_key):
+        # Aynı video listede birden fazla satırdaysa satırlar tek indirme işini paylaşır
+        video_ids = self.job_ids.setdefault(job_key, [])
+        if video_id not in video_ids:
+            video_ids.append(video_id)
+        self.update_video(video_id, job_key=job_key)
+
+    def set_job_status(self, job_key, status, color=None):
+        for video_id in self.job_ids.get(job_key, ()):
+            self.set_status(video_id, status, color)